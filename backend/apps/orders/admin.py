@@ -3,4 +3,116 @@ Admin configuration for order models.
 """
 from django.contrib import admin
 
-# TODO: Register order models when implemented
+from eshotry.admin_utils import LargeTableAdmin, RecentMonthsFilter
+from .models import ArchivedOrder, Coupon, Order, OrderItem, OrderStatusHistory, ShippingRate
+
+
+class OrderItemInline(admin.TabularInline):
+    """Inline admin for order items."""
+    model = OrderItem
+    extra = 0
+    fields = ['product_name', 'product_sku', 'variant_info', 'quantity', 'unit_price', 'total_price', 'is_returned']
+    readonly_fields = fields
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+class OrderStatusHistoryInline(admin.TabularInline):
+    """Inline admin for order status history."""
+    model = OrderStatusHistory
+    extra = 0
+    fields = ['status', 'notes', 'created_by', 'created_at']
+    readonly_fields = fields
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(Order)
+class OrderAdmin(LargeTableAdmin):
+    """Admin configuration for Order model."""
+    
+    list_display = [
+        'order_number', 'user', 'status', 'payment_status',
+        'total_amount', 'created_at'
+    ]
+    # No date_hierarchy: its month links scan every partition
+    list_filter = ['status', 'payment_status', RecentMonthsFilter]
+    list_select_related = ['user']
+    search_fields = ['order_number', 'user__email']
+    raw_id_fields = ['user']
+    inlines = [OrderItemInline, OrderStatusHistoryInline]
+    
+    fieldsets = (
+        ('Order Information', {
+            'fields': ('order_number', 'user', 'status', 'payment_status')
+        }),
+        ('Pricing', {
+            'fields': (
+                'subtotal', 'tax_amount', 'shipping_cost',
+                'discount_amount', 'total_amount'
+            )
+        }),
+        ('Shipping', {
+            'fields': (
+                'shipping_address', 'billing_address',
+                'shipping_method', 'tracking_number'
+            )
+        }),
+        ('Payment', {
+            'fields': ('payment_method', 'payment_id', 'stripe_payment_intent_id')
+        }),
+        ('Notes', {
+            'fields': ('notes',)
+        }),
+        ('Timestamps', {
+            'fields': ('created_at', 'updated_at', 'shipped_at', 'delivered_at'),
+            'classes': ('collapse',)
+        }),
+    )
+    
+    readonly_fields = ['order_number', 'created_at', 'updated_at']
+
+
+@admin.register(ArchivedOrder)
+class ArchivedOrderAdmin(LargeTableAdmin):
+    """Admin configuration for ArchivedOrder model."""
+    
+    list_display = [
+        'order_number', 'user', 'status', 'payment_status',
+        'total_amount', 'created_at', 'archive_month'
+    ]
+    list_filter = ['status', 'archive_month']
+    list_select_related = ['user']
+    search_fields = ['=order_number', 'user__email']
+    raw_id_fields = ['user']
+    readonly_fields = ['archived_at']
+
+
+@admin.register(Coupon)
+class CouponAdmin(admin.ModelAdmin):
+    """Admin configuration for Coupon model."""
+    
+    list_display = [
+        'code', 'name', 'discount_type', 'discount_value',
+        'usage_count', 'usage_limit', 'valid_from', 'valid_until', 'is_active'
+    ]
+    list_filter = ['discount_type', 'is_active', 'valid_from', 'valid_until']
+    search_fields = ['code', 'name']
+    readonly_fields = ['usage_count', 'created_at', 'updated_at']
+
+
+@admin.register(ShippingRate)
+class ShippingRateAdmin(admin.ModelAdmin):
+    """Admin configuration for ShippingRate model."""
+    
+    list_display = [
+        'name', 'base_rate', 'rate_per_kg', 'min_order_amount',
+        'min_delivery_days', 'max_delivery_days', 'is_active'
+    ]
+    list_filter = ['is_active']
+    search_fields = ['name']
+    readonly_fields = ['created_at', 'updated_at']
@@ -5,3 +5,7 @@ class OrdersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.orders'
     verbose_name = 'Orders'
+
+    def ready(self):
+        # Register cache invalidation signals
+        from . import coupons, shipping  # noqa: F401
@@ -0,0 +1,195 @@
+"""
+Coupon engine for EshoTry platform.
+
+Coupons are compiled into lightweight rule objects and kept in an in-process
+table keyed by code. The table is tagged with a shared version number stored
+in the default cache; saving or deleting a ``Coupon`` bumps the version and
+every worker drops its table on the next lookup. Codes that do not exist are
+remembered in the shared cache so guessing codes does not reach the database.
+
+Redemption never trusts the cached ``usage_count``: the global limit is
+enforced by a single conditional ``UPDATE`` and the per-user limit by a
+conditional update of ``CouponUserCounter``. The counter is kept for every
+redemption, so a per-user limit added to a running coupon applies at once.
+"""
+import threading
+import time
+
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from eshotry.cache_versions import bump_version, get_version
+from eshotry.metrics import record_cache
+from eshotry.money import percent_of, to_cents
+from .models import Coupon, CouponUsage, CouponUserCounter
+
+NAMESPACE = 'coupons'
+MISS_TTL = 300
+# Seconds between checks of the shared version from a single worker
+VERSION_CHECK_INTERVAL = 1.0
+
+
+class CouponError(Exception):
+    """Raised when a coupon cannot be applied or redeemed."""
+
+
+class CompiledCoupon:
+    """Immutable snapshot of the rules of a single coupon."""
+
+    __slots__ = (
+        'id', 'code', 'discount_type', 'discount_value', 'minimum_amount',
+        'maximum_discount', 'usage_limit', 'user_usage_limit',
+        'valid_from', 'valid_until', 'is_active',
+        'minimum_cents', 'maximum_discount_cents',
+    )
+
+    def __init__(self, coupon):
+        for name in self.__slots__[:-2]:
+            setattr(self, name, getattr(coupon, name))
+        self.minimum_cents = to_cents(coupon.minimum_amount)
+        self.maximum_discount_cents = to_cents(coupon.maximum_discount)
+
+    def check(self, subtotal_cents, now=None):
+        """Raise ``CouponError`` unless the coupon applies to the subtotal."""
+        now = now or timezone.now()
+        if not self.is_active or not self.valid_from <= now <= self.valid_until:
+            raise CouponError("Coupon is invalid or has expired.")
+        if subtotal_cents < self.minimum_cents:
+            raise CouponError(
+                f"Coupon requires a minimum order amount of {self.minimum_amount}."
+            )
+
+    def discount_for(self, subtotal_cents, shipping_cents=0):
+        """Discount in integer cents granted for the given amounts."""
+        if self.discount_type == 'percentage':
+            discount = percent_of(subtotal_cents, self.discount_value)
+        elif self.discount_type == 'fixed':
+            discount = to_cents(self.discount_value)
+        else:
+            discount = shipping_cents
+
+        if self.maximum_discount_cents is not None:
+            discount = min(discount, self.maximum_discount_cents)
+        return min(discount, subtotal_cents + shipping_cents)
+
+
+class CouponTable:
+    """Per-process table of compiled coupons tagged with the shared version."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._checked_at = 0.0
+        self._coupons = {}
+
+    def _current_version(self):
+        now = time.monotonic()
+        if self._version is not None and now - self._checked_at < VERSION_CHECK_INTERVAL:
+            return self._version
+
+        version = get_version(NAMESPACE)
+        with self._lock:
+            if version != self._version:
+                self._coupons = {}
+                self._version = version
+            self._checked_at = now
+        return version
+
+    def invalidate(self):
+        with self._lock:
+            self._version = None
+            self._coupons = {}
+
+    def get(self, code):
+        """Return the compiled coupon for ``code`` or ``None``."""
+        code = code.strip().upper()
+        if not code:
+            return None
+
+        version = self._current_version()
+        compiled = self._coupons.get(code)
+        if compiled is not None:
+            record_cache(NAMESPACE, hit=True)
+            return compiled
+
+        miss_key = f'{NAMESPACE}:v{version}:miss:{code}'
+        if cache.get(miss_key):
+            record_cache(NAMESPACE, hit=True)
+            return None
+
+        record_cache(NAMESPACE, hit=False)
+        coupon = Coupon.objects.filter(code__iexact=code).first()
+        if coupon is None:
+            cache.set(miss_key, 1, MISS_TTL)
+            return None
+
+        compiled = CompiledCoupon(coupon)
+        with self._lock:
+            if self._version == version:
+                self._coupons[code] = compiled
+        return compiled
+
+
+coupon_table = CouponTable()
+
+
+def invalidate_coupons():
+    """Invalidate compiled coupons in every worker."""
+    bump_version(NAMESPACE)
+    coupon_table.invalidate()
+
+
+@receiver(post_save, sender=Coupon)
+@receiver(post_delete, sender=Coupon)
+def _coupon_changed(sender, **kwargs):
+    transaction.on_commit(invalidate_coupons)
+
+
+def get_coupon(code):
+    """Look up an active coupon by code through the compiled table."""
+    return coupon_table.get(code)
+
+
+def redeem(coupon, user, order, discount_amount):
+    """
+    Record a redemption of ``coupon`` by ``user`` for ``order``.
+
+    Must run inside the checkout transaction so a failed redemption rolls the
+    order back. Raises ``CouponError`` when a limit has been reached.
+    """
+    now = timezone.now()
+    within_limit = Q(usage_limit__isnull=True) | Q(usage_count__lt=F('usage_limit'))
+    updated = Coupon.objects.filter(
+        within_limit,
+        pk=coupon.id,
+        is_active=True,
+        valid_from__lte=now,
+        valid_until__gte=now,
+    ).update(usage_count=F('usage_count') + 1)
+    if not updated:
+        raise CouponError("Coupon is no longer available.")
+
+    # Count every redemption, limited or not, so a limit added later starts from the truth
+    counters = CouponUserCounter.objects.filter(coupon_id=coupon.id, user=user)
+    limit = coupon.user_usage_limit
+    if limit is not None:
+        counters = counters.filter(usage_count__lt=limit)
+    updated = counters.update(usage_count=F('usage_count') + 1, updated_at=now)
+    if not updated:
+        if limit == 0:
+            raise CouponError("Coupon usage limit reached for this account.")
+        try:
+            with transaction.atomic():
+                CouponUserCounter.objects.create(coupon_id=coupon.id, user=user, usage_count=1)
+        except IntegrityError:
+            # The counter exists: at the limit, or just created by a concurrent redemption
+            if not counters.update(usage_count=F('usage_count') + 1, updated_at=now):
+                raise CouponError("Coupon usage limit reached for this account.")
+
+    return CouponUsage.objects.create(
+        coupon_id=coupon.id, user=user, order=order, discount_amount=discount_amount
+    )
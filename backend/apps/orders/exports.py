@@ -0,0 +1,64 @@
+"""
+Order extracts: one row per order item with its order columns.
+"""
+from eshotry.exports import ExportError, as_text, parse_watermark
+from .models import Order, OrderItem
+
+COLUMNS = (
+    ('order_id', as_text('order_id')),
+    ('order_number', 'order__order_number'),
+    ('user_email', 'order__user__email'),
+    ('status', 'order__status'),
+    ('payment_status', 'order__payment_status'),
+    ('payment_method', 'order__payment_method'),
+    ('order_subtotal', 'order__subtotal'),
+    ('order_tax', 'order__tax_amount'),
+    ('order_shipping', 'order__shipping_cost'),
+    ('order_discount', 'order__discount_amount'),
+    ('order_total', 'order__total_amount'),
+    ('shipping_method', 'order__shipping_method'),
+    ('tracking_number', 'order__tracking_number'),
+    ('order_created_at', 'order__created_at'),
+    ('updated_at', 'order__updated_at'),
+    ('item_id', as_text('id')),
+    ('product_id', as_text('product_id')),
+    ('product_sku', 'product_sku'),
+    ('product_name', 'product_name'),
+    ('variant_id', as_text('variant_id')),
+    ('variant_info', 'variant_info'),
+    ('quantity', 'quantity'),
+    ('unit_price', 'unit_price'),
+    ('total_price', 'total_price'),
+    ('is_returned', 'is_returned'),
+)
+
+HEADER = tuple(name for name, _ in COLUMNS)
+WATERMARK_COLUMNS = (HEADER.index('updated_at'),)
+
+
+def order_rows(status=None, payment_status=None, created_after=None,
+               created_before=None, updated_after=None):
+    """Queryset of order item rows, oldest ``updated_at`` first."""
+    valid_statuses = {choice[0] for choice in Order.STATUS_CHOICES}
+    valid_payment_statuses = {choice[0] for choice in Order.PAYMENT_STATUS_CHOICES}
+    if status and status not in valid_statuses:
+        raise ExportError(f'Invalid status: {status}')
+    if payment_status and payment_status not in valid_payment_statuses:
+        raise ExportError(f'Invalid payment status: {payment_status}')
+
+    queryset = OrderItem.objects.all()
+    if status:
+        queryset = queryset.filter(order__status=status)
+    if payment_status:
+        queryset = queryset.filter(order__payment_status=payment_status)
+    for value, lookup in ((created_after, 'order__created_at__gte'),
+                          (created_before, 'order__created_at__lt'),
+                          (updated_after, 'order__updated_at__gte')):
+        value = parse_watermark(value)
+        if value:
+            queryset = queryset.filter(**{lookup: value})
+
+    return (
+        queryset.order_by('order__updated_at', 'order_id', 'id')
+        .values_list(*(lookup for _, lookup in COLUMNS))
+    )
@@ -0,0 +1,112 @@
+"""
+Benchmark checkout throughput at several levels of concurrency.
+"""
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+
+from apps.products.models import Product
+from apps.users.models import User
+from apps.orders.models import Cart, CartItem
+from apps.orders.services import checkout
+
+SHIPPING_ADDRESS = {
+    'full_name': 'Benchmark Client',
+    'address_line_1': '1 Load Test Way',
+    'city': 'Dhaka',
+    'state': 'Dhaka',
+    'postal_code': '1000',
+    'country': 'BD',
+}
+
+
+class Command(BaseCommand):
+    help = 'Report checkout orders per second at 1, 10 and 50 concurrent clients.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, nargs='+', default=[1, 10, 50])
+        parser.add_argument('--orders-per-client', type=int, default=20)
+        parser.add_argument('--items-per-order', type=int, default=3)
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            self.stderr.write(self.style.WARNING(
+                f'Running against {connection.vendor}; numbers are only meaningful on Postgres.'
+            ))
+
+        products = list(
+            Product.objects.filter(status='active').values_list('id', flat=True)[:200]
+        )
+        if len(products) < options['items_per_order']:
+            raise CommandError('Not enough active products; seed the catalog first.')
+
+        for clients in options['clients']:
+            users = self._users(clients)
+            elapsed, completed, errors = self._run(
+                users, products, options['orders_per_client'], options['items_per_order']
+            )
+            rate = completed / elapsed if elapsed else 0
+            self.stdout.write(
+                f'clients={clients:<4} orders={completed:<6} errors={errors:<4} '
+                f'elapsed={elapsed:.2f}s orders/s={rate:.1f}'
+            )
+
+    def _users(self, count):
+        users = []
+        for i in range(count):
+            user, _ = User.objects.get_or_create(
+                email=f'bench-checkout-{i}@example.com',
+                defaults={'username': f'bench-checkout-{i}'},
+            )
+            Cart.objects.get_or_create(user=user)
+            users.append(user)
+        return users
+
+    def _run(self, users, products, orders_per_client, items_per_order):
+        barrier = threading.Barrier(len(users) + 1)
+        results = []
+        lock = threading.Lock()
+
+        def client(index, user):
+            completed = errors = 0
+            cart = Cart.objects.get(user=user)
+            barrier.wait()
+            try:
+                for n in range(orders_per_client):
+                    start = (index * orders_per_client + n) % len(products)
+                    chosen = [
+                        products[(start + k) % len(products)] for k in range(items_per_order)
+                    ]
+                    CartItem.objects.bulk_create([
+                        CartItem(cart=cart, product_id=product_id, quantity=1)
+                        for product_id in chosen
+                    ])
+                    try:
+                        checkout(user, SHIPPING_ADDRESS)
+                        completed += 1
+                    except Exception:
+                        cart.items.all().delete()
+                        errors += 1
+            finally:
+                with lock:
+                    results.append((completed, errors))
+                connections.close_all()
+
+        threads = [
+            threading.Thread(target=client, args=(i, user)) for i, user in enumerate(users)
+        ]
+        for thread in threads:
+            thread.start()
+        barrier.wait()
+        started = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        return (
+            elapsed,
+            sum(completed for completed, _ in results),
+            sum(errors for _, errors in results),
+        )
@@ -0,0 +1,64 @@
+"""
+Micro-benchmarks for Decimal vs integer-cents pricing arithmetic.
+"""
+import random
+import timeit
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from rest_framework import serializers
+
+from eshotry.money import format_cents, percent_of, percent_off, to_cents
+
+
+class Command(BaseCommand):
+    help = 'Compare Decimal and integer-cents arithmetic on the pricing hot paths.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--items', type=int, default=10_000)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        count = options['items']
+        base = [Decimal(rng.randint(500, 50000)).scaleb(-2) for _ in range(count)]
+        sale = [b - Decimal(rng.randint(0, 400)).scaleb(-2) for b in base]
+        adjust = [Decimal(rng.randint(0, 900)).scaleb(-2) for _ in range(count)]
+        qty = [rng.randint(1, 5) for _ in range(count)]
+        base_c = [to_cents(b) for b in base]
+        sale_c = [to_cents(s) for s in sale]
+        adjust_c = [to_cents(a) for a in adjust]
+
+        decimal_field = serializers.DecimalField(max_digits=10, decimal_places=2)
+
+        cases = [
+            (
+                'discount_percentage',
+                lambda: [round(((b - s) / b) * 100) for b, s in zip(base, sale)],
+                lambda: [percent_off(b, s) for b, s in zip(base_c, sale_c)],
+            ),
+            (
+                'cart_subtotal',
+                lambda: sum((s + a) * q for s, a, q in zip(sale, adjust, qty)),
+                lambda: sum((s + a) * q for s, a, q in zip(sale_c, adjust_c, qty)),
+            ),
+            (
+                'coupon_percentage',
+                lambda: [(b * 12 / 100).quantize(Decimal('0.01')) for b in base],
+                lambda: [percent_of(b, 12) for b in base_c],
+            ),
+            (
+                'serialize',
+                lambda: [decimal_field.to_representation(b) for b in base],
+                lambda: [format_cents(b) for b in base_c],
+            ),
+        ]
+
+        self.stdout.write(f'{"case":<22}{"decimal ms":>12}{"cents ms":>12}{"speedup":>10}')
+        for name, decimal_fn, cents_fn in cases:
+            decimal_ms = min(timeit.repeat(decimal_fn, number=1, repeat=options['repeat'])) * 1000
+            cents_ms = min(timeit.repeat(cents_fn, number=1, repeat=options['repeat'])) * 1000
+            self.stdout.write(
+                f'{name:<22}{decimal_ms:>12.2f}{cents_ms:>12.2f}{decimal_ms / cents_ms:>9.1f}x'
+            )
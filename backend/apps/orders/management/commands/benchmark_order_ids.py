@@ -0,0 +1,71 @@
+"""
+Compare uuid4 and UUIDv7 primary keys for insert throughput and index size.
+"""
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from eshotry.ids import snowflake_order_number, uuid7
+
+GENERATORS = {
+    'uuid4': uuid.uuid4,
+    'uuid7': uuid7,
+}
+
+
+class Command(BaseCommand):
+    help = 'Benchmark insert throughput and primary key index size for uuid4 vs UUIDv7.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000_000)
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('This benchmark needs PostgreSQL (pg_relation_size).')
+
+        rows, batch_size = options['rows'], options['batch_size']
+        for name, generate in GENERATORS.items():
+            elapsed, index_bytes = self._run(name, generate, rows, batch_size)
+            self.stdout.write(
+                f'{name:<6} rows={rows} elapsed={elapsed:.2f}s '
+                f'rows/s={rows / elapsed:,.0f} pkey_index={index_bytes / 1024 / 1024:.1f}MB'
+            )
+
+        started = time.perf_counter()
+        numbers = {snowflake_order_number() for _ in range(rows)}
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f'order numbers: generated={rows} unique={len(numbers)} '
+            f'per_s={rows / elapsed:,.0f}'
+        )
+
+    def _run(self, name, generate, rows, batch_size):
+        table = f'bench_ids_{name}'
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP TABLE IF EXISTS {table}')
+            cursor.execute(
+                f'CREATE TABLE {table} ('
+                f'id uuid PRIMARY KEY, '
+                f'created_at timestamptz NOT NULL DEFAULT now())'
+            )
+            try:
+                started = time.perf_counter()
+                remaining = rows
+                while remaining:
+                    size = min(batch_size, remaining)
+                    placeholders = ','.join(['(%s)'] * size)
+                    cursor.execute(
+                        f'INSERT INTO {table} (id) VALUES {placeholders}',
+                        [generate() for _ in range(size)],
+                    )
+                    remaining -= size
+                elapsed = time.perf_counter() - started
+
+                cursor.execute('SELECT pg_relation_size(%s)', [f'{table}_pkey'])
+                index_bytes = cursor.fetchone()[0]
+            finally:
+                cursor.execute(f'DROP TABLE IF EXISTS {table}')
+        return elapsed, index_bytes
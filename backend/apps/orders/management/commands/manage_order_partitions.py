@@ -0,0 +1,71 @@
+"""
+Create future order partitions and archive old months.
+"""
+from datetime import date, datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from apps.orders.partitions import (
+    PARTITIONED_TABLES, PartitionError, add_months, archive_month, attached_months,
+    ensure_partitions, is_partitioned, month_start
+)
+
+
+class Command(BaseCommand):
+    help = 'Create monthly order partitions ahead of time and archive old months.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--months-ahead', type=int, help='Partitions to keep ready after the current month')
+        parser.add_argument(
+            '--archive-before',
+            help='YYYY-MM; archive and detach every month older than this one',
+        )
+        parser.add_argument(
+            '--keep-months', type=int,
+            help='Archive every month older than this many months before the current one',
+        )
+        parser.add_argument('--drop', action='store_true', help='Drop archived partitions instead of detaching only')
+        parser.add_argument('--list', action='store_true', help='List attached partitions')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('Order partitioning requires PostgreSQL.')
+
+        created = ensure_partitions(options['months_ahead'])
+        for name in created:
+            self.stdout.write(f'Created partition {name}')
+
+        cutoff = self._cutoff(options)
+        if cutoff:
+            with connection.cursor() as cursor:
+                months = [month for month in attached_months(cursor, 'orders') if month < cutoff]
+            for month in months:
+                try:
+                    path, count = archive_month(month, drop=options['drop'])
+                except PartitionError as e:
+                    raise CommandError(str(e))
+                self.stdout.write(self.style.SUCCESS(
+                    f'Archived {count} orders from {month:%Y-%m} to {path}'
+                ))
+
+        if options['list']:
+            with connection.cursor() as cursor:
+                for table in PARTITIONED_TABLES:
+                    if not is_partitioned(cursor, table):
+                        self.stdout.write(f'{table}: not partitioned')
+                        continue
+                    months = ', '.join(f'{month:%Y-%m}' for month in attached_months(cursor, table))
+                    self.stdout.write(f'{table}: {months}')
+
+    def _cutoff(self, options):
+        if options['archive_before'] and options['keep_months'] is not None:
+            raise CommandError('Use either --archive-before or --keep-months.')
+        if options['archive_before']:
+            try:
+                return month_start(datetime.strptime(options['archive_before'], '%Y-%m'))
+            except ValueError:
+                raise CommandError('--archive-before must be YYYY-MM.')
+        if options['keep_months'] is not None:
+            return add_months(month_start(date.today()), -options['keep_months'])
+        return None
@@ -0,0 +1,54 @@
+# Generated by Django 4.2.7 on 2026-10-19 01:40
+
+from django.db import migrations, models
+import eshotry.ids
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='cart',
+            name='id',
+            field=models.UUIDField(default=eshotry.ids.primary_key, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='cartitem',
+            name='id',
+            field=models.UUIDField(default=eshotry.ids.primary_key, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='coupon',
+            name='id',
+            field=models.UUIDField(default=eshotry.ids.primary_key, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='couponusage',
+            name='id',
+            field=models.UUIDField(default=eshotry.ids.primary_key, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='id',
+            field=models.UUIDField(default=eshotry.ids.primary_key, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='orderitem',
+            name='id',
+            field=models.UUIDField(default=eshotry.ids.primary_key, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='orderstatushistory',
+            name='id',
+            field=models.UUIDField(default=eshotry.ids.primary_key, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='shippingrate',
+            name='id',
+            field=models.UUIDField(default=eshotry.ids.primary_key, editable=False, primary_key=True, serialize=False),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 4.2.7 on 2026-10-19 01:41
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import eshotry.ids
+
+
+def backfill_counters(apps, schema_editor):
+    CouponUsage = apps.get_model('orders', 'CouponUsage')
+    CouponUserCounter = apps.get_model('orders', 'CouponUserCounter')
+    totals = CouponUsage.objects.values('coupon_id', 'user_id').annotate(
+        total=models.Count('id')
+    )
+    CouponUserCounter.objects.bulk_create(
+        (
+            CouponUserCounter(
+                coupon_id=row['coupon_id'], user_id=row['user_id'], usage_count=row['total']
+            )
+            for row in totals.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('orders', '0002_uuid7_primary_keys'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CouponUserCounter',
+            fields=[
+                ('id', models.UUIDField(default=eshotry.ids.primary_key, editable=False, primary_key=True, serialize=False)),
+                ('usage_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('coupon', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='user_counters', to='orders.coupon')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='coupon_counters', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Coupon User Counter',
+                'verbose_name_plural': 'Coupon User Counters',
+                'db_table': 'coupon_user_counters',
+                'unique_together': {('coupon', 'user')},
+            },
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,162 @@
+# Generated by Django 4.2.7 on 2026-10-19 01:54
+
+from datetime import date, datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+# Frozen copy of the conversion: it must keep doing what it did when this
+# migration was written, whatever apps.orders.partitions becomes.
+PARTITIONED_TABLES = ('orders', 'order_items', 'order_status_history')
+PARTITION_KEY = 'created_at'
+MONTHS_AHEAD = 3
+
+
+def month_start(value):
+    return date(value.year, value.month, 1)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def bound(month):
+    return datetime(month.year, month.month, 1, tzinfo=dt_timezone.utc).isoformat()
+
+
+def is_partitioned(cursor, table):
+    cursor.execute(
+        "SELECT c.relkind FROM pg_class c "
+        "JOIN pg_namespace n ON n.oid = c.relnamespace "
+        "WHERE c.relname = %s AND n.nspname = current_schema()",
+        [table],
+    )
+    row = cursor.fetchone()
+    return bool(row) and row[0] == 'p'
+
+
+def create_partition(cursor, table, month):
+    cursor.execute(
+        f'CREATE TABLE IF NOT EXISTS "{table}_p{month:%Y_%m}" '
+        f'PARTITION OF "{table}" FOR VALUES FROM (%s) TO (%s)',
+        [bound(month), bound(add_months(month, 1))],
+    )
+
+
+def partition_table(cursor, table):
+    legacy = f'{table}_unpartitioned'
+
+    cursor.execute('SELECT current_schema()')
+    qualified_legacy = f'{cursor.fetchone()[0]}.{legacy}'
+    cursor.execute(f'ALTER TABLE "{table}" RENAME TO "{legacy}"')
+    cursor.execute(
+        "SELECT indexname, indexdef FROM pg_indexes "
+        "WHERE tablename = %s AND schemaname = current_schema()",
+        [legacy],
+    )
+    indexes = cursor.fetchall()
+    cursor.execute(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = %s::regclass AND contype = 'f'",
+        [legacy],
+    )
+    foreign_keys = cursor.fetchall()
+
+    cursor.execute(
+        f'CREATE TABLE "{table}" (LIKE "{legacy}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS) '
+        f'PARTITION BY RANGE ("{PARTITION_KEY}")'
+    )
+
+    for name, definition in indexes:
+        cursor.execute(f'ALTER INDEX "{name}" RENAME TO "{name[:55]}_legacy"')
+        definition = definition.replace(f' ON {qualified_legacy} ', f' ON "{table}" ')
+        if name == f'{table}_pkey':
+            cursor.execute(
+                f'ALTER TABLE "{table}" ADD CONSTRAINT "{name}" '
+                f'PRIMARY KEY (id, "{PARTITION_KEY}")'
+            )
+        elif definition.startswith('CREATE UNIQUE INDEX'):
+            # Unique indexes on a partitioned table must include the partition key
+            cursor.execute(definition[:-1] + f', "{PARTITION_KEY}")')
+        else:
+            cursor.execute(definition)
+
+    for name, definition in foreign_keys:
+        referenced = definition.split('REFERENCES ', 1)[1].split('(', 1)[0].strip().strip('"')
+        cursor.execute(f'ALTER TABLE "{legacy}" RENAME CONSTRAINT "{name}" TO "{name[:55]}_legacy"')
+        if referenced not in PARTITIONED_TABLES:
+            cursor.execute(f'ALTER TABLE "{table}" ADD CONSTRAINT "{name}" {definition}')
+
+    cursor.execute(f'SELECT min("{PARTITION_KEY}") FROM "{legacy}"')
+    oldest = cursor.fetchone()[0]
+    month = month_start(oldest or date.today())
+    last = add_months(month_start(date.today()), MONTHS_AHEAD)
+    while month <= last:
+        create_partition(cursor, table, month)
+        month = add_months(month, 1)
+
+    cursor.execute(f'INSERT INTO "{table}" SELECT * FROM "{legacy}"')
+
+
+def partition_tables(apps, schema_editor):
+    """Convert the order tables into monthly partitioned tables in place."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        converted = []
+        for table in PARTITIONED_TABLES:
+            if not is_partitioned(cursor, table):
+                partition_table(cursor, table)
+                converted.append(table)
+        for table in reversed(converted):
+            cursor.execute(f'DROP TABLE "{table}_unpartitioned" CASCADE')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('orders', '0003_coupon_user_counters'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='couponusage',
+            name='order',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='coupon_usages', to='orders.order'),
+        ),
+        migrations.AlterField(
+            model_name='orderitem',
+            name='order',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='items', to='orders.order'),
+        ),
+        migrations.AlterField(
+            model_name='orderstatushistory',
+            name='order',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='status_history', to='orders.order'),
+        ),
+        migrations.CreateModel(
+            name='ArchivedOrder',
+            fields=[
+                ('id', models.UUIDField(editable=False, primary_key=True, serialize=False)),
+                ('order_number', models.CharField(max_length=20, unique=True)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('confirmed', 'Confirmed'), ('processing', 'Processing'), ('shipped', 'Shipped'), ('delivered', 'Delivered'), ('cancelled', 'Cancelled'), ('refunded', 'Refunded')], max_length=20)),
+                ('payment_status', models.CharField(choices=[('pending', 'Pending'), ('paid', 'Paid'), ('failed', 'Failed'), ('refunded', 'Refunded'), ('partially_refunded', 'Partially Refunded')], max_length=20)),
+                ('total_amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('created_at', models.DateTimeField()),
+                ('archive_month', models.DateField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_orders', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Archived Order',
+                'verbose_name_plural': 'Archived Orders',
+                'db_table': 'archived_orders',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['user', '-created_at'], name='archived_or_user_id_413cf4_idx'), models.Index(fields=['archive_month'], name='archived_or_archive_ec254d_idx')],
+            },
+        ),
+        migrations.RunPython(partition_tables, migrations.RunPython.noop),
+    ]
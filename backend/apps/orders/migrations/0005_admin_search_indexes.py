@@ -0,0 +1,28 @@
+from django.db import migrations
+
+SEARCH_INDEXES = [
+    ('orders_order_number_upper_trgm', 'orders', 'order_number'),
+]
+
+
+def create_indexes(apps, schema_editor):
+    from eshotry.admin_utils import create_search_indexes
+
+    create_search_indexes(schema_editor, SEARCH_INDEXES)
+
+
+def drop_indexes(apps, schema_editor):
+    from eshotry.admin_utils import drop_search_indexes
+
+    drop_search_indexes(schema_editor, SEARCH_INDEXES)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0004_partition_order_tables'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 4.2.7 on 2026-10-19 03:00
+
+from django.db import migrations, models
+
+
+ORDER_NUMBER_TRIGGER = '''
+CREATE OR REPLACE FUNCTION reserve_order_number() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' THEN
+        IF NEW.order_number = OLD.order_number THEN
+            RETURN NULL;
+        END IF;
+        DELETE FROM order_numbers WHERE order_number = OLD.order_number AND order_id = OLD.id;
+    END IF;
+    INSERT INTO order_numbers (order_number, order_id, created_at)
+    VALUES (NEW.order_number, NEW.id, NEW.created_at);
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+DROP TRIGGER IF EXISTS orders_reserve_order_number ON orders;
+CREATE TRIGGER orders_reserve_order_number
+    AFTER INSERT OR UPDATE OF order_number ON orders
+    FOR EACH ROW EXECUTE FUNCTION reserve_order_number();
+'''
+
+DROP_ORDER_NUMBER_TRIGGER = '''
+DROP TRIGGER IF EXISTS orders_reserve_order_number ON orders;
+DROP FUNCTION IF EXISTS reserve_order_number();
+'''
+
+
+def reserve_order_numbers(apps, schema_editor):
+    """Record existing order numbers and keep ``order_numbers`` in sync with ``orders``."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        'INSERT INTO order_numbers (order_number, order_id, created_at) '
+        'SELECT order_number, id, created_at FROM orders '
+        'UNION ALL SELECT order_number, id, created_at FROM archived_orders '
+        'ON CONFLICT (order_number) DO NOTHING'
+    )
+    schema_editor.execute(ORDER_NUMBER_TRIGGER)
+
+
+def release_order_numbers(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_ORDER_NUMBER_TRIGGER)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0005_admin_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderNumber',
+            fields=[
+                ('order_number', models.CharField(max_length=20, primary_key=True, serialize=False)),
+                ('order_id', models.UUIDField()),
+                ('created_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Order Number',
+                'verbose_name_plural': 'Order Numbers',
+                'db_table': 'order_numbers',
+            },
+        ),
+        migrations.AddField(
+            model_name='archivedorder',
+            name='archive_offset',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.RunPython(reserve_order_numbers, release_order_numbers),
+    ]
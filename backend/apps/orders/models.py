@@ -1,18 +1,20 @@
 """
 Order models for EshoTry platform.
 """
-from django.db import models
+from django.db import IntegrityError, models, transaction
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator
-import uuid
+from eshotry.ids import order_number, primary_key
 
 User = get_user_model()
 
+ORDER_NUMBER_ATTEMPTS = 3
+
 
 class Cart(models.Model):
     """Shopping cart model."""
     
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=primary_key, editable=False)
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='cart')
     
     created_at = models.DateTimeField(auto_now_add=True)
@@ -45,7 +47,7 @@ class Cart(models.Model):
 class CartItem(models.Model):
     """Cart item model."""
     
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=primary_key, editable=False)
     cart = models.ForeignKey(Cart, on_delete=models.CASCADE, related_name='items')
     product = models.ForeignKey('products.Product', on_delete=models.CASCADE)
     variant = models.ForeignKey('products.ProductVariant', on_delete=models.CASCADE, null=True, blank=True)
@@ -94,6 +96,17 @@ class Order(models.Model):
         ('refunded', 'Refunded'),
     ]
     
+    # Allowed status changes, used by bulk transitions
+    STATUS_TRANSITIONS = {
+        'pending': {'confirmed', 'cancelled'},
+        'confirmed': {'processing', 'cancelled'},
+        'processing': {'shipped', 'cancelled'},
+        'shipped': {'delivered'},
+        'delivered': {'refunded'},
+        'cancelled': set(),
+        'refunded': set(),
+    }
+    
     PAYMENT_STATUS_CHOICES = [
         ('pending', 'Pending'),
         ('paid', 'Paid'),
@@ -102,7 +115,7 @@ class Order(models.Model):
         ('partially_refunded', 'Partially Refunded'),
     ]
     
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=primary_key, editable=False)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='orders')
     order_number = models.CharField(max_length=20, unique=True)
     
@@ -154,12 +167,23 @@ class Order(models.Model):
         return f"Order {self.order_number} - {self.user.email}"
     
     def save(self, *args, **kwargs):
-        if not self.order_number:
-            # Generate order number
-            import random
-            import string
-            self.order_number = ''.join(random.choices(string.ascii_uppercase + string.digits, k=10))
-        super().save(*args, **kwargs)
+        if self.order_number:
+            return super().save(*args, **kwargs)
+
+        # Snowflake numbers are unique per worker id; retry in case two
+        # workers were configured with the same id.
+        for attempt in range(ORDER_NUMBER_ATTEMPTS):
+            self.order_number = order_number()
+            try:
+                with transaction.atomic():
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                collided = (
+                    OrderNumber.objects.filter(order_number=self.order_number).exists()
+                    or Order.objects.filter(order_number=self.order_number).exists()
+                )
+                if not collided or attempt == ORDER_NUMBER_ATTEMPTS - 1:
+                    raise
     
     @property
     def can_be_cancelled(self):
@@ -172,11 +196,34 @@ class Order(models.Model):
         return self.payment_status == 'paid'
 
 
+class OrderNumber(models.Model):
+    """
+    Every order number ever issued.
+
+    ``orders`` is partitioned by ``created_at`` and can only enforce
+    ``(order_number, created_at)``; a trigger on ``orders`` inserts here so
+    numbers stay unique across partitions and the archive.
+    """
+    
+    order_number = models.CharField(max_length=20, primary_key=True)
+    order_id = models.UUIDField()
+    created_at = models.DateTimeField()
+    
+    class Meta:
+        db_table = 'order_numbers'
+        verbose_name = 'Order Number'
+        verbose_name_plural = 'Order Numbers'
+    
+    def __str__(self):
+        return self.order_number
+
+
 class OrderItem(models.Model):
     """Order item model."""
     
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='items')
+    id = models.UUIDField(primary_key=True, default=primary_key, editable=False)
+    # orders is partitioned by created_at, so the database cannot enforce this key
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='items', db_constraint=False)
     product = models.ForeignKey('products.Product', on_delete=models.CASCADE)
     variant = models.ForeignKey('products.ProductVariant', on_delete=models.CASCADE, null=True, blank=True)
     
@@ -218,7 +265,7 @@ class Coupon(models.Model):
         ('free_shipping', 'Free Shipping'),
     ]
     
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=primary_key, editable=False)
     code = models.CharField(max_length=20, unique=True)
     name = models.CharField(max_length=100)
     description = models.TextField(blank=True)
@@ -268,10 +315,10 @@ class Coupon(models.Model):
 class CouponUsage(models.Model):
     """Track coupon usage by users."""
     
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=primary_key, editable=False)
     coupon = models.ForeignKey(Coupon, on_delete=models.CASCADE, related_name='usages')
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='coupon_usages')
-    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='coupon_usages')
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='coupon_usages', db_constraint=False)
     discount_amount = models.DecimalField(max_digits=10, decimal_places=2)
     
     created_at = models.DateTimeField(auto_now_add=True)
@@ -290,11 +337,31 @@ class CouponUsage(models.Model):
         return f"{self.coupon.code} used by {self.user.email}"
 
 
+class CouponUserCounter(models.Model):
+    """Per-user redemption counter, maintained incrementally on redemption."""
+
+    id = models.UUIDField(primary_key=True, default=primary_key, editable=False)
+    coupon = models.ForeignKey(Coupon, on_delete=models.CASCADE, related_name='user_counters')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='coupon_counters')
+    usage_count = models.PositiveIntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'coupon_user_counters'
+        verbose_name = 'Coupon User Counter'
+        verbose_name_plural = 'Coupon User Counters'
+        unique_together = ['coupon', 'user']
+
+    def __str__(self):
+        return f"{self.coupon.code} x {self.usage_count} for {self.user.email}"
+
+
 class OrderStatusHistory(models.Model):
     """Track order status changes."""
     
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='status_history')
+    id = models.UUIDField(primary_key=True, default=primary_key, editable=False)
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='status_history', db_constraint=False)
     status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES)
     notes = models.TextField(blank=True)
     
@@ -314,10 +381,39 @@ class OrderStatusHistory(models.Model):
         return f"{self.order.order_number} - {self.status}"
 
 
+class ArchivedOrder(models.Model):
+    """Index entry for an order moved to the cold archive."""
+
+    id = models.UUIDField(primary_key=True, editable=False)
+    order_number = models.CharField(max_length=20, unique=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_orders')
+    status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES)
+    payment_status = models.CharField(max_length=20, choices=Order.PAYMENT_STATUS_CHOICES)
+    total_amount = models.DecimalField(max_digits=10, decimal_places=2)
+    created_at = models.DateTimeField()
+
+    archive_month = models.DateField()
+    archive_offset = models.BigIntegerField(null=True, blank=True)  # Gzip member holding the record
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'archived_orders'
+        verbose_name = 'Archived Order'
+        verbose_name_plural = 'Archived Orders'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at']),
+            models.Index(fields=['archive_month']),
+        ]
+
+    def __str__(self):
+        return f"Archived order {self.order_number}"
+
+
 class ShippingRate(models.Model):
     """Shipping rates configuration."""
     
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=primary_key, editable=False)
     name = models.CharField(max_length=100)
     description = models.TextField(blank=True)
     
@@ -0,0 +1,234 @@
+"""
+Monthly range partitioning and cold archive for order tables.
+
+``orders``, ``order_items`` and ``order_status_history`` are PostgreSQL tables
+partitioned by ``RANGE (created_at)`` with one partition per calendar month
+(``orders_p2025_01`` ...). Primary keys become ``(id, created_at)`` at the
+database level, so foreign keys *to* ``orders`` are not enforced by the
+database; UUIDv7 ids keep ``id`` unique in practice. Unique indexes must
+include the partition key too, so a trigger on ``orders`` records every order
+number in the unpartitioned ``order_numbers`` table, whose primary key keeps
+numbers globally unique.
+
+Old months are archived to gzipped JSON Lines files (one record per order
+with its items and status history, in the ``OrderDetailSerializer`` format),
+indexed by ``ArchivedOrder`` rows and then detached from the parent tables.
+Records are compressed ``ARCHIVE_BLOCK`` at a time into separate gzip members
+and each ``ArchivedOrder`` stores the offset of its member, so reading one
+order decompresses one block instead of the whole month.
+"""
+import gzip
+import json
+import os
+import zlib
+from datetime import date, datetime, timezone as dt_timezone
+from pathlib import Path
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+
+PARTITIONED_TABLES = ('orders', 'order_items', 'order_status_history')
+PARTITION_KEY = 'created_at'
+ARCHIVE_BLOCK = 64
+
+class PartitionError(Exception):
+    """Raised when a partition maintenance operation is not possible."""
+
+
+def partition_settings():
+    return getattr(settings, 'ORDER_PARTITIONS', {})
+
+
+def month_start(value):
+    return date(value.year, value.month, 1)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table, month):
+    return f'{table}_p{month:%Y_%m}'
+
+
+def _bound(month):
+    return datetime(month.year, month.month, 1, tzinfo=dt_timezone.utc).isoformat()
+
+
+def is_partitioned(cursor, table):
+    cursor.execute(
+        "SELECT c.relkind FROM pg_class c "
+        "JOIN pg_namespace n ON n.oid = c.relnamespace "
+        "WHERE c.relname = %s AND n.nspname = current_schema()",
+        [table],
+    )
+    row = cursor.fetchone()
+    return bool(row) and row[0] == 'p'
+
+
+def create_partition(cursor, table, month):
+    cursor.execute(
+        f'CREATE TABLE IF NOT EXISTS "{partition_name(table, month)}" '
+        f'PARTITION OF "{table}" FOR VALUES FROM (%s) TO (%s)',
+        [_bound(month), _bound(add_months(month, 1))],
+    )
+
+
+def attached_months(cursor, table):
+    """Months that currently have a partition attached to ``table``."""
+    cursor.execute(
+        "SELECT child.relname FROM pg_inherits i "
+        "JOIN pg_class parent ON parent.oid = i.inhparent "
+        "JOIN pg_class child ON child.oid = i.inhrelid "
+        "WHERE parent.relname = %s",
+        [table],
+    )
+    months = []
+    prefix = f'{table}_p'
+    for (name,) in cursor.fetchall():
+        if name.startswith(prefix):
+            year, month = name[len(prefix):].split('_')
+            months.append(date(int(year), int(month), 1))
+    return sorted(months)
+
+
+def ensure_partitions(months_ahead=None, using=connection):
+    """Create partitions for the current month and ``months_ahead`` after it."""
+    if using.vendor != 'postgresql':
+        return []
+    if months_ahead is None:
+        months_ahead = partition_settings().get('MONTHS_AHEAD', 3)
+
+    current = month_start(date.today())
+    created = []
+    with using.cursor() as cursor:
+        for table in PARTITIONED_TABLES:
+            if not is_partitioned(cursor, table):
+                continue
+            existing = set(attached_months(cursor, table))
+            for offset in range(months_ahead + 1):
+                month = add_months(current, offset)
+                if month not in existing:
+                    create_partition(cursor, table, month)
+                    created.append(partition_name(table, month))
+    return created
+
+
+def archive_path(month):
+    root = Path(partition_settings().get('ARCHIVE_ROOT', settings.BASE_DIR / 'archive' / 'orders'))
+    return root / f'{month:%Y-%m}.jsonl.gz'
+
+
+def archive_month(month, drop=False, chunk_size=500):
+    """
+    Archive every order created in ``month`` and detach its partitions.
+
+    Months must be archived oldest first so that no attached partition still
+    holds items or history of an order that has already been archived.
+    """
+    from .models import ArchivedOrder, Order, OrderItem, OrderStatusHistory
+    from .serializers import OrderDetailSerializer
+
+    month = month_start(month)
+    if month >= month_start(date.today()):
+        raise PartitionError('Only past months can be archived.')
+    if connection.vendor != 'postgresql':
+        raise PartitionError('Partition archiving requires PostgreSQL.')
+
+    with connection.cursor() as cursor:
+        attached = attached_months(cursor, 'orders')
+    if month not in attached:
+        raise PartitionError(f'No attached orders partition for {month:%Y-%m}.')
+    if attached[0] != month:
+        raise PartitionError(f'Archive {attached[0]:%Y-%m} first.')
+
+    start, end = _bound(month), _bound(add_months(month, 1))
+    orders = (
+        Order.objects.filter(created_at__gte=start, created_at__lt=end)
+        .prefetch_related('items', 'status_history')
+        .order_by('created_at')
+    )
+
+    path = archive_path(month)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix('.tmp')
+    index, lines = [], []
+    with open(tmp_path, 'wb') as handle:
+        for order in orders.iterator(chunk_size=chunk_size):
+            record = OrderDetailSerializer(order).data
+            lines.append(json.dumps(record, cls=DjangoJSONEncoder) + '\n')
+            index.append(ArchivedOrder(
+                id=order.id,
+                order_number=order.order_number,
+                user_id=order.user_id,
+                status=order.status,
+                payment_status=order.payment_status,
+                total_amount=order.total_amount,
+                created_at=order.created_at,
+                archive_month=month,
+            ))
+            if len(lines) == ARCHIVE_BLOCK:
+                _write_block(handle, lines, index[-len(lines):])
+                lines = []
+        if lines:
+            _write_block(handle, lines, index[-len(lines):])
+    os.replace(tmp_path, path)
+
+    with transaction.atomic():
+        ArchivedOrder.objects.bulk_create(index, batch_size=1000, ignore_conflicts=True)
+        ids = [entry.id for entry in index]
+        # Items and history written just after midnight on the last day of the
+        # month live in the next partition; remove them with their order.
+        for model in (OrderItem, OrderStatusHistory):
+            for i in range(0, len(ids), 1000):
+                model.objects.filter(created_at__gte=end, order_id__in=ids[i:i + 1000]).delete()
+
+        with connection.cursor() as cursor:
+            for table in PARTITIONED_TABLES:
+                name = partition_name(table, month)
+                cursor.execute(f'ALTER TABLE "{table}" DETACH PARTITION "{name}"')
+                if drop:
+                    cursor.execute(f'DROP TABLE "{name}"')
+
+    return path, len(index)
+
+
+def _write_block(handle, lines, entries):
+    # Concatenated gzip members are still one valid .gz file
+    offset = handle.tell()
+    handle.write(gzip.compress(''.join(lines).encode('utf-8')))
+    for entry in entries:
+        entry.archive_offset = offset
+
+
+def _read_block(path, offset):
+    decompressor = zlib.decompressobj(wbits=16 + zlib.MAX_WBITS)
+    data = []
+    with open(path, 'rb') as handle:
+        handle.seek(offset)
+        while not decompressor.eof:
+            chunk = handle.read(64 * 1024)
+            if not chunk:
+                break
+            data.append(decompressor.decompress(chunk))
+    return b''.join(data).decode('utf-8').splitlines()
+
+
+def _find(lines, needle):
+    for line in lines:
+        if line.startswith(needle):
+            return json.loads(line)
+    return None
+
+
+def load_archived_order(archived):
+    """Read the archived detail record of an ``ArchivedOrder`` entry."""
+    needle = '{' + f'"id": "{archived.id}"'
+    path = archive_path(archived.archive_month)
+    if archived.archive_offset is None:
+        # Archived before block offsets were recorded
+        with gzip.open(path, 'rt', encoding='utf-8') as handle:
+            return _find(handle, needle)
+    return _find(_read_block(path, archived.archive_offset), needle)
@@ -0,0 +1,81 @@
+"""
+Serializers for order-related models.
+"""
+from rest_framework import serializers
+from apps.products.serializers import CentsField
+from .models import Order, OrderItem, OrderStatusHistory
+
+
+class OrderItemSerializer(serializers.ModelSerializer):
+    """Serializer for order items."""
+
+    class Meta:
+        model = OrderItem
+        fields = [
+            'id', 'product', 'variant', 'product_name', 'product_sku',
+            'variant_info', 'quantity', 'unit_price', 'total_price',
+            'is_returned', 'created_at'
+        ]
+        read_only_fields = fields
+
+
+class OrderStatusHistorySerializer(serializers.ModelSerializer):
+    """Serializer for order status history entries."""
+
+    class Meta:
+        model = OrderStatusHistory
+        fields = ['id', 'status', 'notes', 'created_at']
+        read_only_fields = fields
+
+
+class OrderListSerializer(serializers.ModelSerializer):
+    """Lightweight serializer for order lists."""
+
+    class Meta:
+        model = Order
+        fields = [
+            'id', 'order_number', 'status', 'payment_status',
+            'total_amount', 'created_at'
+        ]
+        read_only_fields = fields
+
+
+class OrderDetailSerializer(serializers.ModelSerializer):
+    """Detailed serializer for a single order."""
+
+    items = OrderItemSerializer(many=True, read_only=True)
+    status_history = OrderStatusHistorySerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Order
+        fields = [
+            'id', 'order_number', 'status', 'payment_status',
+            'subtotal', 'tax_amount', 'shipping_cost', 'discount_amount',
+            'total_amount', 'shipping_address', 'billing_address',
+            'shipping_method', 'tracking_number', 'payment_method',
+            'notes', 'items', 'status_history', 'created_at',
+            'shipped_at', 'delivered_at'
+        ]
+        read_only_fields = fields
+
+
+class CheckoutSerializer(serializers.Serializer):
+    """Serializer for checkout requests."""
+
+    shipping_address = serializers.JSONField()
+    billing_address = serializers.JSONField(required=False)
+    coupon_code = serializers.CharField(max_length=20, required=False, allow_blank=True)
+    shipping_rate_id = serializers.UUIDField(required=False)
+    payment_method = serializers.CharField(max_length=50, required=False, allow_blank=True)
+    notes = serializers.CharField(required=False, allow_blank=True)
+
+
+class ShippingOptionSerializer(serializers.Serializer):
+    """Serializer for a single shipping quote."""
+
+    id = serializers.UUIDField()
+    name = serializers.CharField()
+    description = serializers.CharField()
+    cost = CentsField(source='cost_cents')
+    min_delivery_days = serializers.IntegerField()
+    max_delivery_days = serializers.IntegerField()
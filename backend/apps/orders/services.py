@@ -0,0 +1,276 @@
+"""
+Order services for EshoTry platform.
+"""
+import time
+from dataclasses import dataclass, field
+
+from django.db import transaction
+from django.db.models import Case, CharField, F, IntegerField, Value, When
+from django.utils import timezone
+
+from apps.products.cents import unit_cents
+from apps.products.models import Product
+from eshotry.money import from_cents
+from .coupons import CouponError, get_coupon, redeem
+from .models import Cart, Order, OrderItem, OrderStatusHistory
+from .shipping import quote_rate
+from .tasks import notify_status_change
+
+
+class CheckoutError(Exception):
+    """Raised when a cart cannot be converted into an order."""
+
+
+class TransitionError(Exception):
+    """Raised when a status transition is not allowed."""
+
+
+def _variant_info(variant):
+    if variant is None:
+        return None
+    return {
+        'size': variant.size,
+        'color': variant.color,
+        'color_hex': variant.color_hex,
+        'sku': variant.sku,
+    }
+
+
+def checkout(user, shipping_address, billing_address=None, coupon_code='',
+             shipping_rate_id=None, payment_method='', notes=''):
+    """
+    Convert the user's cart into an order inside a single transaction.
+
+    Products and variants are snapshotted with one joined query, order items
+    are written with ``bulk_create`` and ``Product.purchase_count`` is bumped
+    for every purchased product with one ``UPDATE``.
+    """
+    with transaction.atomic():
+        cart = Cart.objects.select_for_update().filter(user=user).first()
+        if cart is None:
+            raise CheckoutError("Cart is empty.")
+
+        cart_items = list(
+            cart.items.select_related('product', 'variant').annotate(unit_cents=unit_cents())
+        )
+        if not cart_items:
+            raise CheckoutError("Cart is empty.")
+
+        subtotal = 0
+        lines = []
+        quantities = {}
+        for item in cart_items:
+            product = item.product
+            if product.status != 'active':
+                raise CheckoutError(f"{product.name} is no longer available.")
+            if item.variant is not None and not item.variant.is_active:
+                raise CheckoutError(f"{item.variant} is no longer available.")
+
+            # Prices are summed in integer cents and converted once below
+            unit_price = item.unit_cents
+            total_price = unit_price * item.quantity
+            subtotal += total_price
+            quantities[product.pk] = quantities.get(product.pk, 0) + item.quantity
+            lines.append((item, unit_price, total_price))
+
+        # Lock the purchased products in primary key order before any insert
+        # so concurrent checkouts sharing products cannot deadlock on the
+        # purchase_count UPDATE. NO KEY UPDATE does not block FK checks.
+        list(
+            Product.objects.select_for_update(no_key=True)
+            .filter(pk__in=quantities).order_by('pk').values_list('pk', flat=True)
+        )
+
+        shipping_cost = 0
+        shipping_method = ''
+        if shipping_rate_id:
+            option = quote_rate(shipping_rate_id, subtotal)
+            if option is None:
+                raise CheckoutError("Shipping option is not available.")
+            shipping_cost = option['cost_cents']
+            shipping_method = option['name']
+
+        coupon = None
+        discount_amount = 0
+        if coupon_code:
+            coupon = get_coupon(coupon_code)
+            if coupon is None:
+                raise CheckoutError("Coupon is invalid or has expired.")
+            try:
+                coupon.check(subtotal)
+            except CouponError as e:
+                raise CheckoutError(str(e))
+            discount_amount = coupon.discount_for(subtotal, shipping_cost)
+
+        order = Order.objects.create(
+            user=user,
+            subtotal=from_cents(subtotal),
+            shipping_cost=from_cents(shipping_cost),
+            discount_amount=from_cents(discount_amount),
+            total_amount=from_cents(subtotal + shipping_cost - discount_amount),
+            shipping_address=shipping_address,
+            billing_address=billing_address or shipping_address,
+            shipping_method=shipping_method,
+            payment_method=payment_method,
+            notes=notes,
+        )
+
+        OrderItem.objects.bulk_create([
+            OrderItem(
+                order=order,
+                product=item.product,
+                variant=item.variant,
+                product_name=item.product.name,
+                product_sku=item.variant.sku if item.variant else item.product.sku,
+                variant_info=_variant_info(item.variant),
+                quantity=item.quantity,
+                unit_price=from_cents(unit_price),
+                total_price=from_cents(total_price),
+            )
+            for item, unit_price, total_price in lines
+        ])
+
+        if coupon is not None:
+            try:
+                redeem(coupon, user, order, order.discount_amount)
+            except CouponError as e:
+                raise CheckoutError(str(e))
+
+        OrderStatusHistory.objects.create(
+            order=order, status=order.status, notes='Order placed', created_by=user
+        )
+
+        Product.objects.filter(pk__in=quantities).update(
+            purchase_count=F('purchase_count') + Case(
+                *[When(pk=pk, then=Value(qty)) for pk, qty in quantities.items()],
+                default=Value(0),
+                output_field=IntegerField(),
+            )
+        )
+
+        cart.items.all().delete()
+
+    return order
+
+
+@dataclass
+class TransitionResult:
+    """Outcome of a bulk status transition."""
+
+    transitioned: int = 0
+    skipped: int = 0  # Orders that left a source status before they were locked
+    locked_ids: list = field(default_factory=list)  # Held by other transactions until the deadline
+    elapsed: float = 0.0
+
+    @property
+    def orders_per_second(self):
+        return self.transitioned / self.elapsed if self.elapsed else 0.0
+
+
+def _source_statuses(to_status):
+    if to_status not in dict(Order.STATUS_CHOICES):
+        raise TransitionError(f"Unknown order status '{to_status}'.")
+    sources = [
+        status for status, targets in Order.STATUS_TRANSITIONS.items()
+        if to_status in targets
+    ]
+    if not sources:
+        raise TransitionError(f"No status can transition to '{to_status}'.")
+    return sources
+
+
+def _transition_chunk(chunk, sources, to_status, tracking_numbers, user, notes, notify, result):
+    """Transition the unlocked orders of ``chunk``; returns the locked primary keys."""
+    with transaction.atomic():
+        rows = list(
+            Order.objects.select_for_update(skip_locked=True)
+            .filter(pk__in=chunk).values_list('pk', 'order_number', 'status')
+        )
+        seen = {pk for pk, _, _ in rows}
+        locked = [pk for pk in chunk if pk not in seen]
+        rows = [(pk, number) for pk, number, status in rows if status in sources]
+        result.skipped += len(seen) - len(rows)
+        if not rows:
+            return locked
+
+        now = timezone.now()
+        ids = [pk for pk, _ in rows]
+        changes = {'status': to_status, 'updated_at': now}
+        if to_status == 'shipped':
+            changes['shipped_at'] = now
+        elif to_status == 'delivered':
+            changes['delivered_at'] = now
+
+        tracked = [
+            When(pk=pk, then=Value(tracking_numbers[number]))
+            for pk, number in rows if number in tracking_numbers
+        ]
+        if tracked:
+            changes['tracking_number'] = Case(
+                *tracked, default=F('tracking_number'), output_field=CharField()
+            )
+
+        Order.objects.filter(pk__in=ids).update(**changes)
+        OrderStatusHistory.objects.bulk_create([
+            OrderStatusHistory(
+                order_id=pk, status=to_status, notes=notes, created_by=user
+            )
+            for pk in ids
+        ])
+
+        if notify:
+            order_ids = [str(pk) for pk in ids]
+            transaction.on_commit(
+                lambda order_ids=order_ids: notify_status_change.delay(order_ids, to_status)
+            )
+
+    result.transitioned += len(ids)
+    return locked
+
+
+def bulk_transition(queryset, to_status, tracking_numbers=None, user=None, notes='',
+                    chunk_size=1000, notify=True, lock_timeout=30.0, retry_interval=0.5):
+    """
+    Move every order in ``queryset`` that may legally reach ``to_status``.
+
+    Orders are processed in primary key order, ``chunk_size`` at a time. Each
+    chunk is one transaction: rows are locked (skipping rows another worker
+    holds), updated with a single ``UPDATE`` that also sets
+    ``shipped_at``/``delivered_at`` and per-order ``tracking_number`` values,
+    and their ``OrderStatusHistory`` rows are written with ``bulk_create``.
+    Customer notifications are queued once per chunk after commit.
+
+    Orders that were locked are retried every ``retry_interval`` seconds
+    until ``lock_timeout`` seconds after the first pass; the ones still
+    locked then are returned in ``locked_ids``.
+
+    ``tracking_numbers`` maps order numbers to tracking numbers.
+    """
+    sources = _source_statuses(to_status)
+    tracking_numbers = tracking_numbers or {}
+    result = TransitionResult()
+    started = time.perf_counter()
+    args = (sources, to_status, tracking_numbers, user, notes, notify, result)
+
+    locked = []
+    pks = queryset.filter(status__in=sources).order_by('pk').values_list('pk', flat=True)
+    last_pk = None
+    while True:
+        page = pks.filter(pk__gt=last_pk) if last_pk is not None else pks
+        chunk = list(page[:chunk_size])
+        if not chunk:
+            break
+        last_pk = chunk[-1]
+        locked += _transition_chunk(chunk, *args)
+
+    deadline = time.monotonic() + lock_timeout
+    while locked and time.monotonic() < deadline:
+        time.sleep(retry_interval)
+        locked = [
+            pk for start in range(0, len(locked), chunk_size)
+            for pk in _transition_chunk(locked[start:start + chunk_size], *args)
+        ]
+
+    result.locked_ids = locked
+    result.elapsed = time.perf_counter() - started
+    return result
@@ -0,0 +1,196 @@
+"""
+Shipping quote engine for EshoTry platform.
+
+The active ``ShippingRate`` rows are loaded once per process into NumPy arrays
+of integer cents and re-read only when the shared ``shipping_rates`` version
+is bumped (on any rate save or delete). A quote evaluates every rate for a
+cart in one vectorized pass; ``quote_many`` does the same for a batch of carts.
+"""
+import math
+import threading
+import time
+from decimal import Decimal
+
+import numpy as np
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from eshotry.cache_versions import bump_version, get_version
+from eshotry.metrics import record_cache
+from eshotry.money import from_cents, to_cents
+from .models import ShippingRate
+
+NAMESPACE = 'shipping_rates'
+VERSION_CHECK_INTERVAL = 1.0
+NO_LIMIT = np.iinfo(np.int64).max
+
+# Larger carts are rejected rather than overflowing the int64 cent arithmetic
+MAX_SUBTOTAL = Decimal('1000000000')
+MAX_WEIGHT_KG = 100000.0
+
+
+class RateTable:
+    """Column-oriented snapshot of the active shipping rates."""
+
+    def __init__(self, rates):
+        self.ids = [rate.id for rate in rates]
+        self.names = [rate.name for rate in rates]
+        self.descriptions = [rate.description for rate in rates]
+        self.base = np.array([to_cents(r.base_rate) for r in rates], dtype=np.int64)
+        self.per_kg = np.array([to_cents(r.rate_per_kg) for r in rates], dtype=np.int64)
+        self.min_amount = np.array(
+            [to_cents(r.min_order_amount) for r in rates], dtype=np.int64
+        )
+        self.max_amount = np.array(
+            [NO_LIMIT if r.max_order_amount is None else to_cents(r.max_order_amount)
+             for r in rates],
+            dtype=np.int64,
+        )
+        self.free_threshold = np.array(
+            [to_cents(r.free_shipping_threshold) if r.free_shipping_threshold else NO_LIMIT
+             for r in rates],
+            dtype=np.int64,
+        )
+        self.min_days = np.array([r.min_delivery_days for r in rates], dtype=np.int32)
+        self.max_days = np.array([r.max_delivery_days for r in rates], dtype=np.int32)
+        self.index = {rate_id: i for i, rate_id in enumerate(self.ids)}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def evaluate(self, subtotal_cents, weights):
+        """
+        Price every rate for every cart.
+
+        ``subtotal_cents`` and ``weights`` are 1-D arrays with one entry per
+        cart. Returns ``(costs, eligible)``, both shaped ``(carts, rates)``.
+        """
+        subtotal = np.asarray(subtotal_cents, dtype=np.int64)[:, None]
+        weight = np.asarray(weights, dtype=np.float64)[:, None]
+
+        # Round half up to whole cents, like eshotry.money.multiply
+        costs = self.base + np.floor(self.per_kg * weight + 0.5).astype(np.int64)
+        costs = np.where(subtotal >= self.free_threshold, 0, costs)
+        eligible = (subtotal >= self.min_amount) & (subtotal <= self.max_amount)
+        return costs, eligible
+
+    def options(self, costs, eligible):
+        """Sorted quote dictionaries for a single cart row."""
+        candidates = np.flatnonzero(eligible)
+        order = candidates[np.lexsort((self.max_days[candidates], costs[candidates]))]
+        return [
+            {
+                'id': self.ids[i],
+                'name': self.names[i],
+                'description': self.descriptions[i],
+                'cost': from_cents(int(costs[i])),
+                'cost_cents': int(costs[i]),
+                'min_delivery_days': int(self.min_days[i]),
+                'max_delivery_days': int(self.max_days[i]),
+            }
+            for i in order
+        ]
+
+
+class RateCache:
+    """Per-process ``RateTable`` tagged with the shared version."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._table = None
+        self._version = None
+        self._checked_at = 0.0
+
+    def get(self):
+        now = time.monotonic()
+        if self._table is not None and now - self._checked_at < VERSION_CHECK_INTERVAL:
+            record_cache(NAMESPACE, hit=True)
+            return self._table
+
+        version = get_version(NAMESPACE)
+        with self._lock:
+            stale = self._table is None or version != self._version
+            if stale:
+                rates = list(ShippingRate.objects.filter(is_active=True))
+                self._table = RateTable(rates)
+                self._version = version
+            self._checked_at = now
+            record_cache(NAMESPACE, hit=not stale)
+            return self._table
+
+    def invalidate(self):
+        with self._lock:
+            self._table = None
+
+
+rate_cache = RateCache()
+
+
+def invalidate_rates():
+    """Drop the cached rate table in every worker."""
+    bump_version(NAMESPACE)
+    rate_cache.invalidate()
+
+
+@receiver(post_save, sender=ShippingRate)
+@receiver(post_delete, sender=ShippingRate)
+def _rate_changed(sender, **kwargs):
+    transaction.on_commit(invalidate_rates)
+
+
+class QuoteError(ValueError):
+    """The cart cannot be quoted."""
+
+
+def validate_cart(subtotal, weight):
+    """Raise ``QuoteError`` unless ``subtotal`` and ``weight`` can be quoted."""
+    subtotal = Decimal(subtotal)
+    if not subtotal.is_finite() or not 0 <= subtotal <= MAX_SUBTOTAL:
+        raise QuoteError('subtotal must be between 0 and %s.' % MAX_SUBTOTAL)
+    weight = float(weight)
+    if not math.isfinite(weight) or not 0 <= weight <= MAX_WEIGHT_KG:
+        raise QuoteError('weight must be between 0 and %g kg.' % MAX_WEIGHT_KG)
+
+
+def quote(subtotal, weight=0):
+    """Eligible shipping options for one cart, cheapest first."""
+    validate_cart(subtotal, weight)
+    table = rate_cache.get()
+    if not len(table):
+        return []
+    costs, eligible = table.evaluate([to_cents(subtotal)], [weight])
+    return table.options(costs[0], eligible[0])
+
+
+def quote_many(subtotals, weights=None):
+    """
+    Shipping options for many carts at once, e.g. to refresh cart estimates
+    after a rate change. Returns one sorted option list per cart.
+    """
+    if weights is None:
+        weights = np.zeros(len(subtotals))
+    for subtotal, weight in zip(subtotals, weights):
+        validate_cart(subtotal, weight)
+    table = rate_cache.get()
+    if not len(table):
+        return [[] for _ in subtotals]
+    costs, eligible = table.evaluate([to_cents(s) for s in subtotals], weights)
+    return [table.options(costs[i], eligible[i]) for i in range(len(subtotals))]
+
+
+def quote_rate(rate_id, subtotal_cents, weight=0):
+    """Cost of a specific rate for one cart, or ``None`` if it does not apply."""
+    table = rate_cache.get()
+    i = table.index.get(rate_id)
+    if i is None:
+        return None
+    costs, eligible = table.evaluate([subtotal_cents], [weight])
+    if not eligible[0, i]:
+        return None
+    return {
+        'id': table.ids[i],
+        'name': table.names[i],
+        'cost': from_cents(int(costs[0, i])),
+        'cost_cents': int(costs[0, i]),
+    }
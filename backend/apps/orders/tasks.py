@@ -0,0 +1,35 @@
+"""
+Celery tasks for order management.
+"""
+from celery import shared_task
+from django.conf import settings
+from django.core.mail import send_mass_mail
+
+from .models import Order
+from .partitions import ensure_partitions
+
+
+@shared_task(ignore_result=True)
+def notify_status_change(order_ids, status):
+    """Email customers whose orders moved to ``status``."""
+    orders = Order.objects.filter(
+        pk__in=order_ids, user__email_notifications=True
+    ).values_list('order_number', 'tracking_number', 'user__email')
+
+    label = dict(Order.STATUS_CHOICES).get(status, status)
+    sender = getattr(settings, 'DEFAULT_FROM_EMAIL', None)
+    messages = []
+    for order_number, tracking_number, email in orders.iterator(chunk_size=1000):
+        body = f"Your order {order_number} is now {label.lower()}."
+        if tracking_number:
+            body += f"\nTracking number: {tracking_number}"
+        messages.append((f"Order {order_number}: {label}", body, sender, [email]))
+
+    if messages:
+        send_mass_mail(messages, fail_silently=True)
+
+
+@shared_task(ignore_result=True)
+def ensure_order_partitions():
+    """Create monthly order partitions ahead of time."""
+    ensure_partitions()
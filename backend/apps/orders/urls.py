@@ -3,7 +3,15 @@ URL patterns for order management.
 """
 from django.urls import path
 
-# TODO: Add order views when implemented
+from . import views
+
 urlpatterns = [
-    # Placeholder - will be implemented later
+    # Checkout
+    path('checkout/', views.CheckoutView.as_view(), name='checkout'),
+    path('shipping/quote/', views.ShippingQuoteView.as_view(), name='shipping-quote'),
+
+    # Orders
+    path('export/', views.OrderExportView.as_view(), name='order-export'),
+    path('', views.OrderListView.as_view(), name='order-list'),
+    path('<str:order_number>/', views.OrderDetailView.as_view(), name='order-detail'),
 ]
@@ -1,4 +1,169 @@
 """
 Views for order management.
 """
-# TODO: Implement order views
+from decimal import Decimal, InvalidOperation
+
+from django.http import Http404
+from rest_framework import generics, permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from apps.products.cents import cart_total_cents
+from eshotry.exports import ITERATOR_CHUNK_SIZE, ExportError, export_response
+from eshotry.money import format_cents, from_cents, to_cents
+from . import exports
+from .models import ArchivedOrder, CartItem, Order
+from .partitions import load_archived_order
+from .serializers import (
+    CheckoutSerializer, OrderDetailSerializer, OrderListSerializer,
+    ShippingOptionSerializer
+)
+from .services import CheckoutError, checkout
+from .shipping import QuoteError, quote
+
+
+class OrderHistory:
+    """Live orders followed by archived ones, sliceable for pagination."""
+
+    def __init__(self, live, archived):
+        self.live = live
+        self.archived = archived
+        self._live_count = None
+
+    def live_count(self):
+        if self._live_count is None:
+            self._live_count = self.live.count()
+        return self._live_count
+
+    def count(self):
+        return self.live_count() + self.archived.count()
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            return self[key:key + 1][0]
+        start, stop = key.start or 0, key.stop
+        live_count = self.live_count()
+        results = list(self.live[start:stop]) if start < live_count else []
+        if stop is None or stop > live_count:
+            offset = max(start - live_count, 0)
+            end = None if stop is None else stop - live_count
+            results.extend(self.archived[offset:end])
+        return results
+
+
+class CheckoutView(APIView):
+    """Convert the current cart into an order."""
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        serializer = CheckoutSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            order = checkout(request.user, **serializer.validated_data)
+        except CheckoutError as e:
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        order = Order.objects.prefetch_related('items', 'status_history').get(pk=order.pk)
+        return Response(OrderDetailSerializer(order).data, status=status.HTTP_201_CREATED)
+
+
+class OrderListView(generics.ListAPIView):
+    """List the current user's orders."""
+
+    serializer_class = OrderListSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    query_budget = 5
+    filter_backends = []
+
+    def get_queryset(self):
+        return OrderHistory(
+            Order.objects.filter(user=self.request.user),
+            ArchivedOrder.objects.filter(user=self.request.user),
+        )
+
+
+class OrderDetailView(generics.RetrieveAPIView):
+    """Get order details."""
+
+    serializer_class = OrderDetailSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    query_budget = 6
+    lookup_field = 'order_number'
+
+    def get_queryset(self):
+        return Order.objects.filter(user=self.request.user).prefetch_related(
+            'items', 'status_history'
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        try:
+            return super().retrieve(request, *args, **kwargs)
+        except Http404:
+            archived = ArchivedOrder.objects.filter(
+                user=request.user, order_number=kwargs['order_number']
+            ).first()
+            record = archived and load_archived_order(archived)
+            if not record:
+                raise
+            return Response(record)
+
+
+class ShippingQuoteView(APIView):
+    """Quote every eligible shipping option for a cart."""
+
+    permission_classes = [permissions.AllowAny]
+    query_budget = 4
+
+    def get(self, request):
+        subtotal = request.query_params.get('subtotal')
+        weight = request.query_params.get('weight', 0)
+
+        try:
+            weight = float(weight)
+            if subtotal is not None:
+                subtotal = Decimal(subtotal)
+        except (ValueError, InvalidOperation):
+            return Response({'detail': 'Invalid subtotal or weight.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        if subtotal is None:
+            if not request.user.is_authenticated:
+                return Response({'detail': 'subtotal is required.'},
+                                status=status.HTTP_400_BAD_REQUEST)
+            subtotal = from_cents(cart_total_cents(CartItem.objects.filter(cart__user=request.user)))
+
+        try:
+            options = ShippingOptionSerializer(quote(subtotal, weight), many=True).data
+        except QuoteError as e:
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'subtotal': format_cents(to_cents(subtotal)), 'options': options})
+
+
+class OrderExportView(APIView):
+    """Stream order items as CSV or JSON Lines for finance extracts."""
+
+    permission_classes = [permissions.IsAdminUser]
+    query_budget = 2
+
+    def get(self, request):
+        params = request.query_params
+        file_format = params.get('export_format', 'csv')
+        try:
+            rows = exports.order_rows(
+                status=params.get('status'),
+                payment_status=params.get('payment_status'),
+                created_after=params.get('created_after'),
+                created_before=params.get('created_before'),
+                updated_after=params.get('updated_after'),
+            )
+            return export_response(
+                'orders', exports.HEADER, rows.iterator(chunk_size=ITERATOR_CHUNK_SIZE),
+                file_format=file_format, compress=params.get('gzip') in ('1', 'true'),
+            )
+        except ExportError as e:
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
@@ -1,12 +1,17 @@
 """
 Admin configuration for product models.
 """
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.db.models import Count, Q
 from django.utils.html import format_html
+
+from eshotry.admin_utils import LargeTableAdmin
 from .models import (
     Category, Brand, Product, ProductImage, ProductVariant,
-    ProductReview, ProductAttribute, ProductAttributeValue, Wishlist
+    ProductReview, ProductAttribute, ProductAttributeValue, Wishlist,
+    PriceRule, PriceHistory
 )
+from .pricing import cancel_rule
 
 
 class ProductImageInline(admin.TabularInline):
@@ -46,6 +51,7 @@ class CategoryAdmin(admin.ModelAdmin):
     
     list_display = ['name', 'parent', 'is_active', 'sort_order', 'product_count', 'created_at']
     list_filter = ['is_active', 'parent', 'created_at']
+    list_select_related = ['parent']
     search_fields = ['name', 'description']
     prepopulated_fields = {'slug': ('name',)}
     ordering = ['sort_order', 'name']
@@ -65,9 +71,15 @@ class CategoryAdmin(admin.ModelAdmin):
     
     readonly_fields = ['created_at', 'updated_at']
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            active_product_count=Count('products', filter=Q(products__status='active'))
+        )
+    
     def product_count(self, obj):
-        return obj.products.filter(status='active').count()
+        return obj.active_product_count
     product_count.short_description = 'Active Products'
+    product_count.admin_order_field = 'active_product_count'
 
 
 @admin.register(Brand)
@@ -94,13 +106,19 @@ class BrandAdmin(admin.ModelAdmin):
     
     readonly_fields = ['created_at', 'updated_at']
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            active_product_count=Count('products', filter=Q(products__status='active'))
+        )
+    
     def product_count(self, obj):
-        return obj.products.filter(status='active').count()
+        return obj.active_product_count
     product_count.short_description = 'Active Products'
+    product_count.admin_order_field = 'active_product_count'
 
 
 @admin.register(Product)
-class ProductAdmin(admin.ModelAdmin):
+class ProductAdmin(LargeTableAdmin):
     """Admin configuration for Product model."""
     
     list_display = [
@@ -111,7 +129,8 @@ class ProductAdmin(admin.ModelAdmin):
         'status', 'is_featured', 'is_virtual_tryon_enabled', 'gender',
         'brand', 'category', 'created_at'
     ]
-    search_fields = ['name', 'sku', 'description', 'brand__name']
+    list_select_related = ['brand', 'category']
+    search_fields = ['name', 'sku', 'brand__name']
     prepopulated_fields = {'slug': ('name',)}
     inlines = [ProductImageInline, ProductVariantInline, ProductAttributeValueInline]
     
@@ -158,12 +177,14 @@ class ProductAdmin(admin.ModelAdmin):
 
 
 @admin.register(ProductImage)
-class ProductImageAdmin(admin.ModelAdmin):
+class ProductImageAdmin(LargeTableAdmin):
     """Admin configuration for ProductImage model."""
     
     list_display = ['product', 'is_primary', 'sort_order', 'image_preview', 'created_at']
     list_filter = ['is_primary', 'created_at']
+    list_select_related = ['product__brand']
     search_fields = ['product__name', 'alt_text']
+    raw_id_fields = ['product']
     
     def image_preview(self, obj):
         if obj.image:
@@ -176,7 +197,7 @@ class ProductImageAdmin(admin.ModelAdmin):
 
 
 @admin.register(ProductVariant)
-class ProductVariantAdmin(admin.ModelAdmin):
+class ProductVariantAdmin(LargeTableAdmin):
     """Admin configuration for ProductVariant model."""
     
     list_display = [
@@ -184,7 +205,9 @@ class ProductVariantAdmin(admin.ModelAdmin):
         'final_price', 'is_active', 'created_at'
     ]
     list_filter = ['is_active', 'size', 'color', 'created_at']
+    list_select_related = ['product__brand']
     search_fields = ['product__name', 'sku', 'color']
+    raw_id_fields = ['product']
     
     fieldsets = (
         ('Product Information', {
@@ -213,7 +236,7 @@ class ProductVariantAdmin(admin.ModelAdmin):
 
 
 @admin.register(ProductReview)
-class ProductReviewAdmin(admin.ModelAdmin):
+class ProductReviewAdmin(LargeTableAdmin):
     """Admin configuration for ProductReview model."""
     
     list_display = [
@@ -223,7 +246,9 @@ class ProductReviewAdmin(admin.ModelAdmin):
     list_filter = [
         'rating', 'is_verified_purchase', 'is_approved', 'fit_feedback', 'created_at'
     ]
+    list_select_related = ['product__brand', 'user']
     search_fields = ['product__name', 'user__email', 'title', 'content']
+    raw_id_fields = ['product', 'user']
     readonly_fields = ['helpful_count', 'created_at', 'updated_at']
     
     fieldsets = (
@@ -269,19 +294,89 @@ class ProductAttributeAdmin(admin.ModelAdmin):
 
 
 @admin.register(ProductAttributeValue)
-class ProductAttributeValueAdmin(admin.ModelAdmin):
+class ProductAttributeValueAdmin(LargeTableAdmin):
     """Admin configuration for ProductAttributeValue model."""
     
     list_display = ['product', 'attribute', 'value']
     list_filter = ['attribute']
+    list_select_related = ['product__brand', 'attribute']
     search_fields = ['product__name', 'attribute__name', 'value']
+    raw_id_fields = ['product']
 
 
 @admin.register(Wishlist)
-class WishlistAdmin(admin.ModelAdmin):
+class WishlistAdmin(LargeTableAdmin):
     """Admin configuration for Wishlist model."""
     
     list_display = ['user', 'product', 'created_at']
     list_filter = ['created_at']
+    list_select_related = ['user', 'product__brand']
     search_fields = ['user__email', 'product__name']
+    raw_id_fields = ['user', 'product']
     readonly_fields = ['created_at']
+
+
+@admin.register(PriceRule)
+class PriceRuleAdmin(admin.ModelAdmin):
+    """Admin configuration for PriceRule model."""
+    
+    list_display = [
+        'name', 'scope', 'discount_type', 'discount_value',
+        'starts_at', 'ends_at', 'status', 'applied_at'
+    ]
+    list_filter = ['status', 'scope', 'discount_type', 'starts_at']
+    list_select_related = ['category', 'brand']
+    search_fields = ['name']
+    raw_id_fields = ['products']
+    actions = ['cancel_rules']
+    
+    fieldsets = (
+        ('Basic Information', {
+            'fields': ('name', 'status')
+        }),
+        ('Products', {
+            'fields': ('scope', 'category', 'brand', 'style', 'products')
+        }),
+        ('Discount', {
+            'fields': ('discount_type', 'discount_value')
+        }),
+        ('Schedule', {
+            'fields': ('starts_at', 'ends_at', 'applied_at', 'rolled_back_at')
+        }),
+        ('Timestamps', {
+            'fields': ('created_at', 'updated_at'),
+            'classes': ('collapse',)
+        }),
+    )
+    
+    readonly_fields = ['status', 'applied_at', 'rolled_back_at', 'created_at', 'updated_at']
+    
+    def get_readonly_fields(self, request, obj=None):
+        # A live rule's products and discount are recorded in its price history
+        if obj and obj.status != 'scheduled':
+            return [f.name for f in PriceRule._meta.fields if f.name != 'id'] + ['products']
+        return self.readonly_fields
+    
+    @admin.action(description='Cancel selected rules and restore prices')
+    def cancel_rules(self, request, queryset):
+        cancelled = 0
+        for rule in queryset.filter(status__in=['scheduled', 'active']):
+            cancel_rule(rule)
+            cancelled += 1
+        self.message_user(request, f'Cancelled {cancelled} price rules.', messages.SUCCESS)
+
+
+@admin.register(PriceHistory)
+class PriceHistoryAdmin(LargeTableAdmin):
+    """Admin configuration for PriceHistory model."""
+    
+    list_display = ['product', 'rule', 'action', 'old_sale_price', 'new_sale_price', 'created_at']
+    list_filter = ['action', 'created_at']
+    list_select_related = ['product__brand', 'rule']
+    search_fields = ['product__name', 'product__sku', 'rule__name']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,53 @@
+"""
+Integer-cents price expressions for EshoTry platform.
+
+List, detail and cart endpoints have the database compute prices as
+``bigint`` cents, so each row reaches Python as plain ints that are
+rendered once by ``CentsField`` (see ``eshotry.money``). The ``Decimal``
+model properties (``Product.current_price``, ``ProductVariant.final_price``,
+``CartItem.total_price``) stay for admin and one-off use.
+"""
+from django.db.models import BigIntegerField, Case, F, Sum, When
+from django.db.models.functions import Cast, Coalesce
+
+
+def cents(field):
+    """``field`` (a two-place ``DecimalField`` path) as integer cents."""
+    return Cast(F(field) * 100, BigIntegerField())
+
+
+def current_cents(prefix=''):
+    """``Product.current_price`` in cents: the sale price when set, else the base price."""
+    return Case(
+        When(**{f'{prefix}sale_price__gt': 0}, then=cents(f'{prefix}sale_price')),
+        default=cents(f'{prefix}base_price'),
+        output_field=BigIntegerField(),
+    )
+
+
+def with_price_cents(products):
+    """Annotate ``Product`` rows with ``base_cents``, ``sale_cents`` and ``current_cents``."""
+    return products.annotate(
+        base_cents=cents('base_price'),
+        sale_cents=cents('sale_price'),
+        current_cents=current_cents(),
+    )
+
+
+def with_final_cents(variants):
+    """Annotate ``ProductVariant`` rows with ``final_cents`` (``final_price``)."""
+    return variants.annotate(
+        final_cents=current_cents('product__') + cents('price_adjustment'),
+    )
+
+
+def unit_cents():
+    """``CartItem.unit_price`` in cents."""
+    return current_cents('product__') + Coalesce(cents('variant__price_adjustment'), 0)
+
+
+def cart_total_cents(items):
+    """Sum of the ``CartItem`` line totals of ``items`` in cents, in one query."""
+    return items.aggregate(
+        total=Coalesce(Sum(unit_cents() * F('quantity')), 0)
+    )['total']
@@ -0,0 +1,68 @@
+"""
+Catalog extracts: one row per product variant, or per product without variants.
+"""
+from django.db.models import Q
+
+from eshotry.exports import ExportError, as_text, parse_watermark
+from .models import Product, ProductVariant
+
+COLUMNS = (
+    ('product_id', as_text('id')),
+    ('sku', 'sku'),
+    ('name', 'name'),
+    ('slug', 'slug'),
+    ('status', 'status'),
+    ('category', 'category__slug'),
+    ('brand', 'brand__slug'),
+    ('gender', 'gender'),
+    ('base_price', 'base_price'),
+    ('sale_price', 'sale_price'),
+    ('cost_price', 'cost_price'),
+    ('stock_quantity', 'stock_quantity'),
+    ('is_featured', 'is_featured'),
+    ('purchase_count', 'purchase_count'),
+    ('created_at', 'created_at'),
+    ('updated_at', 'updated_at'),
+    ('variant_id', as_text('variants__id')),
+    ('variant_sku', 'variants__sku'),
+    ('size', 'variants__size'),
+    ('color', 'variants__color'),
+    ('price_adjustment', 'variants__price_adjustment'),
+    ('variant_stock_quantity', 'variants__stock_quantity'),
+    ('variant_is_active', 'variants__is_active'),
+    ('variant_updated_at', 'variants__updated_at'),
+)
+
+HEADER = tuple(name for name, _ in COLUMNS)
+WATERMARK_COLUMNS = (HEADER.index('updated_at'), HEADER.index('variant_updated_at'))
+
+
+def product_rows(status=None, category=None, brand=None, updated_after=None):
+    """
+    Queryset of product/variant rows, oldest ``updated_at`` first.
+
+    With ``updated_after`` a product is included when it or any of its
+    variants changed since the watermark.
+    """
+    if status and status not in {choice[0] for choice in Product.STATUS_CHOICES}:
+        raise ExportError(f'Invalid status: {status}')
+
+    queryset = Product.objects.all()
+    if status:
+        queryset = queryset.filter(status=status)
+    if category:
+        queryset = queryset.filter(category__slug=category)
+    if brand:
+        queryset = queryset.filter(brand__slug=brand)
+
+    updated_after = parse_watermark(updated_after)
+    if updated_after:
+        changed_variants = ProductVariant.objects.filter(updated_at__gte=updated_after)
+        queryset = queryset.filter(
+            Q(updated_at__gte=updated_after) | Q(pk__in=changed_variants.values('product_id'))
+        )
+
+    return (
+        queryset.order_by('updated_at', 'id', 'variants__sku')
+        .values_list(*(lookup for _, lookup in COLUMNS))
+    )
@@ -0,0 +1,482 @@
+"""
+Bulk catalog import from supplier feeds.
+
+Feeds are CSV or JSON Lines (optionally gzipped). CSV has one row per
+variant using the ``export_products`` column names; product columns repeat
+on every row of the product, ``images`` holds ``|``-separated paths and
+``attr:<slug>`` columns carry attribute values. JSONL records may use the
+same flat layout or nest ``variants`` (list), ``images`` (list) and
+``attributes`` (``{slug: value}``) under one product record.
+
+The parent process parses and validates rows, resolving category, brand and
+attribute slugs through in-memory maps, and hands chunks of products to a
+process pool. Each worker upserts its chunk with
+``bulk_create(update_conflicts=True)`` in one transaction, falling back to
+one product at a time when the chunk fails so only bad rows are rejected.
+An upsert only overwrites the columns its record carries, so records are
+grouped by their column set; columns a record omits keep their stored
+values. Imported gallery images are queued for rendition rendering once the
+chunk commits.
+"""
+import csv
+import gzip
+import io
+import json
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, InterfaceError, OperationalError, connections, transaction
+from django.utils.text import slugify
+
+from eshotry.cache_versions import bump_version
+from .models import (
+    Brand, Category, Product, ProductAttribute, ProductAttributeValue,
+    ProductImage, ProductVariant
+)
+from .signals import CATALOG_NAMESPACE, catalog_imported
+
+logger = logging.getLogger('eshotry.importer')
+
+TRUE_VALUES = {'1', 'true', 'yes', 'y', 't'}
+FALSE_VALUES = {'0', 'false', 'no', 'n', 'f', ''}
+
+
+class RejectedRow(ValueError):
+    """Raised for a feed row that cannot be imported."""
+
+
+def _text(value):
+    return '' if value is None else str(value).strip()
+
+
+def _decimal(value):
+    value = _text(value)
+    if not value:
+        return None
+    try:
+        number = Decimal(value)
+    except InvalidOperation:
+        raise RejectedRow(f'Invalid decimal: {value}')
+    if not number.is_finite() or number < 0:
+        raise RejectedRow(f'Invalid amount: {value}')
+    return number.quantize(Decimal('0.01'))
+
+
+def _int(value):
+    value = _text(value)
+    if not value:
+        return None
+    try:
+        number = int(value)
+    except ValueError:
+        raise RejectedRow(f'Invalid integer: {value}')
+    if number < 0:
+        raise RejectedRow(f'Negative quantity: {value}')
+    return number
+
+
+def _bool(value):
+    if isinstance(value, bool):
+        return value
+    value = _text(value).lower()
+    if value in TRUE_VALUES:
+        return True
+    if value in FALSE_VALUES:
+        return False
+    raise RejectedRow(f'Invalid boolean: {value}')
+
+
+# Feed column -> (model field, parser)
+PRODUCT_COLUMNS = {
+    'name': ('name', _text),
+    'slug': ('slug', _text),
+    'description': ('description', _text),
+    'short_description': ('short_description', _text),
+    'gender': ('gender', _text),
+    'status': ('status', _text),
+    'base_price': ('base_price', _decimal),
+    'sale_price': ('sale_price', _decimal),
+    'cost_price': ('cost_price', _decimal),
+    'track_inventory': ('track_inventory', _bool),
+    'stock_quantity': ('stock_quantity', _int),
+    'low_stock_threshold': ('low_stock_threshold', _int),
+    'material': ('material', _text),
+    'care_instructions': ('care_instructions', _text),
+    'fit_type': ('fit_type', _text),
+    'style': ('style', _text),
+    'meta_title': ('meta_title', _text),
+    'meta_description': ('meta_description', _text),
+    'is_featured': ('is_featured', _bool),
+    'is_virtual_tryon_enabled': ('is_virtual_tryon_enabled', _bool),
+    'is_customizable': ('is_customizable', _bool),
+}
+
+VARIANT_COLUMNS = {
+    'variant_sku': ('sku', _text),
+    'size': ('size', _text),
+    'color': ('color', _text),
+    'color_hex': ('color_hex', _text),
+    'variant_stock_quantity': ('stock_quantity', _int),
+    'price_adjustment': ('price_adjustment', _decimal),
+    'variant_is_active': ('is_active', _bool),
+}
+
+# Keys used by nested JSONL variants
+NESTED_VARIANT_KEYS = {
+    'sku': 'variant_sku',
+    'stock_quantity': 'variant_stock_quantity',
+    'is_active': 'variant_is_active',
+}
+
+# Always written on upsert, whatever columns the record has
+PRODUCT_UPDATE_FIELDS = ['category', 'brand', 'updated_at']
+
+# Image rows per generate_renditions task
+RENDITION_BATCH = 100
+
+VARIANT_UPDATE_FIELDS = [
+    'size', 'color', 'color_hex', 'stock_quantity', 'price_adjustment', 'is_active', 'updated_at'
+]
+
+
+@dataclass
+class ImportResult:
+    products: int = 0
+    variants: int = 0
+    rejects: list = field(default_factory=list)
+    skus: list = field(default_factory=list)
+
+    def merge(self, other):
+        self.products += other.products
+        self.variants += other.variants
+        self.rejects.extend(other.rejects)
+        self.skus.extend(other.skus)
+
+
+def _open(path):
+    path = str(path)
+    if path.endswith('.gz'):
+        return io.TextIOWrapper(gzip.open(path, 'rb'), encoding='utf-8', newline='')
+    return open(path, encoding='utf-8', newline='')
+
+
+def read_rows(path, file_format=None):
+    """Yield ``(line_number, flat_row)`` from a CSV or JSONL feed."""
+    if file_format is None:
+        file_format = 'jsonl' if '.jsonl' in str(path) or '.ndjson' in str(path) else 'csv'
+
+    with _open(path) as handle:
+        if file_format == 'csv':
+            for line_number, row in enumerate(csv.DictReader(handle), start=2):
+                yield line_number, row
+            return
+
+        for line_number, line in enumerate(handle, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield line_number, RejectedRow(f'Invalid JSON: {e}')
+                continue
+            variants = record.pop('variants', None)
+            attributes = record.pop('attributes', None) or {}
+            for slug, value in attributes.items():
+                record[f'attr:{slug}'] = value
+            if isinstance(record.get('images'), list):
+                record['images'] = '|'.join(record['images'])
+            if not variants:
+                yield line_number, record
+                continue
+            for variant in variants:
+                row = dict(record)
+                for key, value in variant.items():
+                    row[NESTED_VARIANT_KEYS.get(key, key)] = value
+                yield line_number, row
+
+
+class CatalogMaps:
+    """Slug -> id lookups for the reference data a feed points at."""
+
+    def __init__(self):
+        self.categories = dict(Category.objects.values_list('slug', 'id'))
+        self.brands = dict(Brand.objects.values_list('slug', 'id'))
+        self.attributes = dict(ProductAttribute.objects.values_list('slug', 'id'))
+
+    @staticmethod
+    def resolve(mapping, kind, slug):
+        try:
+            return mapping[slug]
+        except KeyError:
+            raise RejectedRow(f'Unknown {kind}: {slug}')
+
+
+class FeedParser:
+    """Group feed rows into validated, picklable product payloads."""
+
+    genders = {choice[0] for choice in Product.GENDER_CHOICES}
+    statuses = {choice[0] for choice in Product.STATUS_CHOICES}
+
+    def __init__(self, maps):
+        self.maps = maps
+        self.slugs = {}
+
+    def products(self, rows, rejects):
+        """Yield product payloads; rows of one product must be consecutive."""
+        current = None
+        for line_number, row in rows:
+            if isinstance(row, RejectedRow):
+                rejects.append((line_number, '', str(row)))
+                continue
+            sku = _text(row.get('sku'))
+            if current and current['product']['sku'] == sku:
+                self._add_variant(current, line_number, row, rejects)
+                continue
+            if current:
+                yield current
+            try:
+                current = self._product(line_number, sku, row)
+            except RejectedRow as e:
+                rejects.append((line_number, sku, str(e)))
+                current = None
+                continue
+            self._add_variant(current, line_number, row, rejects)
+        if current:
+            yield current
+
+    def _product(self, line_number, sku, row):
+        if not sku:
+            raise RejectedRow('Missing sku')
+
+        product = {'sku': sku}
+        for column, (model_field, parse) in PRODUCT_COLUMNS.items():
+            if column in row:
+                value = parse(row[column])
+                if value is not None and value != '':
+                    product[model_field] = value
+
+        if not product.get('name'):
+            raise RejectedRow('Missing name')
+        if 'base_price' not in product:
+            raise RejectedRow('Missing base_price')
+        if product.get('gender', 'U') not in self.genders:
+            raise RejectedRow(f"Invalid gender: {product['gender']}")
+        if product.get('status', 'active') not in self.statuses:
+            raise RejectedRow(f"Invalid status: {product['status']}")
+        product.setdefault('description', '')
+        product.setdefault('gender', 'U')
+
+        product['category_id'] = self.maps.resolve(
+            self.maps.categories, 'category', _text(row.get('category'))
+        )
+        product['brand_id'] = self.maps.resolve(self.maps.brands, 'brand', _text(row.get('brand')))
+
+        slug = product.get('slug') or slugify(f"{product['name']}-{sku}")[:255]
+        owner = self.slugs.setdefault(slug, sku)
+        if owner != sku:
+            raise RejectedRow(f'Slug {slug} already used by {owner}')
+        product['slug'] = slug
+
+        attributes = {}
+        for column, value in row.items():
+            if column.startswith('attr:') and _text(value):
+                attribute_id = self.maps.resolve(self.maps.attributes, 'attribute', column[5:])
+                attributes[attribute_id] = _text(value)
+
+        images = [path for path in _text(row.get('images')).split('|') if path.strip()]
+        return {
+            'line': line_number,
+            'product': product,
+            # Columns present in the record, empty or not, are written on upsert
+            'update_fields': tuple(
+                model_field for column, (model_field, _) in PRODUCT_COLUMNS.items()
+                if column in row and model_field != 'slug'
+            ) + tuple(PRODUCT_UPDATE_FIELDS),
+            'variants': [],
+            'attributes': attributes,
+            'images': [path.strip() for path in images],
+        }
+
+    def _add_variant(self, payload, line_number, row, rejects):
+        variant_sku = _text(row.get('variant_sku'))
+        if not variant_sku:
+            return
+        try:
+            variant = {'sku': variant_sku}
+            for column, (model_field, parse) in VARIANT_COLUMNS.items():
+                if column in row:
+                    value = parse(row[column])
+                    if value is not None:
+                        variant[model_field] = value
+            if not variant.get('size') or not variant.get('color'):
+                raise RejectedRow('Variant needs size and color')
+            key = (variant['size'], variant['color'])
+            if any((v['size'], v['color']) == key for v in payload['variants']):
+                raise RejectedRow(f'Duplicate variant {key[0]}/{key[1]}')
+        except RejectedRow as e:
+            rejects.append((line_number, variant_sku, str(e)))
+            return
+        payload['variants'].append(variant)
+
+
+def _upsert(payloads):
+    groups = {}
+    for payload in payloads:
+        groups.setdefault(payload['update_fields'], []).append(payload)
+    for update_fields, group in groups.items():
+        Product.objects.bulk_create(
+            [Product(**payload['product']) for payload in group],
+            update_conflicts=True,
+            unique_fields=['sku'],
+            update_fields=list(update_fields),
+        )
+    ids = dict(
+        Product.objects.filter(sku__in=[payload['product']['sku'] for payload in payloads])
+        .values_list('sku', 'id')
+    )
+
+    variants = []
+    attribute_values = []
+    images = []
+    image_products = []
+    for payload in payloads:
+        product_id = ids[payload['product']['sku']]
+        variants.extend(
+            ProductVariant(product_id=product_id, **variant) for variant in payload['variants']
+        )
+        attribute_values.extend(
+            ProductAttributeValue(product_id=product_id, attribute_id=attribute_id, value=value)
+            for attribute_id, value in payload['attributes'].items()
+        )
+        if payload['images']:
+            image_products.append(product_id)
+            images.extend(
+                ProductImage(
+                    product_id=product_id, image=path, is_primary=index == 0,
+                    sort_order=index,
+                )
+                for index, path in enumerate(payload['images'])
+            )
+
+    if variants:
+        ProductVariant.objects.bulk_create(
+            variants, update_conflicts=True, unique_fields=['sku'],
+            update_fields=VARIANT_UPDATE_FIELDS,
+        )
+    if attribute_values:
+        ProductAttributeValue.objects.bulk_create(
+            attribute_values, update_conflicts=True,
+            unique_fields=['product', 'attribute'], update_fields=['value'],
+        )
+    if images:
+        # Feed images replace the stored gallery
+        ProductImage.objects.filter(product_id__in=image_products).delete()
+        ProductImage.objects.bulk_create(images)
+        # bulk_create skips the post_save hook that queues renditions
+        transaction.on_commit(lambda: _queue_renditions([image.pk for image in images]))
+    return len(payloads), len(variants)
+
+
+def _queue_renditions(pks):
+    from .tasks import generate_renditions
+    for start in range(0, len(pks), RENDITION_BATCH):
+        generate_renditions.delay(
+            ProductImage._meta.label, [str(pk) for pk in pks[start:start + RENDITION_BATCH]]
+        )
+
+
+def import_chunk(payloads):
+    """
+    Upsert one chunk; runs inside a pool worker.
+
+    Connection failures propagate: retrying row by row would only fail again.
+    """
+    result = ImportResult()
+    try:
+        with transaction.atomic():
+            result.products, result.variants = _upsert(payloads)
+        result.skus = [payload['product']['sku'] for payload in payloads]
+        return result
+    except (OperationalError, InterfaceError):
+        raise
+    except (DatabaseError, ValidationError) as e:
+        logger.warning(
+            'Import chunk of %d products from line %s failed, retrying one at a time: %s',
+            len(payloads), payloads[0]['line'], e,
+        )
+
+    for payload in payloads:
+        sku = payload['product']['sku']
+        try:
+            with transaction.atomic():
+                products, variants = _upsert([payload])
+        except (OperationalError, InterfaceError):
+            raise
+        except (DatabaseError, ValidationError) as e:
+            result.rejects.append((payload['line'], sku, f'{type(e).__name__}: {e}'.strip()))
+            continue
+        result.products += products
+        result.variants += variants
+        result.skus.append(sku)
+    return result
+
+
+def _close_connections():
+    # Forked workers must not share the parent's database sockets
+    connections.close_all()
+
+
+def _init_worker():
+    import django
+    django.setup()
+    _close_connections()
+
+
+def _chunks(payloads, size):
+    chunk = []
+    for payload in payloads:
+        chunk.append(payload)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def import_catalog(path, file_format=None, chunk_size=1000, workers=4, max_pending=None):
+    """Import a feed and refresh catalog caches once at the end."""
+    parser = FeedParser(CatalogMaps())
+    result = ImportResult()
+    payloads = parser.products(read_rows(path, file_format), result.rejects)
+    chunks = _chunks(payloads, chunk_size)
+
+    if workers <= 1:
+        for chunk in chunks:
+            result.merge(import_chunk(chunk))
+    else:
+        _close_connections()
+        max_pending = max_pending or workers * 2
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            pending = []
+            for chunk in chunks:
+                pending.append(pool.submit(import_chunk, chunk))
+                # Bound the number of chunks held in memory
+                if len(pending) >= max_pending:
+                    result.merge(pending.pop(0).result())
+            for future in pending:
+                result.merge(future.result())
+
+    if result.skus:
+        bump_version(CATALOG_NAMESPACE)
+        catalog_imported.send(sender=Product, skus=result.skus)
+    return result
+
+
+def write_rejects(path, rejects):
+    with open(path, 'w', newline='', encoding='utf-8') as handle:
+        writer = csv.writer(handle)
+        writer.writerow(['line', 'sku', 'reason'])
+        writer.writerows(sorted(rejects, key=lambda reject: reject[0]))
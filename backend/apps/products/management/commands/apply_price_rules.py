@@ -0,0 +1,26 @@
+"""
+Apply and roll back scheduled price rules.
+"""
+from django.core.management.base import BaseCommand
+
+from apps.products.pricing import run_due_rules
+
+
+class Command(BaseCommand):
+    help = 'Run the price rule scheduler once and report products repriced per rule.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Products per UPDATE')
+
+    def handle(self, *args, **options):
+        result = run_due_rules(chunk_size=options['chunk_size'])
+        for run in result.runs:
+            rate = run.changed / run.elapsed if run.elapsed else 0
+            self.stdout.write(self.style.SUCCESS(
+                f'{run.rule}: {run.action.replace("_", " ")} {run.changed} products '
+                f'({run.skipped} skipped) in {run.elapsed:.2f}s = {rate:,.0f} products/s'
+            ))
+        if result.expired:
+            self.stdout.write(f'{result.expired} rules expired before they started')
+        if not result.runs and not result.expired:
+            self.stdout.write('No price rules due')
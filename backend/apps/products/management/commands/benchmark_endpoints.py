@@ -0,0 +1,106 @@
+"""
+Benchmark the product and user API endpoints against the current dataset.
+"""
+from contextlib import nullcontext
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from eshotry import benchmarks
+
+# Below this many products the numbers say little about production behaviour
+MIN_PRODUCTS = 10000
+
+
+class Command(BaseCommand):
+    help = (
+        'Record p50/p95/p99 latency, throughput, SQL queries and allocations per endpoint; '
+        'compare with --baseline to fail on regressions.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default='benchmark-results.json')
+        parser.add_argument('--baseline', help='Results file from a previous run to compare against')
+        parser.add_argument('--threshold', type=float, default=0.25,
+                            help='Allowed relative regression (0.25 = 25%%)')
+        parser.add_argument('--group', action='append', choices=list(benchmarks.URL_MODULES))
+        parser.add_argument('--endpoint', action='append', help='Route name, e.g. product-list')
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument('--skip-http', action='store_true', help='Only run the test-client pass')
+        parser.add_argument('--base-url', help='Load an already running server instead of runserver')
+        parser.add_argument('--concurrency', type=int, default=10)
+        parser.add_argument('--duration', type=float, default=5.0, help='Seconds of load per endpoint')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            self.stderr.write(self.style.WARNING(
+                f'Benchmarking against {connection.vendor}; baselines should come from PostgreSQL.'
+            ))
+        meta = benchmarks.metadata()
+        if meta['dataset']['products'] < MIN_PRODUCTS:
+            self.stderr.write(self.style.WARNING(
+                f"Only {meta['dataset']['products']:,} products; "
+                'run generate_dataset for representative numbers.'
+            ))
+
+        try:
+            fixture = benchmarks.Fixture()
+        except ValueError as e:
+            raise CommandError(str(e))
+        endpoints = benchmarks.discover_endpoints(fixture, options['group'])
+        if options['endpoint']:
+            endpoints = [endpoint for endpoint in endpoints if endpoint.name in options['endpoint']]
+        if not endpoints:
+            raise CommandError('No endpoints selected.')
+
+        results = {'meta': meta, 'endpoints': {}}
+        for endpoint in endpoints:
+            results['endpoints'][endpoint.key] = {'client': benchmarks.run_client(
+                endpoint, fixture, iterations=options['iterations'], warmup=options['warmup'],
+            )}
+            self._report(endpoint, 'client', results['endpoints'][endpoint.key]['client'])
+
+        if not options['skip_http']:
+            self._run_http(endpoints, fixture, results, options)
+
+        benchmarks.save_results(options['output'], results)
+        self.stdout.write(f"Results written to {options['output']}")
+
+        if options['baseline']:
+            regressions = benchmarks.compare(
+                results, benchmarks.load_results(options['baseline']), options['threshold']
+            )
+            if regressions:
+                for regression in regressions:
+                    self.stderr.write(f'  {regression}')
+                raise CommandError(
+                    f'{len(regressions)} regression(s) beyond {options["threshold"]:.0%} '
+                    f"against {options['baseline']}."
+                )
+            self.stdout.write(self.style.SUCCESS('No regressions against baseline.'))
+
+    def _run_http(self, endpoints, fixture, results, options):
+        params = {'concurrency': options['concurrency'], 'duration': options['duration']}
+        server = nullcontext(options['base_url']) if options['base_url'] else benchmarks.Server()
+        try:
+            with server as base_url:
+                for endpoint in endpoints:
+                    result = benchmarks.run_http(base_url, endpoint, fixture, **params)
+                    results['endpoints'][endpoint.key]['http'] = result
+                    self._report(endpoint, 'http', result)
+        except RuntimeError as e:
+            raise CommandError(str(e))
+
+    def _report(self, endpoint, mode, result):
+        line = (
+            f"{endpoint.key:<32}{mode:<7}p50 {result['p50_ms']:>8.1f}ms  "
+            f"p95 {result['p95_ms']:>8.1f}ms  p99 {result['p99_ms']:>8.1f}ms"
+        )
+        if mode == 'client':
+            line += f"  {result['queries']:>5g} queries  {result['alloc_kb']:>8.1f} KiB"
+        else:
+            line += f"  {result['rps']:>7.1f} req/s"
+        if result['errors']:
+            line += f"  {result['errors']} errors"
+        self.stdout.write(line)
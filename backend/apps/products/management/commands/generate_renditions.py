@@ -0,0 +1,41 @@
+"""
+Backfill responsive image renditions and placeholders for catalog images.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.products.renditions import IMAGE_FIELDS, generate, pending
+from apps.products.tasks import generate_renditions
+
+MODELS = {model._meta.label: model for model in IMAGE_FIELDS}
+
+
+class Command(BaseCommand):
+    help = 'Render missing image renditions in a process pool or queue them to Celery workers.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', action='append', choices=sorted(MODELS), help='Limit to a model; repeatable')
+        parser.add_argument('--batch-size', type=int, default=200, help='Rows per batch')
+        parser.add_argument('--workers', type=int, default=4, help='Render processes; 1 renders inline')
+        parser.add_argument('--queue', action='store_true', help='Queue batches to Celery instead of rendering here')
+        parser.add_argument('--force', action='store_true', help='Re-render rows that already have renditions')
+
+    def handle(self, *args, **options):
+        for label in options['model'] or sorted(MODELS):
+            model = MODELS[label]
+            started = time.perf_counter()
+            pks = list(pending(model, force=options['force']).order_by('pk').values_list('pk', flat=True))
+            done = 0
+            for start in range(0, len(pks), options['batch_size']):
+                batch = pks[start:start + options['batch_size']]
+                if options['queue']:
+                    generate_renditions.delay(label, [str(pk) for pk in batch])
+                    done += len(batch)
+                else:
+                    done += generate(model, batch, workers=options['workers'])
+            elapsed = time.perf_counter() - started
+            verb = 'Queued' if options['queue'] else 'Rendered'
+            self.stdout.write(self.style.SUCCESS(
+                f'{label}: {verb} {done} of {len(pks)} images in {elapsed:.1f}s'
+            ))
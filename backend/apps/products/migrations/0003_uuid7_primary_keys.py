@@ -0,0 +1,59 @@
+# Generated by Django 4.2.7 on 2026-10-19 01:40
+
+from django.db import migrations, models
+import eshotry.ids
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='brand',
+            name='id',
+            field=models.UUIDField(default=eshotry.ids.primary_key, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='category',
+            name='id',
+            field=models.UUIDField(default=eshotry.ids.primary_key, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='product',
+            name='id',
+            field=models.UUIDField(default=eshotry.ids.primary_key, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='productattribute',
+            name='id',
+            field=models.UUIDField(default=eshotry.ids.primary_key, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='productattributevalue',
+            name='id',
+            field=models.UUIDField(default=eshotry.ids.primary_key, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='productimage',
+            name='id',
+            field=models.UUIDField(default=eshotry.ids.primary_key, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='productreview',
+            name='id',
+            field=models.UUIDField(default=eshotry.ids.primary_key, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='productvariant',
+            name='id',
+            field=models.UUIDField(default=eshotry.ids.primary_key, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='wishlist',
+            name='id',
+            field=models.UUIDField(default=eshotry.ids.primary_key, editable=False, primary_key=True, serialize=False),
+        ),
+    ]
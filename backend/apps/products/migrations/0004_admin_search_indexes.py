@@ -0,0 +1,32 @@
+from django.db import migrations
+
+SEARCH_INDEXES = [
+    ('products_name_upper_trgm', 'products', 'name'),
+    ('products_sku_upper_trgm', 'products', 'sku'),
+    ('brands_name_upper_trgm', 'brands', 'name'),
+    ('product_variants_sku_upper_trgm', 'product_variants', 'sku'),
+    ('product_variants_color_upper_trgm', 'product_variants', 'color'),
+]
+
+
+def create_indexes(apps, schema_editor):
+    from eshotry.admin_utils import create_search_indexes
+
+    create_search_indexes(schema_editor, SEARCH_INDEXES)
+
+
+def drop_indexes(apps, schema_editor):
+    from eshotry.admin_utils import drop_search_indexes
+
+    drop_search_indexes(schema_editor, SEARCH_INDEXES)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0003_uuid7_primary_keys'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 4.2.7 on 2026-10-19 02:26
+
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+import eshotry.ids
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0004_admin_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PriceRule',
+            fields=[
+                ('id', models.UUIDField(default=eshotry.ids.primary_key, editable=False, primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=100)),
+                ('scope', models.CharField(choices=[('category', 'Category (with subcategories)'), ('brand', 'Brand'), ('style', 'Style tag'), ('products', 'Selected products')], max_length=20)),
+                ('style', models.CharField(blank=True, max_length=100)),
+                ('discount_type', models.CharField(choices=[('percentage', 'Percentage'), ('fixed', 'Fixed Amount')], max_length=20)),
+                ('discount_value', models.DecimalField(decimal_places=2, max_digits=10, validators=[django.core.validators.MinValueValidator(0.01)])),
+                ('starts_at', models.DateTimeField()),
+                ('ends_at', models.DateTimeField()),
+                ('status', models.CharField(choices=[('scheduled', 'Scheduled'), ('active', 'Active'), ('finished', 'Finished'), ('cancelled', 'Cancelled')], default='scheduled', max_length=20)),
+                ('applied_at', models.DateTimeField(blank=True, null=True)),
+                ('rolled_back_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('brand', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='price_rules', to='products.brand')),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='price_rules', to='products.category')),
+                ('products', models.ManyToManyField(blank=True, related_name='price_rules', to='products.product')),
+            ],
+            options={
+                'verbose_name': 'Price Rule',
+                'verbose_name_plural': 'Price Rules',
+                'db_table': 'price_rules',
+                'ordering': ['-starts_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='PriceHistory',
+            fields=[
+                ('id', models.UUIDField(default=eshotry.ids.primary_key, editable=False, primary_key=True, serialize=False)),
+                ('action', models.CharField(choices=[('applied', 'Applied'), ('rolled_back', 'Rolled back')], max_length=20)),
+                ('old_sale_price', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('new_sale_price', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='price_history', to='products.product')),
+                ('rule', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='history', to='products.pricerule')),
+            ],
+            options={
+                'verbose_name': 'Price History',
+                'verbose_name_plural': 'Price History',
+                'db_table': 'price_history',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='pricerule',
+            index=models.Index(fields=['status', 'starts_at'], name='price_rules_status_250ad0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pricerule',
+            index=models.Index(fields=['status', 'ends_at'], name='price_rules_status_ec973a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pricehistory',
+            index=models.Index(fields=['product', 'created_at'], name='price_histo_product_e69ef6_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pricehistory',
+            index=models.Index(fields=['rule', 'action', 'product'], name='price_histo_rule_id_0b9368_idx'),
+        ),
+    ]
@@ -4,7 +4,7 @@ Product models for EshoTry platform.
 from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.contrib.auth import get_user_model
-import uuid
+from eshotry.ids import primary_key
 
 User = get_user_model()
 
@@ -12,7 +12,7 @@ User = get_user_model()
 class Category(models.Model):
     """Product categories with hierarchical structure."""
     
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=primary_key, editable=False)
     name = models.CharField(max_length=100, unique=True)
     slug = models.SlugField(max_length=100, unique=True)
     description = models.TextField(blank=True)
@@ -24,6 +24,7 @@ class Category(models.Model):
         related_name='children'
     )
     image = models.ImageField(upload_to='categories/', blank=True, null=True)
+    image_renditions = models.JSONField(default=dict, blank=True, editable=False)
     is_active = models.BooleanField(default=True)
     sort_order = models.PositiveIntegerField(default=0)
     
@@ -55,11 +56,12 @@ class Category(models.Model):
 class Brand(models.Model):
     """Product brands."""
     
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=primary_key, editable=False)
     name = models.CharField(max_length=100, unique=True)
     slug = models.SlugField(max_length=100, unique=True)
     description = models.TextField(blank=True)
     logo = models.ImageField(upload_to='brands/', blank=True, null=True)
+    logo_renditions = models.JSONField(default=dict, blank=True, editable=False)
     website = models.URLField(blank=True)
     is_active = models.BooleanField(default=True)
     
@@ -97,7 +99,7 @@ class Product(models.Model):
         ('discontinued', 'Discontinued'),
     ]
     
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=primary_key, editable=False)
     name = models.CharField(max_length=255)
     slug = models.SlugField(max_length=255, unique=True)
     description = models.TextField()
@@ -197,9 +199,12 @@ class Product(models.Model):
 class ProductImage(models.Model):
     """Product images."""
     
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=primary_key, editable=False)
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='images')
     image = models.ImageField(upload_to='products/')
+    image_renditions = models.JSONField(default=dict, blank=True, editable=False)
+    image_placeholder = models.TextField(blank=True, editable=False)  # Blurred data URI
+    image_color = models.CharField(max_length=7, blank=True, editable=False)  # Dominant hex color
     alt_text = models.CharField(max_length=255, blank=True)
     is_primary = models.BooleanField(default=False)
     sort_order = models.PositiveIntegerField(default=0)
@@ -223,7 +228,7 @@ class ProductImage(models.Model):
 class ProductVariant(models.Model):
     """Product variants (size, color combinations)."""
     
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=primary_key, editable=False)
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='variants')
     
     # Variant attributes
@@ -243,6 +248,9 @@ class ProductVariant(models.Model):
     
     # Variant images
     image = models.ImageField(upload_to='variants/', blank=True, null=True)
+    image_renditions = models.JSONField(default=dict, blank=True, editable=False)
+    image_placeholder = models.TextField(blank=True, editable=False)  # Blurred data URI
+    image_color = models.CharField(max_length=7, blank=True, editable=False)  # Dominant hex color
     
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -277,7 +285,7 @@ class ProductVariant(models.Model):
 class ProductReview(models.Model):
     """Product reviews and ratings."""
     
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=primary_key, editable=False)
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='reviews')
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='reviews')
     
@@ -328,7 +336,7 @@ class ProductReview(models.Model):
 class ProductAttribute(models.Model):
     """Product attributes (e.g., sleeve length, neckline)."""
     
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=primary_key, editable=False)
     name = models.CharField(max_length=100, unique=True)
     slug = models.SlugField(max_length=100, unique=True)
     data_type = models.CharField(
@@ -360,7 +368,7 @@ class ProductAttribute(models.Model):
 class ProductAttributeValue(models.Model):
     """Product attribute values."""
     
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=primary_key, editable=False)
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='attribute_values')
     attribute = models.ForeignKey(ProductAttribute, on_delete=models.CASCADE)
     value = models.TextField()
@@ -382,7 +390,7 @@ class ProductAttributeValue(models.Model):
 class Wishlist(models.Model):
     """User wishlists."""
     
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=primary_key, editable=False)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='wishlists')
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='wishlisted_by')
     
@@ -401,3 +409,107 @@ class Wishlist(models.Model):
     
     def __str__(self):
         return f"{self.user.email} - {self.product.name}"
+
+
+class PriceRule(models.Model):
+    """Scheduled discount applied to a set of products by the pricing engine."""
+    
+    SCOPE_CHOICES = [
+        ('category', 'Category (with subcategories)'),
+        ('brand', 'Brand'),
+        ('style', 'Style tag'),
+        ('products', 'Selected products'),
+    ]
+    
+    DISCOUNT_TYPE_CHOICES = [
+        ('percentage', 'Percentage'),
+        ('fixed', 'Fixed Amount'),
+    ]
+    
+    STATUS_CHOICES = [
+        ('scheduled', 'Scheduled'),
+        ('active', 'Active'),
+        ('finished', 'Finished'),
+        ('cancelled', 'Cancelled'),
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=primary_key, editable=False)
+    name = models.CharField(max_length=100)
+    
+    # Target products
+    scope = models.CharField(max_length=20, choices=SCOPE_CHOICES)
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, null=True, blank=True, related_name='price_rules')
+    brand = models.ForeignKey(Brand, on_delete=models.CASCADE, null=True, blank=True, related_name='price_rules')
+    style = models.CharField(max_length=100, blank=True)
+    products = models.ManyToManyField(Product, blank=True, related_name='price_rules')
+    
+    # Discount off the base price
+    discount_type = models.CharField(max_length=20, choices=DISCOUNT_TYPE_CHOICES)
+    discount_value = models.DecimalField(
+        max_digits=10, decimal_places=2, validators=[MinValueValidator(0.01)]
+    )
+    
+    # Time window
+    starts_at = models.DateTimeField()
+    ends_at = models.DateTimeField()
+    
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='scheduled')
+    applied_at = models.DateTimeField(null=True, blank=True)
+    rolled_back_at = models.DateTimeField(null=True, blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'price_rules'
+        verbose_name = 'Price Rule'
+        verbose_name_plural = 'Price Rules'
+        ordering = ['-starts_at']
+        indexes = [
+            models.Index(fields=['status', 'starts_at']),
+            models.Index(fields=['status', 'ends_at']),
+        ]
+    
+    def __str__(self):
+        return self.name
+    
+    def clean(self):
+        from django.core.exceptions import ValidationError
+        if self.starts_at and self.ends_at and self.ends_at <= self.starts_at:
+            raise ValidationError({'ends_at': 'The rule must end after it starts.'})
+        if self.discount_type == 'percentage' and self.discount_value and self.discount_value >= 100:
+            raise ValidationError({'discount_value': 'A percentage discount must be below 100.'})
+        target = {'category': self.category_id, 'brand': self.brand_id, 'style': self.style}
+        if self.scope in target and not target[self.scope]:
+            raise ValidationError({self.scope: 'Required for this scope.'})
+
+
+class PriceHistory(models.Model):
+    """Sale price change made by a price rule."""
+    
+    ACTION_CHOICES = [
+        ('applied', 'Applied'),
+        ('rolled_back', 'Rolled back'),
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=primary_key, editable=False)
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='price_history')
+    rule = models.ForeignKey(PriceRule, on_delete=models.SET_NULL, null=True, blank=True, related_name='history')
+    action = models.CharField(max_length=20, choices=ACTION_CHOICES)
+    old_sale_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    new_sale_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'price_history'
+        verbose_name = 'Price History'
+        verbose_name_plural = 'Price History'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['product', 'created_at']),
+            models.Index(fields=['rule', 'action', 'product']),
+        ]
+    
+    def __str__(self):
+        return f"{self.product_id}: {self.old_sale_price} -> {self.new_sale_price}"
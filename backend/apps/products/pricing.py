@@ -0,0 +1,238 @@
+"""
+Scheduled price rules for EshoTry platform.
+
+A ``PriceRule`` discounts every product in its scope (a category tree, a
+brand, a style tag or a hand-picked set) between ``starts_at`` and
+``ends_at``. ``run_due_rules`` is called by the scheduler: it applies rules
+whose window has opened and rolls back rules whose window has closed.
+
+Both directions work through the scope in primary key order, ``chunk_size``
+products per transaction, with one set-based ``UPDATE`` per chunk and a
+``PriceHistory`` row per changed product. Caches are invalidated once per
+rule run (a ``catalog`` version bump and ``catalog_repriced``), not per row.
+
+A rule only lowers prices: products already selling below the rule price
+keep their sale price. Rolling back restores the previous sale price of
+products the rule still prices; products repriced since then are left alone.
+Both directions are idempotent, so an interrupted run is simply repeated.
+"""
+import time
+from dataclasses import dataclass, field
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import (
+    Case, DecimalField, ExpressionWrapper, F, OuterRef, Q, Subquery, Value, When,
+)
+from django.db.models.functions import Greatest, Round
+from django.utils import timezone
+
+from eshotry.cache_versions import bump_version
+
+from .models import Category, PriceHistory, PriceRule, Product
+from .signals import CATALOG_NAMESPACE, catalog_repriced
+
+PRICE_FIELD = DecimalField(max_digits=10, decimal_places=2)
+CENT = Decimal('0.01')
+
+
+@dataclass
+class RuleRunResult:
+    """Outcome of applying or rolling back one price rule."""
+
+    rule: PriceRule
+    action: str
+    changed: int = 0
+    skipped: int = 0
+    elapsed: float = 0.0
+
+
+@dataclass
+class SchedulerResult:
+    """Rules handled by one scheduler pass."""
+
+    runs: list = field(default_factory=list)
+    expired: int = 0
+
+
+def _descendants(category_id):
+    children = {}
+    for pk, parent_id in Category.objects.values_list('pk', 'parent_id'):
+        children.setdefault(parent_id, []).append(pk)
+    found, pending = [], [category_id]
+    while pending:
+        pk = pending.pop()
+        found.append(pk)
+        pending.extend(children.get(pk, ()))
+    return found
+
+
+def rule_products(rule):
+    """Products in the scope of ``rule``."""
+    if rule.scope == 'category':
+        return Product.objects.filter(category_id__in=_descendants(rule.category_id))
+    if rule.scope == 'brand':
+        return Product.objects.filter(brand_id=rule.brand_id)
+    if rule.scope == 'style':
+        return Product.objects.filter(style__iexact=rule.style)
+    return Product.objects.filter(price_rules=rule)
+
+
+def rule_price(rule):
+    """Database expression for a product's price under ``rule``."""
+    if rule.discount_type == 'percentage':
+        factor = (Decimal(100) - rule.discount_value) / Decimal(100)
+        price = F('base_price') * Value(factor, output_field=PRICE_FIELD)
+    else:
+        price = Greatest(F('base_price') - Value(rule.discount_value), Value(CENT))
+    return Round(ExpressionWrapper(price, output_field=PRICE_FIELD), 2, output_field=PRICE_FIELD)
+
+
+def _chunks(pks, chunk_size, key='pk'):
+    pks = pks.order_by(key)
+    last_pk = None
+    while True:
+        page = pks.filter(**{f'{key}__gt': last_pk}) if last_pk is not None else pks
+        chunk = list(page[:chunk_size])
+        if not chunk:
+            return
+        last_pk = chunk[-1]
+        yield chunk
+
+
+def _cents(amount):
+    return None if amount is None else Decimal(amount).quantize(CENT)
+
+
+def _finish(result, started):
+    result.elapsed = time.perf_counter() - started
+    if result.changed:
+        bump_version(CATALOG_NAMESPACE)
+        catalog_repriced.send(sender=PriceRule, rule=result.rule, action=result.action)
+    return result
+
+
+def apply_rule(rule, chunk_size=1000):
+    """Lower the sale price of every product in scope to the rule price."""
+    result = RuleRunResult(rule, 'applied')
+    started = time.perf_counter()
+    price = rule_price(rule)
+
+    for chunk in _chunks(rule_products(rule).values_list('pk', flat=True), chunk_size):
+        with transaction.atomic():
+            rows = list(
+                Product.objects.select_for_update(no_key=True)
+                .filter(pk__in=chunk)
+                .annotate(rule_price=price)
+                .filter(Q(sale_price__isnull=True) | Q(sale_price__gt=F('rule_price')))
+                .values_list('pk', 'sale_price', 'rule_price')
+            )
+            result.skipped += len(chunk) - len(rows)
+            if not rows:
+                continue
+
+            ids = [pk for pk, _, _ in rows]
+            Product.objects.filter(pk__in=ids).update(sale_price=price, updated_at=timezone.now())
+            PriceHistory.objects.bulk_create([
+                PriceHistory(
+                    product_id=pk, rule=rule, action='applied',
+                    old_sale_price=old, new_sale_price=_cents(new),
+                )
+                for pk, old, new in rows
+            ])
+        result.changed += len(ids)
+
+    PriceRule.objects.filter(pk=rule.pk).update(status='active', applied_at=timezone.now())
+    return _finish(result, started)
+
+
+def _hand_over(rule, overridden):
+    """
+    Point later rules at the price this rule replaced.
+
+    A product repriced by another active rule keeps that price, but the other
+    rule's history still says it should roll back to this rule's price.
+    """
+    if not overridden:
+        return
+    PriceHistory.objects.filter(
+        action='applied', rule__status='active', product_id__in=[pk for pk, _, _ in overridden]
+    ).exclude(rule=rule).update(old_sale_price=Case(
+        *[
+            When(product_id=pk, old_sale_price=applied, then=Value(restore))
+            for pk, applied, restore in overridden
+        ],
+        default=F('old_sale_price'), output_field=PRICE_FIELD,
+    ))
+
+
+def rollback_rule(rule, status='finished', chunk_size=1000):
+    """Restore the sale prices that ``rule`` replaced."""
+    result = RuleRunResult(rule, 'rolled_back')
+    started = time.perf_counter()
+    applied = PriceHistory.objects.filter(rule=rule, action='applied', product_id=OuterRef('pk'))
+    pks = (
+        PriceHistory.objects.filter(rule=rule, action='applied')
+        .values_list('product_id', flat=True)
+    )
+
+    for chunk in _chunks(pks, chunk_size, key='product_id'):
+        with transaction.atomic():
+            rows = list(
+                Product.objects.select_for_update(no_key=True)
+                .filter(pk__in=chunk)
+                .annotate(
+                    applied_price=Subquery(applied.values('new_sale_price')[:1]),
+                    restore_price=Subquery(applied.values('old_sale_price')[:1]),
+                )
+                .values_list('pk', 'sale_price', 'applied_price', 'restore_price')
+            )
+            restored = [row for row in rows if row[1] == row[2]]
+            _hand_over(rule, [
+                (pk, applied_price, restore)
+                for pk, current, applied_price, restore in rows if current != applied_price
+            ])
+            result.skipped += len(chunk) - len(restored)
+            if not restored:
+                continue
+
+            ids = [pk for pk, _, _, _ in restored]
+            Product.objects.filter(pk__in=ids).update(
+                sale_price=Subquery(applied.values('old_sale_price')[:1]),
+                updated_at=timezone.now(),
+            )
+            PriceHistory.objects.bulk_create([
+                PriceHistory(
+                    product_id=pk, rule=rule, action='rolled_back',
+                    old_sale_price=current, new_sale_price=restore,
+                )
+                for pk, current, _, restore in restored
+            ])
+        result.changed += len(ids)
+
+    PriceRule.objects.filter(pk=rule.pk).update(status=status, rolled_back_at=timezone.now())
+    return _finish(result, started)
+
+
+def run_due_rules(now=None, chunk_size=1000):
+    """Apply rules whose window opened and roll back rules whose window closed."""
+    now = now or timezone.now()
+    result = SchedulerResult()
+
+    # Windows that closed before the scheduler ever saw them
+    result.expired = PriceRule.objects.filter(status='scheduled', ends_at__lte=now).update(
+        status='finished'
+    )
+    for rule in PriceRule.objects.filter(status='active', ends_at__lte=now).order_by('ends_at'):
+        result.runs.append(rollback_rule(rule, chunk_size=chunk_size))
+    for rule in PriceRule.objects.filter(status='scheduled', starts_at__lte=now).order_by('starts_at'):
+        result.runs.append(apply_rule(rule, chunk_size=chunk_size))
+    return result
+
+
+def cancel_rule(rule, chunk_size=1000):
+    """Stop ``rule`` now, restoring prices if it already went live."""
+    if rule.status == 'active':
+        return rollback_rule(rule, status='cancelled', chunk_size=chunk_size)
+    PriceRule.objects.filter(pk=rule.pk).update(status='cancelled')
+    return None
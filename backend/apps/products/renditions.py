@@ -0,0 +1,261 @@
+"""
+Responsive image renditions for EshoTry platform.
+
+Every uploaded catalog image (``ProductImage.image``, ``ProductVariant.image``,
+``Brand.logo``, ``Category.image``) is resized to the ``WIDTHS`` in
+``IMAGE_RENDITIONS`` and encoded in each of its ``FORMATS``. Renditions are
+stored under the SHA-256 of the source bytes
+(``renditions/ab/<hash>/320.webp``), so an image uploaded twice is rendered
+and stored once.
+
+The rendition names are saved next to the image in a ``<field>_renditions``
+JSON column::
+
+    {"source": "products/a.jpg", "hash": "ab12...",
+     "webp": {"160": "renditions/ab/ab12.../160.webp", ...}, "jpeg": {...}}
+
+so serializers build ``srcset`` maps from the row without touching storage.
+Product and variant images also get a ``PLACEHOLDER_WIDTH`` pixel wide,
+blurred WebP data URI and their dominant color, stored on the row so grid
+tiles can paint before the image arrives.
+Saving a model with a new image queues the ``generate_renditions`` task,
+which Celery's prefork pool runs in parallel across worker processes.
+Bulk-loaded rows are picked up by the ``generate_renditions`` command, which
+renders in a local process pool or fans batches out to the workers.
+"""
+import base64
+import hashlib
+import io
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+from django.db.models import F, Q
+from django.db.models.fields.json import KeyTextTransform
+from django.db.models.signals import post_save
+from PIL import Image, ImageFilter, ImageOps
+
+from .models import Brand, Category, ProductImage, ProductVariant
+
+# Models with renditions and their image field
+IMAGE_FIELDS = {
+    ProductImage: 'image',
+    ProductVariant: 'image',
+    Brand: 'logo',
+    Category: 'image',
+}
+
+# Models whose rows also store a placeholder and dominant color
+PLACEHOLDER_MODELS = {ProductImage, ProductVariant}
+
+EXTENSIONS = {'webp': 'webp', 'jpeg': 'jpg'}
+
+# EXIF orientations that swap width and height
+ORIENTATION = 0x0112
+ROTATED = {5, 6, 7, 8}
+
+
+def get_setting(name):
+    return settings.IMAGE_RENDITIONS[name]
+
+
+def renditions_field(model):
+    return f'{IMAGE_FIELDS[model]}_renditions'
+
+
+def _flatten(image, background=(255, 255, 255)):
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        image = image.convert('RGBA')
+        flat = Image.new('RGB', image.size, background)
+        flat.paste(image, mask=image.getchannel('A'))
+        return flat
+    return image.convert('RGB')
+
+
+def _encode(image, file_format):
+    buffer = io.BytesIO()
+    if file_format == 'webp':
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+        image.save(buffer, 'WEBP', quality=get_setting('QUALITY'), method=4)
+    else:
+        _flatten(image).save(
+            buffer, 'JPEG', quality=get_setting('QUALITY'), optimize=True, progressive=True
+        )
+    return buffer.getvalue()
+
+
+def placeholder(data):
+    """Tiny blurred WebP data URI and dominant ``#rrggbb`` color of image bytes."""
+    width = get_setting('PLACEHOLDER_WIDTH')
+    with Image.open(io.BytesIO(data)) as opened:
+        # Decode at 1/8 scale where the format allows it
+        opened.draft('RGB', (width * 4, width * 4))
+        image = _flatten(ImageOps.exif_transpose(opened))
+    image.thumbnail((width, width * 4), Image.BOX)
+
+    buffer = io.BytesIO()
+    # WebP headers are a few bytes; a JPEG's quantization tables alone run to ~600
+    image.filter(ImageFilter.GaussianBlur(1)).save(buffer, 'WEBP', quality=40)
+    data_uri = 'data:image/webp;base64,' + base64.b64encode(buffer.getvalue()).decode('ascii')
+
+    palette = image.quantize(colors=4, method=Image.Quantize.MEDIANCUT)
+    _, index = max(palette.getcolors())
+    red, green, blue = palette.getpalette()[index * 3:index * 3 + 3]
+    return data_uri, f'#{red:02x}{green:02x}{blue:02x}'
+
+
+def render(name, with_placeholder=False):
+    """
+    Render and store the renditions of the stored image ``name``.
+
+    Runs in worker processes; touches storage but not the database.
+    """
+    with default_storage.open(name, 'rb') as handle:
+        data = handle.read()
+    digest = hashlib.sha256(data).hexdigest()
+    extra = {}
+    if with_placeholder:
+        extra['placeholder'], extra['color'] = placeholder(data)
+    root = f"{get_setting('ROOT')}/{digest[:2]}/{digest}"
+
+    with Image.open(io.BytesIO(data)) as opened:
+        # Never upscale; tiny sources get a single rendition at their own width
+        width = opened.height if opened.getexif().get(ORIENTATION) in ROTATED else opened.width
+        widths = [size for size in get_setting('WIDTHS') if size < width] or [width]
+        formats = get_setting('FORMATS')
+        result = {'source': name, 'hash': digest, **{file_format: {} for file_format in formats}}
+        missing = set()
+        for width in widths:
+            for file_format in formats:
+                path = f'{root}/{width}.{EXTENSIONS[file_format]}'
+                result[file_format][str(width)] = path
+                if not default_storage.exists(path):
+                    missing.add(path)
+        if not missing:
+            # Same bytes were rendered before (duplicate upload or re-run)
+            return result, extra
+
+        # Let the JPEG decoder downscale while decoding
+        widest = max(widths)
+        opened.draft('RGB', (widest, widest * opened.height // max(opened.width, 1)))
+        source = ImageOps.exif_transpose(opened)
+        source.load()
+
+    # Widest first: each width is resampled from the previous one, not the source
+    image = source
+    for width in sorted(widths, reverse=True):
+        height = max(round(source.height * width / source.width), 1)
+        image = image.resize((width, height), Image.LANCZOS, reducing_gap=3.0)
+        for file_format in formats:
+            path = result[file_format][str(width)]
+            if path not in missing:
+                continue
+            saved = default_storage.save(path, ContentFile(_encode(image, file_format)))
+            if saved != path:
+                # Another worker stored the same rendition first
+                default_storage.delete(saved)
+    return result, extra
+
+
+def _render_many(names, with_placeholder=False):
+    rendered = {}
+    for name in names:
+        try:
+            rendered[name] = render(name, with_placeholder)
+        except (OSError, Image.DecompressionBombError, ValueError):
+            # Missing or unreadable source; leave the row for a later run
+            continue
+    return rendered
+
+
+def _init_worker():
+    import django
+    django.setup()
+    connections.close_all()
+
+
+def pending(model, force=False):
+    """Rows of ``model`` whose image has no renditions for its current file."""
+    field = IMAGE_FIELDS[model]
+    queryset = model.objects.exclude(**{f'{field}__isnull': True}).exclude(**{field: ''})
+    if force:
+        return queryset
+    stale = Q(rendered_source__isnull=True) | ~Q(rendered_source=F(field))
+    if model in PLACEHOLDER_MODELS:
+        stale |= Q(**{f'{field}_placeholder': ''})
+    return queryset.annotate(
+        rendered_source=KeyTextTransform('source', renditions_field(model))
+    ).filter(stale)
+
+
+def _save(model, rows, rendered):
+    field, target = IMAGE_FIELDS[model], renditions_field(model)
+    fields = [target]
+    if model in PLACEHOLDER_MODELS:
+        fields += [f'{field}_placeholder', f'{field}_color']
+    changed = []
+    for row in rows:
+        name = getattr(row, field).name
+        if name in rendered:
+            renditions, extra = rendered[name]
+            setattr(row, target, renditions)
+            if extra:
+                setattr(row, f'{field}_placeholder', extra['placeholder'])
+                setattr(row, f'{field}_color', extra['color'])
+            changed.append(row)
+    model.objects.bulk_update(changed, fields)
+    return len(changed)
+
+
+def generate(model, pks, workers=1):
+    """Render the images of ``model`` rows ``pks`` and record their renditions."""
+    field = IMAGE_FIELDS[model]
+    rows = list(model.objects.filter(pk__in=pks).only('pk', field))
+    names = sorted({getattr(row, field).name for row in rows if getattr(row, field)})
+    with_placeholder = model in PLACEHOLDER_MODELS
+    if workers <= 1 or len(names) <= 1:
+        rendered = _render_many(names, with_placeholder)
+    else:
+        connections.close_all()
+        rendered = {}
+        size = max(len(names) // (workers * 4), 1)
+        parts = [names[i:i + size] for i in range(0, len(names), size)]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            for part in pool.map(_render_many, parts, [with_placeholder] * len(parts)):
+                rendered.update(part)
+    return _save(model, rows, rendered)
+
+
+def rendition_urls(renditions, request=None):
+    """``{format: {width: url}}`` for a stored renditions map."""
+    urls = {}
+    for file_format in get_setting('FORMATS'):
+        names = (renditions or {}).get(file_format)
+        if not names:
+            continue
+        urls[file_format] = {}
+        for width, name in names.items():
+            url = default_storage.url(name)
+            urls[file_format][width] = request.build_absolute_uri(url) if request else url
+    return urls
+
+
+def _queue(model, pk):
+    from .tasks import generate_renditions
+    generate_renditions.delay(model._meta.label, [str(pk)])
+
+
+def _image_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    image = getattr(instance, IMAGE_FIELDS[sender])
+    renditions = getattr(instance, renditions_field(sender)) or {}
+    if image and renditions.get('source') != image.name:
+        transaction.on_commit(lambda: _queue(sender, instance.pk))
+
+
+for _model in IMAGE_FIELDS:
+    post_save.connect(_image_saved, sender=_model, dispatch_uid=f'renditions.{_model._meta.label}')
@@ -1,12 +1,83 @@
 """
 Serializers for product-related models.
 """
+from collections import defaultdict
+
 from rest_framework import serializers
-from django.db.models import Avg, Count
+from django.db.models import Avg, Count, Exists, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from eshotry.money import format_cents, percent_off
+from .cents import with_price_cents
 from .models import (
     Category, Brand, Product, ProductImage, ProductVariant,
     ProductReview, ProductAttribute, ProductAttributeValue, Wishlist
 )
+from .renditions import rendition_urls
+
+
+class CentsField(serializers.ReadOnlyField):
+    """Render an integer-cents amount as a two-place decimal string."""
+    
+    def to_representation(self, value):
+        return format_cents(value) if value is not None else None
+
+
+class RenditionsField(serializers.ReadOnlyField):
+    """``{format: {width: url}}`` map of precomputed image renditions."""
+    
+    def to_representation(self, value):
+        return rendition_urls(value, self.context.get('request'))
+
+
+def active_category_tree(categories):
+    """``categories`` with their active subtrees and product counts attached.
+
+    Every active category is loaded once, so serializing a tree costs one
+    query however deep it is, instead of two per node.
+    """
+    loaded = Category.objects.filter(is_active=True).annotate(
+        active_product_count=Count('products', filter=Q(products__status='active'))
+    )
+    counts = {}
+    children = defaultdict(list)
+    for category in loaded:
+        counts[category.pk] = category.active_product_count
+        children[category.parent_id].append(category)
+
+    def attach(category):
+        category.active_product_count = counts.get(category.pk, 0)
+        category.active_children = children[category.pk]
+        for child in category.active_children:
+            child.parent = category
+            attach(child)
+
+    for category in categories:
+        attach(category)
+    return categories
+
+
+def with_list_stats(queryset, request=None):
+    """``queryset`` annotated with what ``ProductListSerializer`` reports per product."""
+    queryset = with_price_cents(queryset)
+    approved = ProductReview.objects.filter(
+        product=OuterRef('pk'), is_approved=True
+    ).order_by().values('product')
+    queryset = queryset.annotate(
+        approved_rating=Subquery(approved.annotate(value=Avg('rating')).values('value')),
+        approved_review_count=Coalesce(
+            Subquery(approved.annotate(value=Count('pk')).values('value')), 0
+        ),
+    )
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        queryset = queryset.annotate(
+            wishlisted=Exists(Wishlist.objects.filter(user=user, product=OuterRef('pk')))
+        )
+    return queryset
+
+
+def _rating(average):
+    return round(float(average), 1) if average else 0
 
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -15,26 +86,27 @@ class CategorySerializer(serializers.ModelSerializer):
     children = serializers.SerializerMethodField()
     product_count = serializers.SerializerMethodField()
     full_path = serializers.ReadOnlyField()
+    image_renditions = RenditionsField()
     
     class Meta:
         model = Category
         fields = [
             'id', 'name', 'slug', 'description', 'parent', 'image',
-            'is_active', 'sort_order', 'full_path', 'children', 
+            'image_renditions', 'is_active', 'sort_order', 'full_path', 'children', 
             'product_count', 'created_at'
         ]
         read_only_fields = ['id', 'created_at']
     
     def get_children(self, obj):
-        if obj.children.exists():
-            return CategorySerializer(
-                obj.children.filter(is_active=True), 
-                many=True, 
-                context=self.context
-            ).data
-        return []
+        if hasattr(obj, 'active_children'):
+            children = obj.active_children
+        else:
+            children = obj.children.filter(is_active=True)
+        return CategorySerializer(children, many=True, context=self.context).data
     
     def get_product_count(self, obj):
+        if hasattr(obj, 'active_product_count'):
+            return obj.active_product_count
         return obj.products.filter(status='active').count()
 
 
@@ -42,26 +114,31 @@ class BrandSerializer(serializers.ModelSerializer):
     """Serializer for product brands."""
     
     product_count = serializers.SerializerMethodField()
+    logo_renditions = RenditionsField()
     
     class Meta:
         model = Brand
         fields = [
-            'id', 'name', 'slug', 'description', 'logo', 'website',
+            'id', 'name', 'slug', 'description', 'logo', 'logo_renditions', 'website',
             'is_active', 'product_count', 'created_at'
         ]
         read_only_fields = ['id', 'created_at']
     
     def get_product_count(self, obj):
+        if hasattr(obj, 'active_product_count'):
+            return obj.active_product_count
         return obj.products.filter(status='active').count()
 
 
 class ProductImageSerializer(serializers.ModelSerializer):
     """Serializer for product images."""
     
+    image_renditions = RenditionsField()
+    
     class Meta:
         model = ProductImage
         fields = [
-            'id', 'image', 'alt_text', 'is_primary', 'sort_order', 'created_at'
+            'id', 'image', 'image_renditions', 'image_placeholder', 'image_color', 'alt_text', 'is_primary', 'sort_order', 'created_at'
         ]
         read_only_fields = ['id', 'created_at']
 
@@ -69,14 +146,16 @@ class ProductImageSerializer(serializers.ModelSerializer):
 class ProductVariantSerializer(serializers.ModelSerializer):
     """Serializer for product variants."""
     
-    final_price = serializers.ReadOnlyField()
+    final_price = CentsField(source='final_cents')  # see cents.with_final_cents
     is_in_stock = serializers.ReadOnlyField()
+    image_renditions = RenditionsField()
     
     class Meta:
         model = ProductVariant
         fields = [
             'id', 'size', 'color', 'color_hex', 'sku', 'stock_quantity',
-            'price_adjustment', 'final_price', 'image', 'is_active',
+            'price_adjustment', 'final_price', 'image', 'image_renditions',
+            'image_placeholder', 'image_color', 'is_active',
             'is_in_stock', 'created_at'
         ]
         read_only_fields = ['id', 'created_at']
@@ -118,15 +197,33 @@ class ProductReviewSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
-class ProductListSerializer(serializers.ModelSerializer):
+class ProductPriceSerializer(serializers.ModelSerializer):
+    """Price fields rendered from the integer cents of ``cents.with_price_cents``."""
+    
+    base_price = CentsField(source='base_cents')
+    sale_price = CentsField(source='sale_cents')
+    current_price = CentsField(source='current_cents')
+    is_on_sale = serializers.SerializerMethodField()
+    discount_percentage = serializers.SerializerMethodField()
+    
+    def get_is_on_sale(self, obj):
+        return bool(obj.sale_cents and obj.sale_cents < obj.base_cents)
+    
+    def get_discount_percentage(self, obj):
+        if self.get_is_on_sale(obj):
+            return percent_off(obj.base_cents, obj.sale_cents)
+        return 0
+
+
+class ProductListSerializer(ProductPriceSerializer):
     """Lightweight serializer for product lists."""
     
     category_name = serializers.CharField(source='category.name', read_only=True)
     brand_name = serializers.CharField(source='brand.name', read_only=True)
     primary_image = serializers.SerializerMethodField()
-    current_price = serializers.ReadOnlyField()
-    is_on_sale = serializers.ReadOnlyField()
-    discount_percentage = serializers.ReadOnlyField()
+    primary_image_renditions = serializers.SerializerMethodField()
+    primary_image_placeholder = serializers.SerializerMethodField()
+    primary_image_color = serializers.SerializerMethodField()
     is_in_stock = serializers.ReadOnlyField()
     average_rating = serializers.SerializerMethodField()
     review_count = serializers.SerializerMethodField()
@@ -139,12 +236,17 @@ class ProductListSerializer(serializers.ModelSerializer):
             'brand_name', 'gender', 'sku', 'base_price', 'sale_price',
             'current_price', 'is_on_sale', 'discount_percentage',
             'is_in_stock', 'is_featured', 'is_virtual_tryon_enabled',
-            'primary_image', 'average_rating', 'review_count',
+            'primary_image', 'primary_image_renditions', 'primary_image_placeholder',
+            'primary_image_color', 'average_rating', 'review_count',
             'is_wishlisted', 'view_count'
         ]
     
+    def _primary_image(self, obj):
+        # Reads the prefetched images instead of querying per product
+        return next((image for image in obj.images.all() if image.is_primary), None)
+    
     def get_primary_image(self, obj):
-        primary_image = obj.images.filter(is_primary=True).first()
+        primary_image = self._primary_image(obj)
         if primary_image:
             request = self.context.get('request')
             if request:
@@ -152,23 +254,43 @@ class ProductListSerializer(serializers.ModelSerializer):
             return primary_image.image.url
         return None
     
+    def get_primary_image_renditions(self, obj):
+        primary_image = self._primary_image(obj)
+        if primary_image:
+            return rendition_urls(primary_image.image_renditions, self.context.get('request'))
+        return {}
+    
+    def get_primary_image_placeholder(self, obj):
+        primary_image = self._primary_image(obj)
+        return primary_image.image_placeholder if primary_image else ''
+    
+    def get_primary_image_color(self, obj):
+        primary_image = self._primary_image(obj)
+        return primary_image.image_color if primary_image else ''
+    
+    # The approved_*/wishlisted values come from with_list_stats when the view used it
     def get_average_rating(self, obj):
-        avg_rating = obj.reviews.filter(is_approved=True).aggregate(
+        if hasattr(obj, 'approved_rating'):
+            return _rating(obj.approved_rating)
+        return _rating(obj.reviews.filter(is_approved=True).aggregate(
             avg_rating=Avg('rating')
-        )['avg_rating']
-        return round(avg_rating, 1) if avg_rating else 0
+        )['avg_rating'])
     
     def get_review_count(self, obj):
+        if hasattr(obj, 'approved_review_count'):
+            return obj.approved_review_count
         return obj.reviews.filter(is_approved=True).count()
     
     def get_is_wishlisted(self, obj):
         request = self.context.get('request')
         if request and request.user.is_authenticated:
+            if hasattr(obj, 'wishlisted'):
+                return obj.wishlisted
             return Wishlist.objects.filter(user=request.user, product=obj).exists()
         return False
 
 
-class ProductDetailSerializer(serializers.ModelSerializer):
+class ProductDetailSerializer(ProductPriceSerializer):
     """Detailed serializer for product detail view."""
     
     category = CategorySerializer(read_only=True)
@@ -178,9 +300,6 @@ class ProductDetailSerializer(serializers.ModelSerializer):
     attribute_values = ProductAttributeValueSerializer(many=True, read_only=True)
     reviews = serializers.SerializerMethodField()
     
-    current_price = serializers.ReadOnlyField()
-    is_on_sale = serializers.ReadOnlyField()
-    discount_percentage = serializers.ReadOnlyField()
     is_in_stock = serializers.ReadOnlyField()
     is_low_stock = serializers.ReadOnlyField()
     
@@ -210,24 +329,29 @@ class ProductDetailSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'view_count', 'purchase_count', 'created_at']
     
     def get_reviews(self, obj):
-        reviews = obj.reviews.filter(is_approved=True)[:5]  # Latest 5 reviews
+        reviews = obj.reviews.filter(is_approved=True).select_related('user')[:5]  # Latest 5 reviews
         return ProductReviewSerializer(reviews, many=True, context=self.context).data
     
+    def _rating_counts(self, obj):
+        # One grouped query feeds the average, the count and the distribution
+        if not hasattr(obj, '_rating_counts'):
+            obj._rating_counts = dict(
+                obj.reviews.filter(is_approved=True).order_by()
+                .values_list('rating').annotate(count=Count('pk'))
+            )
+        return obj._rating_counts
+    
     def get_average_rating(self, obj):
-        avg_rating = obj.reviews.filter(is_approved=True).aggregate(
-            avg_rating=Avg('rating')
-        )['avg_rating']
-        return round(avg_rating, 1) if avg_rating else 0
+        counts = self._rating_counts(obj)
+        total = sum(counts.values())
+        return _rating(sum(rating * count for rating, count in counts.items()) / total) if total else 0
     
     def get_review_count(self, obj):
-        return obj.reviews.filter(is_approved=True).count()
+        return sum(self._rating_counts(obj).values())
     
     def get_rating_distribution(self, obj):
-        distribution = {}
-        for i in range(1, 6):
-            count = obj.reviews.filter(is_approved=True, rating=i).count()
-            distribution[str(i)] = count
-        return distribution
+        counts = self._rating_counts(obj)
+        return {str(i): counts.get(i, 0) for i in range(1, 6)}
     
     def get_is_wishlisted(self, obj):
         request = self.context.get('request')
@@ -235,13 +359,16 @@ class ProductDetailSerializer(serializers.ModelSerializer):
             return Wishlist.objects.filter(user=request.user, product=obj).exists()
         return False
     
+    # Read from the prefetched variants
     def get_available_sizes(self, obj):
-        sizes = obj.variants.filter(is_active=True).values_list('size', flat=True).distinct()
-        return list(sizes)
+        sizes = (variant.size for variant in obj.variants.all() if variant.is_active)
+        return list(dict.fromkeys(sizes))
     
     def get_available_colors(self, obj):
-        colors = obj.variants.filter(is_active=True).values('color', 'color_hex').distinct()
-        return list(colors)
+        colors = (
+            (variant.color, variant.color_hex) for variant in obj.variants.all() if variant.is_active
+        )
+        return [{'color': color, 'color_hex': color_hex} for color, color_hex in dict.fromkeys(colors)]
 
 
 class ProductAttributeSerializer(serializers.ModelSerializer):
@@ -269,11 +396,13 @@ class WishlistSerializer(serializers.ModelSerializer):
     
     def create(self, validated_data):
         validated_data['user'] = self.context['request'].user
+        # validate_product_id returns the product itself
+        validated_data['product'] = validated_data.pop('product_id')
         return super().create(validated_data)
     
     def validate_product_id(self, value):
         try:
-            product = Product.objects.get(id=value, status='active')
+            product = with_price_cents(Product.objects).get(id=value, status='active')
             return product
         except Product.DoesNotExist:
             raise serializers.ValidationError("Product not found or inactive.")
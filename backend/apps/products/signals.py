@@ -0,0 +1,13 @@
+"""
+Signals for product catalog changes.
+"""
+from django.dispatch import Signal
+
+# Sent once after a bulk catalog import with ``skus`` (the upserted product SKUs).
+# Cache and search index refreshers connect here instead of to per-row post_save.
+catalog_imported = Signal()
+
+# Sent once per price rule run with ``rule`` and ``action`` ('applied' or 'rolled_back').
+catalog_repriced = Signal()
+
+CATALOG_NAMESPACE = 'catalog'
@@ -0,0 +1,591 @@
+"""
+Synthetic dataset generator for load and benchmark environments.
+
+Volumes are configurable up to millions of products. Popularity is Zipf
+distributed, so a few products take most of the orders, reviews, wishlists
+and carts while the long tail has none. All values come from NumPy
+generators seeded with ``(seed, table, chunk)``, so a given seed, chunk size
+and end date always produce the same rows, whatever the number of workers.
+
+Rows are built as plain tuples and loaded with ``COPY ... FROM STDIN`` on
+PostgreSQL (``bulk_create`` elsewhere), one chunk per transaction, across a
+pool of forked worker processes.
+"""
+import io
+import json
+import multiprocessing
+from dataclasses import dataclass
+from datetime import date, datetime, time as dt_time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+import numpy as np
+from django.contrib.auth.hashers import make_password
+from django.db import connection, connections, models, transaction
+
+from eshotry.ids import SNOWFLAKE_EPOCH_MS, encode_base32
+
+SIZES = ['XS', 'S', 'M', 'L', 'XL', 'XXL']
+COLORS = [
+    ('Black', '#000000'), ('White', '#FFFFFF'), ('Navy', '#1F2A44'), ('Red', '#C0392B'),
+    ('Olive', '#708238'), ('Beige', '#D9C8A9'), ('Grey', '#8E8E8E'), ('Pink', '#E8A0BF'),
+]
+ADJECTIVES = [
+    'Classic', 'Slim', 'Relaxed', 'Vintage', 'Essential', 'Cropped', 'Oversized', 'Tailored',
+    'Everyday', 'Premium', 'Lightweight', 'Structured', 'Soft', 'Washed', 'Ribbed', 'Pleated',
+]
+MATERIALS = ['Cotton', 'Linen', 'Denim', 'Wool', 'Silk', 'Jersey', 'Fleece', 'Leather', 'Twill']
+ITEMS = [
+    'T-Shirt', 'Shirt', 'Blouse', 'Dress', 'Jeans', 'Chinos', 'Skirt', 'Jacket', 'Coat',
+    'Hoodie', 'Sweater', 'Shorts', 'Blazer', 'Cardigan', 'Joggers', 'Polo',
+]
+CATEGORY_WORDS = [
+    'Women', 'Men', 'Kids', 'Tops', 'Bottoms', 'Outerwear', 'Dresses', 'Knitwear', 'Denim',
+    'Active', 'Lounge', 'Formal', 'Basics', 'Summer', 'Winter', 'Workwear', 'Party', 'Travel',
+]
+CITIES = ['Dhaka', 'Chittagong', 'Sylhet', 'Khulna', 'Rajshahi', 'Barisal', 'Rangpur']
+REVIEW_TITLES = ['Love it', 'Great fit', 'Runs small', 'Runs large', 'Good value', 'Not for me',
+                 'Perfect', 'Nice fabric', 'Okay', 'Disappointed']
+
+ORDER_STATUSES = ['pending', 'confirmed', 'processing', 'shipped', 'delivered', 'cancelled', 'refunded']
+ORDER_STATUS_WEIGHTS = [0.08, 0.05, 0.05, 0.10, 0.57, 0.10, 0.05]
+PAYMENT_STATUS = {
+    'pending': 'pending', 'confirmed': 'paid', 'processing': 'paid', 'shipped': 'paid',
+    'delivered': 'paid', 'cancelled': 'failed', 'refunded': 'refunded',
+}
+
+TABLES = ('users', 'products', 'variants', 'reviews', 'wishlists', 'carts', 'orders')
+MS_PER_DAY = 86_400_000
+
+
+@dataclass
+class Volumes:
+    users: int = 10_000
+    brands: int = 200
+    category_depth: int = 3
+    category_fanout: int = 5
+    products: int = 10_000
+    reviews: int = 50_000
+    wishlists: int = 20_000
+    carts: int = 2_000
+    orders: int = 20_000
+    zipf: float = 1.1
+    days: int = 730
+
+
+def uuid7_text(ms, rand_a, rand_b):
+    """Deterministic UUIDv7 string from a timestamp and random bits."""
+    return '%08x-%04x-7%03x-%04x-%012x' % (
+        ms >> 16, ms & 0xFFFF, rand_a & 0xFFF,
+        0x8000 | ((rand_b >> 48) & 0x3FFF), rand_b & 0xFFFFFFFFFFFF,
+    )
+
+
+def chunk_rng(seed, table, chunk):
+    return np.random.default_rng([seed, TABLES.index(table), chunk])
+
+
+class IdSpace:
+    """Time-ordered ids for ``count`` rows created between two timestamps."""
+
+    def __init__(self, rng, count, start_ms, end_ms):
+        self.ms = np.sort(rng.integers(start_ms, end_ms, size=count, dtype=np.int64))
+        self.rand_a = rng.integers(0, 1 << 12, size=count, dtype=np.int64)
+        self.rand_b = rng.integers(0, 1 << 62, size=count, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.ms)
+
+    def __getitem__(self, index):
+        return uuid7_text(int(self.ms[index]), int(self.rand_a[index]), int(self.rand_b[index]))
+
+    def created_at(self, index):
+        return _datetime(int(self.ms[index]))
+
+
+def _datetime(ms):
+    return datetime.fromtimestamp(ms / 1000, tz=dt_timezone.utc)
+
+
+def zipf_weights(rng, count, exponent):
+    """Zipf weights assigned to a random permutation of ``count`` items."""
+    weights = 1.0 / np.arange(1, count + 1, dtype=np.float64) ** exponent
+    weights /= weights.sum()
+    return weights[rng.permutation(count)]
+
+
+class TableLoader:
+    """Fill model rows from overrides and load them in bulk."""
+
+    def __init__(self, model, now):
+        self.model = model
+        fields = model._meta.concrete_fields
+        self.attnames = [f.attname for f in fields]
+        self.columns = [f.column for f in fields]
+        self.index = {name: i for i, name in enumerate(self.attnames)}
+        self.json_columns = {i for i, f in enumerate(fields) if isinstance(f, models.JSONField)}
+        self.defaults = []
+        for f in fields:
+            if isinstance(f, models.DateTimeField) and (f.auto_now or f.auto_now_add):
+                self.defaults.append(now)
+            else:
+                self.defaults.append(f.get_default())
+        self.rows = []
+
+    def add(self, **values):
+        row = list(self.defaults)
+        index = self.index
+        for name, value in values.items():
+            row[index[name]] = value
+        self.rows.append(row)
+
+    def load(self, using):
+        if not self.rows:
+            return 0
+        if using.vendor == 'postgresql':
+            self._copy(using)
+        else:
+            self.model.objects.using(using.alias).bulk_create(
+                [self.model(**dict(zip(self.attnames, row))) for row in self.rows],
+                batch_size=1000,
+            )
+        count = len(self.rows)
+        self.rows = []
+        return count
+
+    def _copy(self, using):
+        buffer = io.StringIO()
+        json_columns = self.json_columns
+        for row in self.rows:
+            buffer.write('\t'.join(
+                _copy_text(json.dumps(value) if i in json_columns else value)
+                for i, value in enumerate(row)
+            ))
+            buffer.write('\n')
+        buffer.seek(0)
+        columns = ', '.join(f'"{column}"' for column in self.columns)
+        with using.cursor() as cursor:
+            cursor.cursor.copy_expert(
+                f'COPY "{self.model._meta.db_table}" ({columns}) FROM STDIN', buffer
+            )
+
+
+def _copy_text(value):
+    if value is None:
+        return '\\N'
+    if value is True:
+        return 't'
+    if value is False:
+        return 'f'
+    if isinstance(value, datetime):
+        return value.isoformat()
+    value = str(value)
+    if '\\' in value or '\t' in value or '\n' in value or '\r' in value:
+        value = (value.replace('\\', '\\\\').replace('\t', '\\t')
+                 .replace('\n', '\\n').replace('\r', '\\r'))
+    return value
+
+
+class Plan:
+    """Shared, deterministic skeleton every chunk generator reads from."""
+
+    def __init__(self, seed, volumes, end_date):
+        self.seed = seed
+        self.volumes = volumes
+        end_ms = int(datetime.combine(end_date, dt_time.min, dt_timezone.utc).timestamp() * 1000)
+        self.end_ms = end_ms
+        self.start_ms = end_ms - volumes.days * MS_PER_DAY
+        self.now = _datetime(end_ms)
+        self.tag = f's{seed}'
+        self.password = make_password('synthetic')
+
+        rng = np.random.default_rng([seed, 1000])
+        self.users = IdSpace(rng, volumes.users, self.start_ms, end_ms)
+        self.products = IdSpace(rng, volumes.products, self.start_ms, end_ms - MS_PER_DAY)
+        # Prices are log-normal around ~35.00, in cents
+        self.price_cents = np.clip(
+            np.round(rng.lognormal(np.log(3500), 0.6, size=volumes.products) / 100) * 100 - 1,
+            499, 99_999,
+        ).astype(np.int64)
+        self.product_weights = zipf_weights(rng, volumes.products, volumes.zipf)
+        self.product_cdf = np.cumsum(self.product_weights)
+        self.user_weights = zipf_weights(rng, volumes.users, 0.8)
+        self.user_cdf = np.cumsum(self.user_weights)
+        self.cart_users = rng.permutation(volumes.users)[:min(volumes.carts, volumes.users)]
+
+        self.brand_ids = [uuid7_text(self.start_ms, i, int(rng.integers(0, 1 << 62)))
+                          for i in range(volumes.brands)]
+        self.brand_cdf = np.cumsum(zipf_weights(rng, volumes.brands, 1.0))
+        self.categories = self._category_tree(rng)
+        leaves = [category for category in self.categories if category['leaf']]
+        self.leaf_ids = [category['id'] for category in leaves]
+        self.leaf_cdf = np.cumsum(zipf_weights(rng, len(leaves), 0.7))
+
+        # Reviews follow popularity with a long tail of unreviewed products
+        expected = self.product_weights * volumes.reviews
+        self.review_counts = np.minimum(rng.poisson(expected), volumes.users).astype(np.int64)
+
+    def _category_tree(self, rng):
+        categories = []
+        level = [None]
+        for depth in range(self.volumes.category_depth):
+            next_level = []
+            for parent in level:
+                for _ in range(self.volumes.category_fanout):
+                    index = len(categories)
+                    word = CATEGORY_WORDS[index % len(CATEGORY_WORDS)]
+                    category = {
+                        'id': uuid7_text(self.start_ms, index, int(rng.integers(0, 1 << 62))),
+                        'name': f'{word} {index} ({self.tag})',
+                        'slug': f'{self.tag}-{word.lower()}-{index}',
+                        'parent_id': parent['id'] if parent else None,
+                        'sort_order': index,
+                        'leaf': depth == self.volumes.category_depth - 1,
+                    }
+                    categories.append(category)
+                    next_level.append(category)
+            level = next_level
+        return categories
+
+    def pick(self, rng, cdf, size):
+        return np.minimum(np.searchsorted(cdf, rng.random(size) * cdf[-1]), len(cdf) - 1)
+
+    def product_sku(self, index):
+        return f'SYN-{self.tag}-{index:08d}'
+
+    def product_name(self, index):
+        return (f'{ADJECTIVES[index % 16]} {MATERIALS[(index // 16) % 9]} '
+                f'{ITEMS[(index // 144) % 16]} {index}')
+
+    def order_number(self, ms, index):
+        value = ((ms - SNOWFLAKE_EPOCH_MS) << 22) | (index & 0x3FFFFF)
+        return f'SY{self.seed % 100:02d}{encode_base32(value)}'
+
+
+def generate_reference(plan, using):
+    """Categories and brands, loaded by the parent process."""
+    from .models import Brand, Category
+
+    categories = TableLoader(Category, plan.now)
+    for category in plan.categories:
+        categories.add(
+            id=category['id'], name=category['name'], slug=category['slug'],
+            parent_id=category['parent_id'], sort_order=category['sort_order'],
+            created_at=plan.now, updated_at=plan.now,
+        )
+    brands = TableLoader(Brand, plan.now)
+    for index, brand_id in enumerate(plan.brand_ids):
+        brands.add(
+            id=brand_id, name=f'Brand {plan.tag} {index}', slug=f'{plan.tag}-brand-{index}',
+            created_at=plan.now, updated_at=plan.now,
+        )
+    with transaction.atomic(using=using.alias):
+        return categories.load(using) + brands.load(using)
+
+
+def generate_users(plan, rng, start, stop, now):
+    from apps.users.models import User
+
+    users = TableLoader(User, now)
+    password = plan.password
+    genders = rng.choice(['M', 'F', 'O', 'P'], size=stop - start, p=[0.45, 0.45, 0.05, 0.05])
+    heights = rng.normal(168, 10, size=stop - start).clip(140, 210).astype(int)
+    weights = rng.normal(68, 14, size=stop - start).clip(40, 150).astype(int)
+    body_types = rng.choice(['slim', 'athletic', 'regular', 'plus'], size=stop - start)
+    for offset, index in enumerate(range(start, stop)):
+        created = plan.users.created_at(index)
+        users.add(
+            id=plan.users[index], username=f'{plan.tag}-user-{index}',
+            email=f'{plan.tag}-user-{index}@example.com', password=password,
+            first_name='Synthetic', last_name=f'User {index}', date_joined=created,
+            gender=str(genders[offset]), height=int(heights[offset]), weight=int(weights[offset]),
+            body_type=str(body_types[offset]), preferred_colors=[], preferred_styles=[],
+            size_preferences={}, created_at=created, updated_at=created, last_active=created,
+        )
+    return [users]
+
+
+def generate_products(plan, rng, start, stop, now):
+    from .models import Product, ProductImage
+
+    products = TableLoader(Product, now)
+    images = TableLoader(ProductImage, now)
+    count = stop - start
+    brands = plan.pick(rng, plan.brand_cdf, count)
+    leaves = plan.pick(rng, plan.leaf_cdf, count)
+    genders = rng.choice(['M', 'F', 'U', 'K'], size=count, p=[0.35, 0.45, 0.12, 0.08])
+    on_sale = rng.random(count) < 0.2
+    discounts = rng.integers(10, 50, size=count)
+    stock = rng.integers(0, 500, size=count)
+    image_counts = rng.integers(1, 5, size=count)
+
+    for offset, index in enumerate(range(start, stop)):
+        product_id = plan.products[index]
+        created = plan.products.created_at(index)
+        price = int(plan.price_cents[index])
+        sale = price - price * int(discounts[offset]) // 100 if on_sale[offset] else None
+        name = plan.product_name(index)
+        products.add(
+            id=product_id, name=name, slug=f'{plan.tag}-product-{index}',
+            description=f'{name}. Synthetic product for load testing.',
+            short_description=name, category_id=plan.leaf_ids[leaves[offset]],
+            brand_id=plan.brand_ids[brands[offset]], gender=str(genders[offset]),
+            sku=plan.product_sku(index), status='active',
+            base_price=Decimal(price).scaleb(-2),
+            sale_price=Decimal(sale).scaleb(-2) if sale else None,
+            stock_quantity=int(stock[offset]), material=MATERIALS[(index // 16) % 9],
+            created_at=created, updated_at=created,
+        )
+        for position in range(int(image_counts[offset])):
+            images.add(
+                id=uuid7_text(int(plan.products.ms[index]), position, int(rng.integers(0, 1 << 62))),
+                product_id=product_id, image=f'products/synthetic/{index}_{position}.jpg',
+                is_primary=position == 0, sort_order=position, created_at=created,
+            )
+    return [products, images]
+
+
+def generate_variants(plan, rng, start, stop, now):
+    from .models import ProductVariant
+
+    variants = TableLoader(ProductVariant, now)
+    for index in range(start, stop):
+        sizes = SIZES[int(rng.integers(0, 2)):int(rng.integers(3, 7))]
+        colors = rng.choice(len(COLORS), size=int(rng.integers(1, 4)), replace=False)
+        created = plan.products.created_at(index)
+        ms = int(plan.products.ms[index])
+        for color_index in colors:
+            color, color_hex = COLORS[color_index]
+            for size in sizes:
+                variants.add(
+                    id=uuid7_text(ms, len(variants.rows), int(rng.integers(0, 1 << 62))),
+                    product_id=plan.products[index], size=size, color=color,
+                    color_hex=color_hex, sku=f'{plan.product_sku(index)}-{size}-{color}',
+                    stock_quantity=int(rng.integers(0, 60)),
+                    price_adjustment=Decimal(0 if size != 'XXL' else 200).scaleb(-2),
+                    created_at=created, updated_at=created,
+                )
+    return [variants]
+
+
+def generate_reviews(plan, rng, start, stop, now):
+    from .models import ProductReview
+
+    reviews = TableLoader(ProductReview, now)
+    users = plan.volumes.users
+    for index in range(start, stop):
+        count = int(plan.review_counts[index])
+        if not count:
+            continue
+        reviewers = rng.choice(users, size=count, replace=False)
+        ratings = rng.choice(5, size=count, p=[0.05, 0.07, 0.13, 0.30, 0.45]) + 1
+        fits = rng.choice(['small', 'true', 'large', ''], size=count, p=[0.2, 0.5, 0.15, 0.15])
+        product_ms = int(plan.products.ms[index])
+        offsets = rng.integers(0, max(plan.end_ms - product_ms, 1), size=count)
+        for k in range(count):
+            ms = product_ms + int(offsets[k])
+            rating = int(ratings[k])
+            reviews.add(
+                id=uuid7_text(ms, k, int(rng.integers(0, 1 << 62))),
+                product_id=plan.products[index], user_id=plan.users[int(reviewers[k])],
+                rating=rating, title=REVIEW_TITLES[(rating * 2 + k) % len(REVIEW_TITLES)],
+                content=f'Rated {rating} out of 5.', size_purchased=SIZES[k % len(SIZES)],
+                fit_feedback=str(fits[k]), is_verified_purchase=bool(rating % 2),
+                created_at=_datetime(ms), updated_at=_datetime(ms),
+            )
+    return [reviews]
+
+
+def generate_wishlists(plan, rng, start, stop, now):
+    from .models import Wishlist
+
+    wishlists = TableLoader(Wishlist, now)
+    counts = rng.poisson(plan.volumes.wishlists * plan.user_weights[start:stop])
+    for offset, user_index in enumerate(range(start, stop)):
+        if not counts[offset]:
+            continue
+        user_ms = int(plan.users.ms[user_index])
+        for product_index in np.unique(plan.pick(rng, plan.product_cdf, int(counts[offset]))):
+            ms = max(user_ms, int(plan.products.ms[product_index]))
+            wishlists.add(
+                id=uuid7_text(ms, user_index & 0xFFF, int(rng.integers(0, 1 << 62))),
+                user_id=plan.users[user_index], product_id=plan.products[int(product_index)],
+                created_at=_datetime(ms),
+            )
+    return [wishlists]
+
+
+def generate_carts(plan, rng, start, stop, now):
+    from apps.orders.models import Cart, CartItem
+
+    carts = TableLoader(Cart, now)
+    items = TableLoader(CartItem, now)
+    for index in range(start, stop):
+        user_index = int(plan.cart_users[index])
+        ms = plan.end_ms - int(rng.integers(0, 30 * MS_PER_DAY))
+        cart_id = uuid7_text(ms, index & 0xFFF, int(rng.integers(0, 1 << 62)))
+        carts.add(id=cart_id, user_id=plan.users[user_index],
+                  created_at=_datetime(ms), updated_at=_datetime(ms))
+        for position, product_index in enumerate(
+                np.unique(plan.pick(rng, plan.product_cdf, int(rng.integers(1, 5))))):
+            items.add(
+                id=uuid7_text(ms, position, int(rng.integers(0, 1 << 62))), cart_id=cart_id,
+                product_id=plan.products[int(product_index)],
+                quantity=int(rng.integers(1, 3)), created_at=_datetime(ms), updated_at=_datetime(ms),
+            )
+    return [carts, items]
+
+
+def generate_orders(plan, rng, start, stop, now):
+    from apps.orders.models import Order, OrderItem, OrderStatusHistory
+
+    orders = TableLoader(Order, now)
+    items = TableLoader(OrderItem, now)
+    history = TableLoader(OrderStatusHistory, now)
+    count = stop - start
+    users = plan.pick(rng, plan.user_cdf, count)
+    statuses = rng.choice(len(ORDER_STATUSES), size=count, p=ORDER_STATUS_WEIGHTS)
+    item_counts = rng.integers(1, 6, size=count)
+
+    for offset, index in enumerate(range(start, stop)):
+        user_index = int(users[offset])
+        ms = int(rng.integers(int(plan.users.ms[user_index]), plan.end_ms))
+        created = _datetime(ms)
+        order_id = uuid7_text(ms, index & 0xFFF, int(rng.integers(0, 1 << 62)))
+        status = ORDER_STATUSES[statuses[offset]]
+
+        subtotal = 0
+        for position, product_index in enumerate(
+                np.unique(plan.pick(rng, plan.product_cdf, int(item_counts[offset])))):
+            product_index = int(product_index)
+            quantity = int(rng.integers(1, 3))
+            price = int(plan.price_cents[product_index])
+            subtotal += price * quantity
+            items.add(
+                id=uuid7_text(ms, position, int(rng.integers(0, 1 << 62))), order_id=order_id,
+                product_id=plan.products[product_index],
+                product_name=plan.product_name(product_index),
+                product_sku=plan.product_sku(product_index), quantity=quantity,
+                unit_price=Decimal(price).scaleb(-2),
+                total_price=Decimal(price * quantity).scaleb(-2), created_at=created,
+            )
+        shipping = 0 if subtotal >= 5000 else 599
+        address = {'full_name': f'User {user_index}', 'city': CITIES[user_index % len(CITIES)],
+                   'country': 'BD', 'postal_code': f'{1000 + user_index % 9000}'}
+        orders.add(
+            id=order_id, user_id=plan.users[user_index], order_number=plan.order_number(ms, index),
+            status=status, payment_status=PAYMENT_STATUS[status],
+            subtotal=Decimal(subtotal).scaleb(-2), shipping_cost=Decimal(shipping).scaleb(-2),
+            total_amount=Decimal(subtotal + shipping).scaleb(-2),
+            shipping_address=address, billing_address=address, payment_method='card',
+            created_at=created, updated_at=created,
+            shipped_at=created + timedelta(days=2) if status in ('shipped', 'delivered') else None,
+            delivered_at=created + timedelta(days=5) if status == 'delivered' else None,
+        )
+        history.add(id=uuid7_text(ms, 0xFFE, int(rng.integers(0, 1 << 62))), order_id=order_id,
+                    status='pending', notes='Order placed', created_at=created)
+        if status != 'pending':
+            history.add(id=uuid7_text(ms, 0xFFF, int(rng.integers(0, 1 << 62))),
+                        order_id=order_id, status=status, created_at=created)
+    return [orders, items, history]
+
+
+GENERATORS = {
+    'users': generate_users,
+    'products': generate_products,
+    'variants': generate_variants,
+    'reviews': generate_reviews,
+    'wishlists': generate_wishlists,
+    'carts': generate_carts,
+    'orders': generate_orders,
+}
+
+# Tables in each phase only reference tables from earlier phases
+PHASES = (('users', 'products'), ('variants', 'reviews', 'wishlists', 'carts', 'orders'))
+
+_plan = None
+
+
+def _run_chunk(task):
+    table, chunk, start, stop = task
+    rng = chunk_rng(_plan.seed, table, chunk)
+    loaders = GENERATORS[table](_plan, rng, start, stop, _plan.now)
+    using = connections['default']
+    with transaction.atomic():
+        rows = sum(loader.load(using) for loader in loaders)
+    return table, rows
+
+
+def _tasks(plan, table, chunk_size):
+    volumes = plan.volumes
+    total = {
+        'users': volumes.users,
+        'products': volumes.products,
+        'variants': volumes.products,
+        'reviews': volumes.products,
+        'wishlists': volumes.users,
+        'carts': len(plan.cart_users),
+        'orders': volumes.orders,
+    }[table]
+    return [
+        (table, chunk, start, min(start + chunk_size, total))
+        for chunk, start in enumerate(range(0, total, chunk_size))
+    ]
+
+
+def _ensure_order_partitions(plan):
+    from apps.orders.partitions import create_partition, is_partitioned, add_months, month_start
+
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        for table in ('orders', 'order_items', 'order_status_history'):
+            if not is_partitioned(cursor, table):
+                continue
+            month = month_start(plan.now - timedelta(days=plan.volumes.days))
+            while month <= month_start(plan.now):
+                create_partition(cursor, table, month)
+                month = add_months(month, 1)
+
+
+def update_purchase_counts(plan):
+    from apps.orders.models import OrderItem
+    from .models import Product
+
+    totals = (
+        OrderItem.objects.filter(product=models.OuterRef('pk'))
+        .values('product').annotate(total=models.Sum('quantity')).values('total')
+    )
+    Product.objects.filter(sku__startswith=f'SYN-{plan.tag}-').update(purchase_count=models.functions.Coalesce(models.Subquery(totals), 0))
+
+
+def generate(seed, volumes, end_date=None, workers=4, chunk_size=5000, progress=None):
+    """Generate the whole dataset; returns ``{table: rows}``."""
+    global _plan
+
+    _plan = Plan(seed, volumes, end_date or date.today())
+    counts = {'reference': generate_reference(_plan, connection)}
+    _ensure_order_partitions(_plan)
+
+    use_pool = workers > 1 and 'fork' in multiprocessing.get_all_start_methods()
+    for phase in PHASES:
+        tasks = [task for table in phase for task in _tasks(_plan, table, chunk_size)]
+        if use_pool:
+            connections.close_all()
+            with multiprocessing.get_context('fork').Pool(workers) as pool:
+                results = pool.imap_unordered(_run_chunk, tasks)
+                for table, rows in results:
+                    counts[table] = counts.get(table, 0) + rows
+                    if progress:
+                        progress(table, counts[table])
+        else:
+            for task in tasks:
+                table, rows = _run_chunk(task)
+                counts[table] = counts.get(table, 0) + rows
+                if progress:
+                    progress(table, counts[table])
+
+    update_purchase_counts(_plan)
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+    return counts
@@ -0,0 +1,31 @@
+"""
+Celery tasks for the product catalog.
+"""
+from celery import shared_task
+from django.apps import apps
+from django.core.cache import cache
+
+from .pricing import run_due_rules
+from .renditions import generate
+
+PRICE_RULES_LOCK = 'price-rules:lock'
+PRICE_RULES_LOCK_TIMEOUT = 60 * 30
+
+
+@shared_task(ignore_result=True)
+def apply_price_rules():
+    """Apply and roll back price rules whose window opened or closed."""
+    # A large rule can outlast the beat interval; let only one run at a time
+    if not cache.add(PRICE_RULES_LOCK, 1, PRICE_RULES_LOCK_TIMEOUT):
+        return
+    try:
+        run_due_rules()
+    finally:
+        cache.delete(PRICE_RULES_LOCK)
+
+
+@shared_task(ignore_result=True)
+def generate_renditions(model_label, pks):
+    """Render responsive image renditions for rows of ``model_label``."""
+    # The prefork pool already spreads tasks over processes
+    generate(apps.get_model(model_label), pks)
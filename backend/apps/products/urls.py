@@ -14,7 +14,19 @@ urlpatterns = [
     path('brands/', views.BrandListView.as_view(), name='brand-list'),
     path('brands/<slug:slug>/', views.BrandDetailView.as_view(), name='brand-detail'),
     
+    # Search and filters (before the product slug routes, which would shadow them)
+    path('search/suggestions/', views.product_search_suggestions, name='search-suggestions'),
+    path('filters/', views.product_filters, name='product-filters'),
+    path('attributes/', views.ProductAttributeListView.as_view(), name='product-attributes'),
+    
+    # Wishlist
+    path('wishlist/', views.WishlistListCreateView.as_view(), name='wishlist'),
+    path('wishlist/<uuid:pk>/', views.WishlistDetailView.as_view(), name='wishlist-detail'),
+    path('<slug:product_slug>/wishlist/toggle/', views.toggle_wishlist, name='toggle-wishlist'),
+    
     # Products
+    # Under '-/', which slugify never produces, so no product slug can shadow it
+    path('-/export/', views.ProductExportView.as_view(), name='product-export'),
     path('', views.ProductListView.as_view(), name='product-list'),
     path('<slug:slug>/', views.ProductDetailView.as_view(), name='product-detail'),
     path('<slug:product_slug>/variants/', views.ProductVariantListView.as_view(), name='product-variants'),
@@ -27,14 +39,4 @@ urlpatterns = [
     # Reviews
     path('<slug:product_slug>/reviews/', views.ProductReviewListCreateView.as_view(), name='product-reviews'),
     path('reviews/<uuid:review_id>/helpful/', views.mark_review_helpful, name='mark-review-helpful'),
-    
-    # Wishlist
-    path('wishlist/', views.WishlistListCreateView.as_view(), name='wishlist'),
-    path('wishlist/<uuid:pk>/', views.WishlistDetailView.as_view(), name='wishlist-detail'),
-    path('<slug:product_slug>/wishlist/toggle/', views.toggle_wishlist, name='toggle-wishlist'),
-    
-    # Search and filters
-    path('search/suggestions/', views.product_search_suggestions, name='search-suggestions'),
-    path('filters/', views.product_filters, name='product-filters'),
-    path('attributes/', views.ProductAttributeListView.as_view(), name='product-attributes'),
 ]
@@ -4,8 +4,9 @@ Views for product management and catalog.
 from rest_framework import generics, status, permissions, filters, serializers
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from django.db import models
-from django.db.models import Q, Avg, Count, F
+from django.db.models import Q, Avg, Count, F, Prefetch
 from django_filters.rest_framework import DjangoFilterBackend
 from django.shortcuts import get_object_or_404
 
@@ -17,9 +18,15 @@ from .serializers import (
     CategorySerializer, BrandSerializer, ProductListSerializer,
     ProductDetailSerializer, ProductReviewSerializer, 
     ProductAttributeSerializer, WishlistSerializer,
-    ProductSearchSerializer, ProductVariantSerializer
+    ProductSearchSerializer, ProductVariantSerializer,
+    active_category_tree, with_list_stats
 )
+from .cents import with_final_cents, with_price_cents
 from .filters import ProductFilter
+from apps.recommendations import personalization
+from . import exports
+from eshotry.exports import ITERATOR_CHUNK_SIZE, ExportError, export_response
+from eshotry.query_budget import query_budget
 
 
 class CategoryListView(generics.ListAPIView):
@@ -27,12 +34,17 @@ class CategoryListView(generics.ListAPIView):
     
     serializer_class = CategorySerializer
     permission_classes = [permissions.AllowAny]
+    query_budget = 4
     
     def get_queryset(self):
         return Category.objects.filter(
             is_active=True, 
             parent=None
-        ).prefetch_related('children')
+        )
+    
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        return active_category_tree(page) if page is not None else page
 
 
 class CategoryDetailView(generics.RetrieveAPIView):
@@ -40,10 +52,14 @@ class CategoryDetailView(generics.RetrieveAPIView):
     
     serializer_class = CategorySerializer
     permission_classes = [permissions.AllowAny]
+    query_budget = 3
     lookup_field = 'slug'
     
     def get_queryset(self):
-        return Category.objects.filter(is_active=True)
+        return Category.objects.filter(is_active=True).select_related('parent')
+    
+    def get_object(self):
+        return active_category_tree([super().get_object()])[0]
 
 
 class BrandListView(generics.ListAPIView):
@@ -51,13 +67,16 @@ class BrandListView(generics.ListAPIView):
     
     serializer_class = BrandSerializer
     permission_classes = [permissions.AllowAny]
+    query_budget = 3
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['name', 'description']
     ordering_fields = ['name', 'created_at']
     ordering = ['name']
     
     def get_queryset(self):
-        return Brand.objects.filter(is_active=True)
+        return Brand.objects.filter(is_active=True).annotate(
+            active_product_count=Count('products', filter=Q(products__status='active'))
+        )
 
 
 class BrandDetailView(generics.RetrieveAPIView):
@@ -65,10 +84,13 @@ class BrandDetailView(generics.RetrieveAPIView):
     
     serializer_class = BrandSerializer
     permission_classes = [permissions.AllowAny]
+    query_budget = 3
     lookup_field = 'slug'
     
     def get_queryset(self):
-        return Brand.objects.filter(is_active=True)
+        return Brand.objects.filter(is_active=True).annotate(
+            active_product_count=Count('products', filter=Q(products__status='active'))
+        )
 
 
 class ProductListView(generics.ListAPIView):
@@ -76,6 +98,7 @@ class ProductListView(generics.ListAPIView):
     
     serializer_class = ProductListSerializer
     permission_classes = [permissions.AllowAny]
+    query_budget = 8
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_class = ProductFilter
     search_fields = ['name', 'description', 'short_description', 'brand__name']
@@ -83,9 +106,9 @@ class ProductListView(generics.ListAPIView):
     ordering = ['-created_at']
     
     def get_queryset(self):
-        queryset = Product.objects.filter(status='active').select_related(
+        queryset = with_list_stats(Product.objects.filter(status='active').select_related(
             'category', 'brand'
-        ).prefetch_related('images', 'reviews')
+        ).prefetch_related('images'), self.request)
         
         # Handle special sorting options
         sort_by = self.request.query_params.get('sort_by', '-created_at')
@@ -110,6 +133,14 @@ class ProductListView(generics.ListAPIView):
             queryset = queryset.order_by(sort_by)
         
         return queryset
+    
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        # Personalize the default order only, never an order the shopper asked for
+        params = self.request.query_params
+        if page is not None and not ({'sort_by', 'ordering'} & params.keys()):
+            page = personalization.rerank(self.request, page)
+        return page
 
 
 class ProductDetailView(generics.RetrieveAPIView):
@@ -117,13 +148,15 @@ class ProductDetailView(generics.RetrieveAPIView):
     
     serializer_class = ProductDetailSerializer
     permission_classes = [permissions.AllowAny]
+    query_budget = 14
     lookup_field = 'slug'
     
     def get_queryset(self):
-        return Product.objects.filter(status='active').select_related(
+        return with_price_cents(Product.objects.filter(status='active')).select_related(
             'category', 'brand'
         ).prefetch_related(
-            'images', 'variants', 'attribute_values', 'reviews'
+            'images', Prefetch('variants', queryset=with_final_cents(ProductVariant.objects.all())),
+            'attribute_values__attribute'
         )
     
     def retrieve(self, request, *args, **kwargs):
@@ -136,10 +169,35 @@ class ProductDetailView(generics.RetrieveAPIView):
         return Response(serializer.data)
 
 
+class ProductExportView(APIView):
+    """Stream products and variants as CSV or JSON Lines for catalog extracts."""
+
+    permission_classes = [permissions.IsAdminUser]
+    query_budget = 2
+
+    def get(self, request):
+        params = request.query_params
+        try:
+            rows = exports.product_rows(
+                status=params.get('status'),
+                category=params.get('category'),
+                brand=params.get('brand'),
+                updated_after=params.get('updated_after'),
+            )
+            return export_response(
+                'products', exports.HEADER, rows.iterator(chunk_size=ITERATOR_CHUNK_SIZE),
+                file_format=params.get('export_format', 'csv'),
+                compress=params.get('gzip') in ('1', 'true'),
+            )
+        except ExportError as e:
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
 class ProductReviewListCreateView(generics.ListCreateAPIView):
     """List and create product reviews."""
     
     serializer_class = ProductReviewSerializer
+    query_budget = 6
     
     def get_permissions(self):
         if self.request.method == 'POST':
@@ -149,7 +207,7 @@ class ProductReviewListCreateView(generics.ListCreateAPIView):
     def get_queryset(self):
         product_slug = self.kwargs['product_slug']
         product = get_object_or_404(Product, slug=product_slug, status='active')
-        return product.reviews.filter(is_approved=True).order_by('-created_at')
+        return product.reviews.filter(is_approved=True).select_related('user').order_by('-created_at')
     
     def perform_create(self, serializer):
         product_slug = self.kwargs['product_slug']
@@ -167,9 +225,16 @@ class WishlistListCreateView(generics.ListCreateAPIView):
     
     serializer_class = WishlistSerializer
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = 5
     
     def get_queryset(self):
-        return Wishlist.objects.filter(user=self.request.user).select_related('product')
+        products = with_list_stats(
+            Product.objects.select_related('category', 'brand').prefetch_related('images'),
+            self.request,
+        )
+        return Wishlist.objects.filter(user=self.request.user).prefetch_related(
+            Prefetch('product', queryset=products)
+        )
 
 
 class WishlistDetailView(generics.DestroyAPIView):
@@ -177,11 +242,13 @@ class WishlistDetailView(generics.DestroyAPIView):
     
     serializer_class = WishlistSerializer
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = 4
     
     def get_queryset(self):
         return Wishlist.objects.filter(user=self.request.user)
 
 
+@query_budget(5)
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
 def toggle_wishlist(request, product_slug):
@@ -200,6 +267,7 @@ def toggle_wishlist(request, product_slug):
     return Response({'wishlisted': True}, status=status.HTTP_201_CREATED)
 
 
+@query_budget(4)
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
 def mark_review_helpful(request, review_id):
@@ -220,12 +288,13 @@ class FeaturedProductsView(generics.ListAPIView):
     
     serializer_class = ProductListSerializer
     permission_classes = [permissions.AllowAny]
+    query_budget = 5
     
     def get_queryset(self):
-        return Product.objects.filter(
+        return with_list_stats(Product.objects.filter(
             status='active', 
             is_featured=True
-        ).select_related('category', 'brand').prefetch_related('images')[:12]
+        ).select_related('category', 'brand').prefetch_related('images'), self.request)[:12]
 
 
 class TrendingProductsView(generics.ListAPIView):
@@ -233,11 +302,12 @@ class TrendingProductsView(generics.ListAPIView):
     
     serializer_class = ProductListSerializer
     permission_classes = [permissions.AllowAny]
+    query_budget = 5
     
     def get_queryset(self):
-        return Product.objects.filter(
+        return with_list_stats(Product.objects.filter(
             status='active'
-        ).select_related('category', 'brand').prefetch_related('images').annotate(
+        ).select_related('category', 'brand').prefetch_related('images'), self.request).annotate(
             popularity_score=F('view_count') + (F('purchase_count') * 5)
         ).order_by('-popularity_score')[:12]
 
@@ -247,11 +317,12 @@ class NewArrivalsView(generics.ListAPIView):
     
     serializer_class = ProductListSerializer
     permission_classes = [permissions.AllowAny]
+    query_budget = 5
     
     def get_queryset(self):
-        return Product.objects.filter(
+        return with_list_stats(Product.objects.filter(
             status='active'
-        ).select_related('category', 'brand').prefetch_related('images').order_by('-created_at')[:12]
+        ).select_related('category', 'brand').prefetch_related('images'), self.request).order_by('-created_at')[:12]
 
 
 class ProductAttributeListView(generics.ListAPIView):
@@ -259,6 +330,7 @@ class ProductAttributeListView(generics.ListAPIView):
     
     serializer_class = ProductAttributeSerializer
     permission_classes = [permissions.AllowAny]
+    query_budget = 3
     
     def get_queryset(self):
         return ProductAttribute.objects.filter(is_filterable=True)
@@ -269,13 +341,15 @@ class ProductVariantListView(generics.ListAPIView):
     
     serializer_class = ProductVariantSerializer
     permission_classes = [permissions.AllowAny]
+    query_budget = 4
     
     def get_queryset(self):
         product_slug = self.kwargs['product_slug']
         product = get_object_or_404(Product, slug=product_slug, status='active')
-        return product.variants.filter(is_active=True)
+        return with_final_cents(product.variants.filter(is_active=True))
 
 
+@query_budget(4)
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
 def product_search_suggestions(request):
@@ -312,6 +386,7 @@ def product_search_suggestions(request):
     return Response({'suggestions': suggestions})
 
 
+@query_budget(8)
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
 def product_filters(request):
@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class RecommendationsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.recommendations'
+    verbose_name = 'Recommendations'
+
+    def ready(self):
+        # Register content index, personalization and fit statistics signals
+        from . import content, personalization, sizing  # noqa: F401
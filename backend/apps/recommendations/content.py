@@ -0,0 +1,503 @@
+"""
+Content-based "similar items" for EshoTry platform.
+
+Every active product becomes one L2-normalized float32 vector of
+``TEXT_DIMENSIONS + FACET_DIMENSIONS`` values:
+
+* a TF-IDF block over the words of its name (counted twice), description,
+  material, style, fit type, brand, category and attribute values;
+* a one-hot block over its brand, category, gender, style, fit type,
+  material and ``attribute=value`` pairs, weighted by ``FACET_WEIGHT``.
+
+Both blocks are feature-hashed into their dimensions: each token lands on a
+few signed columns derived from its BLAKE2 digest, so vectors of products
+added later line up with the existing ones without a shared vocabulary.
+Only IDF needs the corpus; it is stored with the index (as sorted token
+digests) and unseen tokens get the IDF of a token in no document.
+
+Nearest-neighbour search is an inverted file: a spherical k-means over the
+vectors gives ``sqrt(n)`` clusters and the vectors are stored cluster by
+cluster, so a query scores the centroids, then scans only its ``NPROBE``
+closest clusters as contiguous slices of the mapped matrix. A batch of
+queries shares one matrix product.
+
+Products imported or created after the nightly build are vectorized with
+the stored IDF and published to a small ``content-delta`` artifact that
+queries scan in full and that supersedes the main index for its ids.
+Products that stopped being active are listed in the delta's ``removed``
+keys, which hide them from the main index. The next full build folds both
+in; so does an append that would grow the delta past ``DELTA_LIMIT``.
+
+Rewriting the delta costs time proportional to its size, so saves do not
+append directly: creating a product, or saving one with a changed status or
+indexed field, ``queue``-s it in ``PendingContentUpdate`` and a periodic task
+``flush``-es everything pending in one append.
+"""
+import hashlib
+import re
+import time
+import uuid
+from collections import Counter
+
+import numpy as np
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.utils import timezone
+from scipy import sparse
+
+from apps.products.models import Product, ProductAttribute, ProductAttributeValue
+from apps.products.signals import catalog_imported
+from .models import PendingContentUpdate
+from .store import Artifact, decode_id, encode_ids, get_setting, lookup, publish
+
+ARTIFACT = 'content'
+DELTA_ARTIFACT = 'content-delta'
+CHUNK_SIZE = 2000
+
+# Hashed columns per token
+TEXT_HASHES = 4
+FACET_HASHES = 2
+
+KMEANS_ITERATIONS = 10
+KMEANS_SAMPLE = 64  # training vectors per cluster
+
+WORD = re.compile(r'[^\W\d_]{2,}')
+STOP_WORDS = frozenset("""
+    a an and are as at be by for from has in is it its of on or our that the
+    this to was were will with you your
+""".split())
+
+PRODUCT_FIELDS = (
+    'pk', 'name', 'description', 'material', 'style', 'fit_type', 'gender',
+    'brand_id', 'brand__name', 'category_id', 'category__name',
+)
+# Product columns whose change calls for a new vector (or its removal)
+INDEXED_FIELDS = (
+    'status', 'name', 'description', 'material', 'style', 'fit_type', 'gender',
+    'brand_id', 'category_id',
+)
+
+
+def _documents(pks, chunk_size=CHUNK_SIZE):
+    """Yield ``(pks, [(words, facets)])`` for ``pks``, ``chunk_size`` products at a time."""
+    for start in range(0, len(pks), chunk_size):
+        chunk = pks[start:start + chunk_size]
+        attributes = {}
+        for pk, name, value in (
+            ProductAttributeValue.objects.filter(product_id__in=chunk)
+            .values_list('product_id', 'attribute__name', 'value')
+        ):
+            attributes.setdefault(pk, []).append((name, value))
+        rows = {
+            row[0]: row for row in Product.objects.filter(pk__in=chunk).values_list(*PRODUCT_FIELDS)
+        }
+        found = [pk for pk in chunk if pk in rows]
+        yield found, [_tokens(rows[pk], attributes.get(pk, ())) for pk in found]
+
+
+def _tokens(row, attributes):
+    """Weighted words and the set of facet tokens of one product row."""
+    _, name, description, material, style, fit_type, gender, brand_id, brand, category_id, category = row
+    fields = [(name, 2.0), (description, 1.0), (material, 1.0), (style, 1.0),
+              (fit_type, 1.0), (brand, 1.0), (category, 1.0)]
+    fields += [(value, 1.0) for _, value in attributes]
+    words = Counter()
+    for text, weight in fields:
+        for word in WORD.findall((text or '').lower()):
+            if word not in STOP_WORDS:
+                words[word] += weight
+
+    facets = {f'brand={brand_id}', f'category={category_id}', f'gender={gender}'}
+    facets.update(
+        f'{key}={value.strip().lower()}'
+        for key, value in (('style', style), ('fit', fit_type), ('material', material)) if value
+    )
+    facets.update(f'{key.lower()}={value.strip().lower()}' for key, value in attributes if value)
+    return words, facets
+
+
+def _digests(tokens):
+    """``(len(tokens), 2)`` uint64 BLAKE2 digests: column bits and sign bits."""
+    data = b''.join(hashlib.blake2b(token.encode(), digest_size=16).digest() for token in tokens)
+    return np.frombuffer(data, dtype=np.uint64).reshape(-1, 2)
+
+
+def _projection(digests, dimensions, hashes):
+    """Sparse ``(tokens, dimensions)`` matrix of each token's signed hashed columns."""
+    count = len(digests)
+    columns = np.stack([(digests[:, 0] >> np.uint64(16 * i)) & np.uint64(0xFFFF) for i in range(hashes)], 1)
+    signs = np.stack([(digests[:, 1] >> np.uint64(i)) & np.uint64(1) for i in range(hashes)], 1)
+    data = np.where(signs == 1, 1.0, -1.0).astype(np.float32) / np.sqrt(hashes)
+    return sparse.csr_matrix(
+        (data.ravel(), (np.repeat(np.arange(count), hashes), (columns % np.uint64(dimensions)).ravel())),
+        shape=(count, dimensions), dtype=np.float32,
+    )
+
+
+def _normalize(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+def hashed_block(documents, dimensions, hashes, weigh):
+    """Normalized dense hashed rows for token dicts ``documents``; ``weigh(digests, values)`` sets weights."""
+    tokens = {}
+    rows, columns, values = [], [], []
+    for row, document in enumerate(documents):
+        for token, value in document.items():
+            rows.append(row)
+            columns.append(tokens.setdefault(token, len(tokens)))
+            values.append(value)
+    if not tokens:
+        return np.zeros((len(documents), dimensions), dtype=np.float32)
+    digests = _digests(list(tokens))
+    values = weigh(digests[np.array(columns)], np.array(values, dtype=np.float32))
+    matrix = sparse.csr_matrix(
+        (values, (rows, columns)), shape=(len(documents), len(tokens)), dtype=np.float32
+    )
+    return _normalize((matrix @ _projection(digests, dimensions, hashes)).toarray())
+
+
+def vectorize(documents, idf):
+    """Product vectors for ``[(words, facets)]``; ``idf(digests)`` weights the words."""
+    facet_weight = get_setting('FACET_WEIGHT')
+    text = hashed_block(
+        [words for words, _ in documents], get_setting('TEXT_DIMENSIONS'), TEXT_HASHES,
+        lambda digests, counts: (1 + np.log(counts)) * idf(digests),
+    )
+    facets = hashed_block(
+        [dict.fromkeys(facets, 1.0) for _, facets in documents], get_setting('FACET_DIMENSIONS'),
+        FACET_HASHES, lambda digests, ones: ones,
+    )
+    vectors = np.hstack([np.sqrt(1 - facet_weight) * text, np.sqrt(facet_weight) * facets])
+    return _normalize(vectors).astype(np.float32)
+
+
+def idf_lookup(vocabulary, idf, default):
+    """``idf(digests)`` over a sorted digest vocabulary; unseen tokens get ``default``."""
+    def weigh(digests):
+        keys = digests[:, 0]
+        if not len(vocabulary):
+            return np.full(len(keys), default, dtype=np.float32)
+        rows = np.minimum(np.searchsorted(vocabulary, keys), len(vocabulary) - 1)
+        return np.where(vocabulary[rows] == keys, idf[rows], default).astype(np.float32)
+    return weigh
+
+
+def _kmeans(vectors, clusters, rng):
+    """Spherical k-means centroids trained on a sample of ``vectors``."""
+    sample = vectors[np.sort(rng.choice(len(vectors), min(len(vectors), clusters * KMEANS_SAMPLE), replace=False))]
+    centroids = sample[rng.choice(len(sample), clusters, replace=False)]
+    for _ in range(KMEANS_ITERATIONS):
+        labels = np.argmax(sample @ centroids.T, axis=1)
+        members = sparse.csr_matrix(
+            (np.ones(len(sample), dtype=np.float32), (labels, np.arange(len(sample)))),
+            shape=(clusters, len(sample)),
+        )
+        sums = members @ sample
+        empty = np.asarray(members.sum(axis=1)).ravel() == 0
+        # Reseed clusters that lost all their members
+        sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+        centroids = _normalize(sums).astype(np.float32)
+    return centroids
+
+
+def _assign(vectors, centroids, chunk_size=65536):
+    return np.concatenate([
+        np.argmax(vectors[start:start + chunk_size] @ centroids.T, axis=1)
+        for start in range(0, len(vectors), chunk_size)
+    ]) if len(vectors) else np.empty(0, dtype=np.int64)
+
+
+def build(chunk_size=CHUNK_SIZE):
+    """Build and publish the content index of all active products; returns its metadata."""
+    started = time.perf_counter()
+    # Products queued before the build starts are read by it
+    covered = timezone.now()
+    pks = list(Product.objects.filter(status='active').order_by('pk').values_list('pk', flat=True))
+
+    # First pass: document frequencies
+    frequencies = Counter()
+    for _, documents in _documents(pks, chunk_size):
+        for words, _ in documents:
+            frequencies.update(words.keys())
+    tokens = list(frequencies)
+    digests = _digests(tokens)[:, 0] if tokens else np.empty(0, dtype=np.uint64)
+    order = np.argsort(digests)
+    vocabulary = digests[order]
+    counts = np.array([frequencies[token] for token in tokens], dtype=np.float64)[order]
+    idf = (np.log((1 + len(pks)) / (1 + counts)) + 1).astype(np.float32)
+    default_idf = float(np.log(1 + len(pks)) + 1)
+
+    # Second pass: vectors, in the order of ``keys``
+    weigh = idf_lookup(vocabulary, idf, default_idf)
+    keys, parts = [], []
+    for found, documents in _documents(pks, chunk_size):
+        keys.extend(found)
+        parts.append(vectorize(documents, weigh))
+    dimensions = get_setting('TEXT_DIMENSIONS') + get_setting('FACET_DIMENSIONS')
+    vectors = np.vstack(parts) if parts else np.empty((0, dimensions), dtype=np.float32)
+    keys = encode_ids(keys)
+
+    clusters = max(min(get_setting('CLUSTERS') or int(np.sqrt(len(keys))), len(keys)), 1)
+    if len(keys):
+        centroids = _kmeans(vectors, clusters, np.random.default_rng(0))
+    else:
+        centroids = np.zeros((1, dimensions), dtype=np.float32)
+    labels = _assign(vectors, centroids)
+    order = np.argsort(labels, kind='stable')
+    offsets = np.searchsorted(labels[order], np.arange(len(centroids) + 1)).astype(np.int64)
+
+    # Row of each product in the cluster-ordered matrix, by sorted product id
+    position = np.empty(len(keys), dtype=np.int32)
+    position[order] = np.arange(len(keys), dtype=np.int32)
+    by_id = np.argsort(keys)
+
+    meta = {
+        'built_at': timezone.now().isoformat(),
+        'products': len(keys),
+        'vocabulary': len(vocabulary),
+        'clusters': len(centroids),
+        'dimensions': dimensions,
+        'default_idf': default_idf,
+        'seconds': round(time.perf_counter() - started, 2),
+    }
+    meta['generation'] = publish(ARTIFACT, {
+        'vectors': vectors[order],
+        'row_ids': keys[order],
+        'product_ids': keys[by_id],
+        'product_rows': position[by_id],
+        'centroids': centroids,
+        'offsets': offsets,
+        'vocabulary': vocabulary,
+        'idf': idf,
+    }, meta)
+    # Products the old delta carried are part of the new build
+    publish(DELTA_ARTIFACT, _empty_delta(dimensions), {'base': meta['generation'], 'products': 0})
+    PendingContentUpdate.objects.filter(queued_at__lte=covered).delete()
+    return meta
+
+
+def _empty_delta(dimensions):
+    return {
+        'product_ids': np.empty(0, dtype='S16'),
+        'vectors': np.empty((0, dimensions), dtype=np.float32),
+        'removed': np.empty(0, dtype='S16'),
+    }
+
+
+index = Artifact(ARTIFACT)
+delta_index = Artifact(DELTA_ARTIFACT)
+
+
+def _delta(main, source=None):
+    """Delta arrays built against ``main``, or ``None``."""
+    delta = (source or delta_index).get()
+    if delta is None or delta.meta.get('base') != main.meta['generation']:
+        return None
+    return delta.arrays
+
+
+def _idf(main):
+    return idf_lookup(main.arrays['vocabulary'], main.arrays['idf'], main.meta['default_idf'])
+
+
+def append(product_ids):
+    """
+    Add or refresh ``product_ids`` without a full rebuild; inactive ones are removed.
+
+    Returns the number of products in the delta, or ``None`` if a full build
+    ran instead.
+    """
+    main = Artifact(ARTIFACT, check_interval=0).get()
+    if main is None:
+        build()
+        return None
+    delta = _delta(main, Artifact(DELTA_ARTIFACT, check_interval=0))
+    if delta is None:
+        delta = _empty_delta(main.meta['dimensions'])
+
+    requested = {uuid.UUID(str(pk)) for pk in product_ids}
+    pks = list(
+        Product.objects.filter(pk__in=requested, status='active').order_by('pk')
+        .values_list('pk', flat=True)
+    )
+    keys, parts = [], []
+    for found, documents in _documents(pks):
+        keys.extend(found)
+        parts.append(vectorize(documents, _idf(main)))
+    keys = encode_ids(keys)
+    # Drafts, archived and deleted products
+    removed = encode_ids(requested - set(pks))
+    if not len(keys) and not len(removed):
+        return len(delta['product_ids'])
+
+    kept = ~np.isin(delta['product_ids'], np.concatenate([keys, removed]))
+    merged_keys = np.concatenate([delta['product_ids'][kept], keys])
+    previously_removed = delta.get('removed', np.empty(0, dtype='S16'))
+    merged_removed = np.union1d(previously_removed[~np.isin(previously_removed, keys)], removed)
+    if len(merged_keys) + len(merged_removed) > get_setting('DELTA_LIMIT'):
+        build()
+        return None
+    merged = np.vstack([delta['vectors'][kept]] + parts)
+    order = np.argsort(merged_keys)
+    publish(DELTA_ARTIFACT, {
+        'product_ids': merged_keys[order], 'vectors': merged[order], 'removed': merged_removed,
+    }, {'base': main.meta['generation'], 'products': len(merged_keys), 'removed': len(merged_removed)})
+    return len(merged_keys)
+
+
+def _query_vectors(main, delta, product_ids):
+    """Vectors of ``product_ids``, vectorizing products missing from both artifacts."""
+    vectors, missing = {}, []
+    for pk in product_ids:
+        if delta is not None and (row := lookup(delta['product_ids'], pk)) is not None:
+            vectors[pk] = delta['vectors'][row]
+        elif (row := lookup(main.arrays['product_ids'], pk)) is not None:
+            vectors[pk] = main.arrays['vectors'][main.arrays['product_rows'][row]]
+        else:
+            missing.append(pk)
+    for found, documents in _documents(missing):
+        for pk, vector in zip(found, vectorize(documents, _idf(main))):
+            vectors[pk] = vector
+    return vectors
+
+
+class _Best:
+    """Running top ``limit`` (score, key) per query."""
+
+    def __init__(self, queries, limit):
+        self.scores = np.full((queries, limit), -np.inf, dtype=np.float32)
+        self.keys = np.zeros((queries, limit), dtype='S16')
+
+    def merge(self, members, scores, keys, exclude):
+        scores[keys[None, :] == exclude[members][:, None]] = -np.inf
+        scores = np.hstack([self.scores[members], scores])
+        keys = np.hstack([self.keys[members], np.broadcast_to(keys, (len(members), len(keys)))])
+        limit = self.scores.shape[1]
+        top = np.argpartition(-scores, limit - 1, axis=1)[:, :limit]
+        self.scores[members] = np.take_along_axis(scores, top, axis=1)
+        self.keys[members] = np.take_along_axis(keys, top, axis=1)
+
+
+def similar_products(product_ids, limit=10):
+    """``{product_id: [(product_id, score)]}`` of the most similar products, as one batch."""
+    main = index.get()
+    if main is None or not product_ids:
+        return {}
+    delta = _delta(main)
+    found = _query_vectors(main, delta, product_ids)
+    if not found:
+        return {}
+    queries = np.array(list(found.values()), dtype=np.float32)
+    exclude = encode_ids(found)
+
+    # Probe the closest clusters of every query
+    centroids, offsets = main.arrays['centroids'], main.arrays['offsets']
+    probes_per_query = min(get_setting('NPROBE'), len(centroids))
+    probes = np.argpartition(-(queries @ centroids.T), probes_per_query - 1, axis=1)[:, :probes_per_query]
+    probed = np.zeros((len(queries), len(centroids)), dtype=bool)
+    probed[np.arange(len(queries))[:, None], probes] = True
+    updated = delta['product_ids'] if delta is not None else np.empty(0, dtype='S16')
+    # Main index rows replaced by a delta vector or no longer active
+    superseded = updated
+    if delta is not None and len(delta.get('removed', ())):
+        superseded = np.concatenate([updated, delta['removed']])
+
+    best = _Best(len(queries), limit)
+    vectors, row_ids = main.arrays['vectors'], main.arrays['row_ids']
+    # One matrix product per probed cluster, for just the queries probing it
+    for cluster in np.unique(probes):
+        start, end = offsets[cluster], offsets[cluster + 1]
+        if start == end:
+            continue
+        members = np.flatnonzero(probed[:, cluster])
+        keys = row_ids[start:end]
+        scores = queries[members] @ vectors[start:end].T
+        if len(superseded):
+            scores[:, np.isin(keys, superseded)] = -np.inf
+        best.merge(members, scores, keys, exclude)
+    if len(updated):
+        best.merge(np.arange(len(queries)), queries @ np.asarray(delta['vectors']).T, updated, exclude)
+
+    order = np.argsort(-best.scores, axis=1)
+    return {
+        pk: [
+            (decode_id(best.keys[row, column]), float(best.scores[row, column]))
+            for column in order[row] if np.isfinite(best.scores[row, column])
+        ]
+        for row, pk in enumerate(found)
+    }
+
+
+def queue(product_ids):
+    """Mark ``product_ids`` for the next ``flush``; one upsert, whatever the delta holds."""
+    now = timezone.now()
+    PendingContentUpdate.objects.bulk_create(
+        [PendingContentUpdate(product_id=pk, queued_at=now) for pk in product_ids],
+        update_conflicts=True, unique_fields=['product'], update_fields=['queued_at'],
+    )
+
+
+def flush():
+    """Append every pending product in one pass; returns how many there were."""
+    started = timezone.now()
+    product_ids = list(
+        PendingContentUpdate.objects.filter(queued_at__lte=started).values_list('product_id', flat=True)
+    )
+    if not product_ids:
+        return 0
+    if append(product_ids) is not None:
+        # Products queued again since ``started`` stay for the next flush
+        PendingContentUpdate.objects.filter(product_id__in=product_ids, queued_at__lte=started).delete()
+    return len(product_ids)
+
+
+def _catalog_imported(sender, skus, **kwargs):
+    if len(skus) > get_setting('DELTA_LIMIT'):
+        from .tasks import build_content_index
+        build_content_index.delay()
+        return
+    queue(Product.objects.filter(sku__in=skus).values_list('pk', flat=True))
+
+
+def _product_saving(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or instance._state.adding:
+        return
+    if update_fields is not None and not {name.removesuffix('_id') for name in update_fields} & {
+        name.removesuffix('_id') for name in INDEXED_FIELDS
+    }:
+        return
+    stored = Product.objects.filter(pk=instance.pk).values_list(*INDEXED_FIELDS).first()
+    # Deferred fields are not written and keep their stored value
+    instance._content_changed = stored is None or any(
+        instance.__dict__.get(name, value) != value for name, value in zip(INDEXED_FIELDS, stored)
+    )
+
+
+def _product_saved(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    if created or instance.__dict__.pop('_content_changed', False):
+        queue([instance.pk])
+
+
+def _attributes_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        queue([instance.product_id])
+
+
+def _attributes_deleted(sender, instance, origin=None, **kwargs):
+    # Values cascading from a deleted product have nothing left to refresh
+    if getattr(origin, 'model', type(origin)) in (ProductAttribute, ProductAttributeValue):
+        queue([instance.product_id])
+
+
+catalog_imported.connect(_catalog_imported, dispatch_uid='recommendations.content.imported')
+pre_save.connect(_product_saving, sender=Product, dispatch_uid='recommendations.content.saving')
+post_save.connect(_product_saved, sender=Product, dispatch_uid='recommendations.content.created')
+post_save.connect(
+    _attributes_changed, sender=ProductAttributeValue, dispatch_uid='recommendations.content.attributes'
+)
+post_delete.connect(
+    _attributes_deleted, sender=ProductAttributeValue, dispatch_uid='recommendations.content.attributes_deleted'
+)
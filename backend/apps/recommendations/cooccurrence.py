@@ -0,0 +1,149 @@
+"""
+Item-to-item "customers also bought" recommendations for EshoTry platform.
+
+The offline build collects (user, product, weight) interactions from order
+items, wishlists, cart items and positive reviews into a sparse user x
+product matrix (repeat interactions are summed, then log-dampened). Product
+similarity is the cosine of the product columns, or the Jaccard index of
+the users who touched both; it is computed ``BLOCK_SIZE`` products at a time
+as one sparse matrix product per block, and the top ``TOP_K`` neighbours of
+every product in the block are picked with a single ``lexsort``.
+
+The published artifact holds the sorted product ids and two fixed-width
+``(products, TOP_K)`` arrays of neighbour rows and scores, so a lookup is a
+binary search over the mapped ids plus one row slice.
+"""
+import time
+
+import numpy as np
+from django.utils import timezone
+from scipy import sparse
+
+from apps.orders.models import CartItem, OrderItem
+from apps.products.models import ProductReview, Wishlist
+from .store import Artifact, decode_id, get_setting, lookup, publish
+
+ARTIFACT = 'cooccurrence'
+CHUNK_SIZE = 20000
+
+
+def interaction_sources():
+    """``(name, queryset of (user_id, product_id))`` per interaction type."""
+    return [
+        ('order', OrderItem.objects.values_list('order__user_id', 'product_id')),
+        ('wishlist', Wishlist.objects.values_list('user_id', 'product_id')),
+        ('cart', CartItem.objects.values_list('cart__user_id', 'product_id')),
+        ('review', ProductReview.objects.filter(rating__gte=4).values_list('user_id', 'product_id')),
+    ]
+
+
+def load_interactions():
+    """Parallel arrays of user keys, product keys and weights."""
+    weights = get_setting('WEIGHTS')
+    users, products, values = [], [], []
+    for name, queryset in interaction_sources():
+        pairs = [(user.bytes, product.bytes) for user, product in queryset.iterator(chunk_size=CHUNK_SIZE)]
+        if not pairs:
+            continue
+        user_keys, product_keys = zip(*pairs)
+        users.append(np.array(user_keys, dtype='S16'))
+        products.append(np.array(product_keys, dtype='S16'))
+        values.append(np.full(len(pairs), weights[name], dtype=np.float32))
+    if not users:
+        return (np.empty(0, dtype='S16'),) * 2 + (np.empty(0, dtype=np.float32),)
+    return np.concatenate(users), np.concatenate(products), np.concatenate(values)
+
+
+def interaction_matrix(users, products, values):
+    """CSR user x product matrix and the sorted product keys of its columns."""
+    user_keys, user_rows = np.unique(users, return_inverse=True)
+    product_keys, product_cols = np.unique(products, return_inverse=True)
+    matrix = sparse.csr_matrix(
+        (values, (user_rows, product_cols)), shape=(len(user_keys), len(product_keys)),
+        dtype=np.float32,
+    )
+    matrix.sum_duplicates()
+    matrix.data = np.log1p(matrix.data)
+    return matrix, product_keys
+
+
+def _similarity_blocks(matrix, method, block_size):
+    """Yield ``(start, block)`` with ``block`` the similarity rows of products ``start:``."""
+    if method == 'jaccard':
+        binary = matrix.copy()
+        binary.data[:] = 1
+        degree = np.asarray(binary.sum(axis=0)).ravel()
+        transposed = binary.T.tocsr()
+        for start in range(0, matrix.shape[1], block_size):
+            block = (transposed[start:start + block_size] @ binary).tocoo()
+            union = degree[start + block.row] + degree[block.col] - block.data
+            block.data = (block.data / union).astype(np.float32)
+            yield start, block
+    else:
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=0)).ravel())
+        normalized = (matrix @ sparse.diags(1 / np.maximum(norms, 1e-12))).tocsr()
+        transposed = normalized.T.tocsr()
+        for start in range(0, matrix.shape[1], block_size):
+            yield start, (transposed[start:start + block_size] @ normalized).tocoo()
+
+
+def top_k(matrix, k, method='cosine', block_size=2048):
+    """``(neighbours, scores)`` arrays of the ``k`` most similar products per product."""
+    count = matrix.shape[1]
+    neighbours = np.full((count, k), -1, dtype=np.int32)
+    scores = np.zeros((count, k), dtype=np.float32)
+    for start, block in _similarity_blocks(matrix, method, block_size):
+        rows, cols, data = block.row, block.col, block.data
+        keep = cols != rows + start
+        rows, cols, data = rows[keep], cols[keep], data[keep]
+        order = np.lexsort((-data, rows))
+        rows, cols, data = rows[order], cols[order], data[order]
+        rank = np.arange(len(rows)) - np.searchsorted(rows, rows)
+        keep = rank < k
+        neighbours[start + rows[keep], rank[keep]] = cols[keep]
+        scores[start + rows[keep], rank[keep]] = data[keep]
+    return neighbours, scores
+
+
+def build(method=None, k=None):
+    """Build and publish the co-occurrence artifact; returns its metadata."""
+    method = method or get_setting('SIMILARITY')
+    k = k or get_setting('TOP_K')
+    started = time.perf_counter()
+    users, products, values = load_interactions()
+    matrix, product_keys = interaction_matrix(users, products, values)
+    neighbours, scores = top_k(matrix, k, method, get_setting('BLOCK_SIZE'))
+    meta = {
+        'built_at': timezone.now().isoformat(),
+        'similarity': method,
+        'top_k': k,
+        'users': matrix.shape[0],
+        'products': matrix.shape[1],
+        'interactions': int(len(values)),
+        'nonzero': int(matrix.nnz),
+        'seconds': round(time.perf_counter() - started, 2),
+    }
+    meta['generation'] = publish(ARTIFACT, {
+        'product_ids': product_keys, 'neighbours': neighbours, 'scores': scores,
+    }, meta)
+    return meta
+
+
+index = Artifact(ARTIFACT)
+
+
+def also_bought(product_id, limit=10):
+    """``[(product_id, score)]`` most often bought together with ``product_id``."""
+    artifact = index.get()
+    if artifact is None:
+        return []
+    keys = artifact.arrays['product_ids']
+    row = lookup(keys, product_id)
+    if row is None:
+        return []
+    neighbours = artifact.arrays['neighbours'][row, :limit]
+    scores = artifact.arrays['scores'][row, :limit]
+    return [
+        (decode_id(keys[neighbour]), float(score))
+        for neighbour, score in zip(neighbours, scores) if neighbour >= 0
+    ]
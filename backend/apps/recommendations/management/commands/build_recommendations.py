@@ -0,0 +1,46 @@
+"""
+Build the item-to-item recommendation artifacts.
+"""
+from django.core.management.base import BaseCommand
+
+from apps.recommendations import content, cooccurrence, personalization, sizing
+
+
+class Command(BaseCommand):
+    help = 'Build "customers also bought" neighbours, the similar-items index, preference vectors and the size model.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--index', choices=['cooccurrence', 'content', 'preferences', 'sizing'], action='append',
+            help='Artifact to build (repeatable; default: all)',
+        )
+        parser.add_argument('--similarity', choices=['cosine', 'jaccard'], help='Co-occurrence similarity measure')
+        parser.add_argument('--top-k', type=int, help='Co-occurrence neighbours kept per product')
+
+    def handle(self, *args, **options):
+        indexes = options['index'] or ['cooccurrence', 'content', 'preferences', 'sizing']
+        if 'cooccurrence' in indexes:
+            meta = cooccurrence.build(options['similarity'], options['top_k'])
+            self.stdout.write(self.style.SUCCESS(
+                f"Published cooccurrence {meta['generation']}: {meta['products']} products, "
+                f"{meta['users']} users, {meta['interactions']} interactions "
+                f"({meta['similarity']}, top {meta['top_k']}) in {meta['seconds']:.2f}s"
+            ))
+        if 'content' in indexes:
+            meta = content.build()
+            self.stdout.write(self.style.SUCCESS(
+                f"Published content {meta['generation']}: {meta['products']} products, "
+                f"{meta['vocabulary']} terms, {meta['clusters']} clusters in {meta['seconds']:.2f}s"
+            ))
+        if 'preferences' in indexes:
+            meta = personalization.build()
+            self.stdout.write(self.style.SUCCESS(
+                f"Published preferences {meta['generation']}: {meta['products']} products "
+                f"in {meta['seconds']:.2f}s"
+            ))
+        if 'sizing' in indexes:
+            meta = sizing.build()
+            self.stdout.write(self.style.SUCCESS(
+                f"Published sizing {meta['generation']}: fitted on {meta['reviews']} reviews "
+                f"(rmse {meta['rmse'] or 0:.2f} sizes) in {meta['seconds']:.2f}s"
+            ))
@@ -0,0 +1,17 @@
+"""
+Recount per product size fit feedback from reviews.
+"""
+from django.core.management.base import BaseCommand
+
+from apps.recommendations.sizing import rebuild_stats
+
+
+class Command(BaseCommand):
+    help = 'Recount runs small / true to size / runs large feedback for every product size.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per INSERT')
+
+    def handle(self, *args, **options):
+        count = rebuild_stats(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Recounted fit feedback for {count} product sizes'))
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.7 on 2026-10-19 02:45
+
+from django.db import migrations, models
+import django.db.models.deletion
+import eshotry.ids
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('products', '0007_image_placeholders'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SizeFitStats',
+            fields=[
+                ('id', models.UUIDField(default=eshotry.ids.primary_key, editable=False, primary_key=True, serialize=False)),
+                ('size', models.CharField(max_length=20)),
+                ('runs_small', models.PositiveIntegerField(default=0)),
+                ('true_to_size', models.PositiveIntegerField(default=0)),
+                ('runs_large', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='size_fit_stats', to='products.product')),
+            ],
+            options={
+                'verbose_name': 'Size Fit Stats',
+                'verbose_name_plural': 'Size Fit Stats',
+                'db_table': 'size_fit_stats',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='sizefitstats',
+            constraint=models.UniqueConstraint(fields=('product', 'size'), name='size_fit_stats_product_size'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.7 on 2026-10-19 03:08
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0007_image_placeholders'),
+        ('recommendations', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PendingContentUpdate',
+            fields=[
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='+', serialize=False, to='products.product')),
+                ('queued_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Pending Content Update',
+                'verbose_name_plural': 'Pending Content Updates',
+                'db_table': 'pending_content_updates',
+            },
+        ),
+    ]
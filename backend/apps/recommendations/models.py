@@ -0,0 +1,53 @@
+"""
+Recommendation models for EshoTry platform.
+"""
+from django.db import models
+
+from apps.products.models import Product
+from eshotry.ids import primary_key
+
+
+class SizeFitStats(models.Model):
+    """Fit feedback counts of one product size, kept current as reviews arrive."""
+
+    id = models.UUIDField(primary_key=True, default=primary_key, editable=False)
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='size_fit_stats')
+    size = models.CharField(max_length=20)
+
+    runs_small = models.PositiveIntegerField(default=0)
+    true_to_size = models.PositiveIntegerField(default=0)
+    runs_large = models.PositiveIntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'size_fit_stats'
+        verbose_name = 'Size Fit Stats'
+        verbose_name_plural = 'Size Fit Stats'
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'size'], name='size_fit_stats_product_size'),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} {self.size}: {self.runs_small}/{self.true_to_size}/{self.runs_large}"
+
+    @property
+    def reviews(self):
+        return self.runs_small + self.true_to_size + self.runs_large
+
+
+class PendingContentUpdate(models.Model):
+    """A product waiting for the next flush into the content index delta."""
+
+    product = models.OneToOneField(
+        Product, on_delete=models.CASCADE, primary_key=True, related_name='+'
+    )
+    queued_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'pending_content_updates'
+        verbose_name = 'Pending Content Update'
+        verbose_name_plural = 'Pending Content Updates'
+
+    def __str__(self):
+        return f"{self.product_id} ({self.queued_at:%Y-%m-%d %H:%M:%S})"
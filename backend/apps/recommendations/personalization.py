@@ -0,0 +1,217 @@
+"""
+Personalized listing order for EshoTry platform.
+
+Products and shoppers share one hashed feature space of preference tokens:
+``style=``, ``color=``, ``fit=``, ``brand=`` and ``price=`` (a band of
+``PRICE_BANDS``). The nightly build stores one normalized float32 row per
+active product in the ``preferences`` artifact, sorted by product id.
+
+A shopper's vector is encoded from their ``UserStyleQuiz`` and the
+preferences on ``User``, weighted by ``PREFERENCE_WEIGHTS``, and cached; the
+cache entry is dropped when the quiz or the preferred brands change and is
+keyed on ``User.updated_at`` for the other profile fields.
+
+``rerank`` reorders one page of listing results by the dot product of their
+rows with the shopper's vector. It gives up and keeps the default order
+when there is no index or profile, or when building the vector overran
+``PERSONALIZATION_BUDGET_MS``.
+"""
+import time
+
+import numpy as np
+from django.core.cache import cache
+from django.db.models import Q
+from django.db.models.functions import Lower
+from django.db.models.signals import m2m_changed, post_save
+from django.utils import timezone
+
+from apps.products.models import Brand, Product, ProductVariant
+from apps.products.signals import catalog_repriced
+from apps.users.models import User, UserStyleQuiz
+from eshotry.metrics import PERSONALIZATION_REQUESTS
+from .content import hashed_block
+from .store import Artifact, encode_ids, get_setting, publish
+
+ARTIFACT = 'preferences'
+CHUNK_SIZE = 5000
+HASHES = 2
+NO_PROFILE = b''
+
+
+def _band(price):
+    return int(np.searchsorted(get_setting('PRICE_BANDS'), float(price), side='right'))
+
+
+def _weighted(tokens):
+    weights = get_setting('PREFERENCE_WEIGHTS')
+    return {token: weights[token.split('=', 1)[0]] for token in tokens}
+
+
+def _encode(documents):
+    return hashed_block(
+        documents, get_setting('PREFERENCE_DIMENSIONS'), HASHES, lambda digests, values: values,
+    ).astype(np.float32)
+
+
+def product_tokens(style, fit_type, brand_id, price, colors):
+    tokens = {f'brand={brand_id}', f'price={_band(price)}'}
+    tokens.update(f'color={color.strip().lower()}' for color in colors if color)
+    if style:
+        tokens.add(f'style={style.strip().lower()}')
+    if fit_type:
+        tokens.add(f'fit={fit_type.strip().lower()}')
+    return tokens
+
+
+def build(chunk_size=CHUNK_SIZE):
+    """Build and publish the product preference vectors; returns their metadata."""
+    started = time.perf_counter()
+    pks = list(Product.objects.filter(status='active').order_by('pk').values_list('pk', flat=True))
+    keys, parts = [], []
+    for start in range(0, len(pks), chunk_size):
+        chunk = pks[start:start + chunk_size]
+        colors = {}
+        for pk, color in (
+            ProductVariant.objects.filter(product_id__in=chunk, is_active=True)
+            .values_list('product_id', 'color').distinct()
+        ):
+            colors.setdefault(pk, []).append(color)
+        rows = Product.objects.filter(pk__in=chunk).values_list(
+            'pk', 'style', 'fit_type', 'brand_id', 'base_price', 'sale_price',
+        )
+        documents = []
+        for pk, style, fit_type, brand_id, base_price, sale_price in rows:
+            keys.append(pk)
+            documents.append(_weighted(product_tokens(
+                style, fit_type, brand_id, sale_price or base_price, colors.get(pk, ()),
+            )))
+        if documents:
+            parts.append(_encode(documents))
+
+    keys = encode_ids(keys)
+    order = np.argsort(keys)
+    vectors = np.vstack(parts) if parts else np.empty((0, get_setting('PREFERENCE_DIMENSIONS')), np.float32)
+    meta = {
+        'built_at': timezone.now().isoformat(),
+        'products': len(keys),
+        'seconds': round(time.perf_counter() - started, 2),
+    }
+    meta['generation'] = publish(ARTIFACT, {'product_ids': keys[order], 'vectors': vectors[order]}, meta)
+    return meta
+
+
+def _cleaned(values):
+    return [value.strip().lower() for value in values if isinstance(value, str) and value.strip()]
+
+
+def user_tokens(user):
+    """Preference tokens of ``user`` from their style quiz and profile."""
+    quiz = UserStyleQuiz.objects.filter(user=user).first()
+    styles = list(user.preferred_styles or [])
+    colors = list(user.preferred_colors or [])
+    fits, brands, price_range = [], [], {}
+    if quiz is not None:
+        styles += quiz.preferred_styles or []
+        colors += quiz.color_preferences or []
+        fits += quiz.fit_preferences or []
+        brands += quiz.brand_preferences or []
+        price_range = quiz.price_range or {}
+
+    tokens = {f'style={value}' for value in _cleaned(styles)}
+    tokens.update(f'color={value}' for value in _cleaned(colors))
+    tokens.update(f'fit={value}' for value in _cleaned(fits))
+
+    # Quiz answers name brands; match them by name or slug
+    names = _cleaned(brands)
+    brand_ids = set(user.preferred_brands.values_list('pk', flat=True))
+    if names:
+        brand_ids.update(
+            Brand.objects.annotate(lower_name=Lower('name'))
+            .filter(Q(lower_name__in=names) | Q(slug__in=names)).values_list('pk', flat=True)
+        )
+    tokens.update(f'brand={pk}' for pk in brand_ids)
+
+    try:
+        low = float(price_range.get('min') or 0)
+        high = float(price_range.get('max') or low)
+    except (TypeError, ValueError, AttributeError):
+        low = high = 0
+    if high:
+        tokens.update(f'price={band}' for band in range(_band(low), _band(high) + 1))
+    return tokens
+
+
+def _cache_key(user):
+    return f'personalization:user:{user.pk}:{user.updated_at.timestamp() if user.updated_at else 0}'
+
+
+def user_vector(user):
+    """Cached preference vector of ``user``, or ``None`` without preferences."""
+    key = _cache_key(user)
+    cached = cache.get(key)
+    if cached is None:
+        tokens = user_tokens(user)
+        cached = _encode([_weighted(tokens)])[0].tobytes() if tokens else NO_PROFILE
+        cache.set(key, cached, get_setting('USER_VECTOR_TIMEOUT'))
+    if cached == NO_PROFILE:
+        return None
+    return np.frombuffer(cached, dtype=np.float32)
+
+
+index = Artifact(ARTIFACT)
+
+
+def rerank(request, products):
+    """``products`` (one page) reordered for ``request.user``, or unchanged."""
+    started = time.perf_counter()
+    user = getattr(request, 'user', None)
+    if not products or user is None or not user.is_authenticated:
+        return products
+    artifact = index.get()
+    if artifact is None:
+        PERSONALIZATION_REQUESTS.labels('no_index').inc()
+        return products
+    vector = user_vector(user)
+    if vector is None:
+        PERSONALIZATION_REQUESTS.labels('no_profile').inc()
+        return products
+    if (time.perf_counter() - started) * 1000 > get_setting('PERSONALIZATION_BUDGET_MS'):
+        # The vector is cached now; the next page will make it
+        PERSONALIZATION_REQUESTS.labels('over_budget').inc()
+        return products
+
+    ids = artifact.arrays['product_ids']
+    keys = encode_ids([product.pk for product in products])
+    rows = np.minimum(np.searchsorted(ids, keys), max(len(ids) - 1, 0))
+    found = ids[rows] == keys if len(ids) else np.zeros(len(keys), dtype=bool)
+    scores = np.zeros(len(products), dtype=np.float32)
+    scores[found] = artifact.arrays['vectors'][rows[found]] @ vector
+    # Stable: equally scored products (and products built after the index) keep the default order
+    PERSONALIZATION_REQUESTS.labels('reranked').inc()
+    return [products[i] for i in np.argsort(-scores, kind='stable')]
+
+
+def _quiz_saved(sender, instance, raw=False, **kwargs):
+    # Encode now so the next listing does not spend its budget on it
+    cache.delete(_cache_key(instance.user))
+    if not raw:
+        user_vector(instance.user)
+
+
+def _brands_changed(sender, instance, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear') and isinstance(instance, User):
+        cache.delete(_cache_key(instance))
+
+
+def _catalog_repriced(sender, **kwargs):
+    # Sale prices move products between price bands
+    from .tasks import build_preference_index
+    build_preference_index.delay()
+
+
+post_save.connect(_quiz_saved, sender=UserStyleQuiz, dispatch_uid='recommendations.personalization.quiz')
+m2m_changed.connect(
+    _brands_changed, sender=User.preferred_brands.through,
+    dispatch_uid='recommendations.personalization.brands',
+)
+catalog_repriced.connect(_catalog_repriced, dispatch_uid='recommendations.personalization.repriced')
@@ -0,0 +1,316 @@
+"""
+Size and fit advice for EshoTry platform.
+
+``SizeFitStats`` counts "runs small / true to size / runs large" feedback
+per product size. A new review increments its row; an edited or deleted
+review recounts the rows it touched; ``rebuild_stats`` recounts everything.
+
+A ridge regression, fitted nightly on review feedback, maps a shopper's
+height, weight, body type and default avatar measurements to a position on
+``SIZE_SCALE`` (XS=1, S=2, ...). A reviewer's own size is the size they
+bought, one up if it ran small and one down if it ran large.
+
+A product size fits like its scale position minus its runs-small/runs-large
+balance, shrunk towards zero by ``SIZE_PRIOR`` pseudo-reviews. The advice is
+the size closest to the shopper's position: every size of every product in
+a batch is scored in one vectorized pass, and the advice is cached per
+(shopper profile version, product).
+"""
+import time
+
+import numpy as np
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.utils import timezone
+
+from apps.products.models import ProductReview, ProductVariant
+from apps.users.models import UserAvatar
+from .models import SizeFitStats
+from .store import Artifact, get_setting, publish
+
+ARTIFACT = 'sizing'
+
+SIZE_SCALE = ['XXS', 'XS', 'S', 'M', 'L', 'XL', 'XXL', 'XXXL']
+SIZE_ALIASES = {'2XS': 'XXS', '2XL': 'XXL', '3XL': 'XXXL'}
+
+FIT_FIELDS = {'small': 'runs_small', 'true': 'true_to_size', 'large': 'runs_large'}
+FIT_SHIFT = {'small': 1, 'true': 0, 'large': -1}
+
+BODY_TYPES = ['slim', 'athletic', 'regular', 'plus']
+MEASUREMENTS = ['chest', 'waist', 'hips']
+FEATURES = ['height', 'weight'] + BODY_TYPES + MEASUREMENTS
+
+
+def size_position(size):
+    """Position of ``size`` on ``SIZE_SCALE``, or ``None`` for other size systems."""
+    size = (size or '').strip().upper()
+    size = SIZE_ALIASES.get(size, size)
+    return SIZE_SCALE.index(size) if size in SIZE_SCALE else None
+
+
+def _number(value):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return np.nan
+    return value if value > 0 else np.nan
+
+
+def features(height, weight, body_type, measurements):
+    """Feature row; missing values are NaN."""
+    measurements = measurements if isinstance(measurements, dict) else {}
+    return [_number(height), _number(weight)] + [
+        float(body_type == kind) if body_type else np.nan for kind in BODY_TYPES
+    ] + [_number(measurements.get(name)) for name in MEASUREMENTS]
+
+
+# Fit feedback counts
+
+def _counts(**filters):
+    return ProductReview.objects.filter(is_approved=True, **filters).aggregate(**{
+        field: Count('pk', filter=Q(fit_feedback=fit)) for fit, field in FIT_FIELDS.items()
+    })
+
+
+def recount(product_id, size):
+    """Recount the fit feedback of one product size."""
+    counts = _counts(product_id=product_id, size_purchased=size)
+    if any(counts.values()):
+        SizeFitStats.objects.update_or_create(product_id=product_id, size=size, defaults=counts)
+    else:
+        SizeFitStats.objects.filter(product_id=product_id, size=size).delete()
+
+
+def record(product_id, size, fit):
+    """Count one more ``fit`` answer for a product size."""
+    field = FIT_FIELDS[fit]
+    stats = SizeFitStats.objects.filter(product_id=product_id, size=size)
+    if stats.update(**{field: F(field) + 1, 'updated_at': timezone.now()}):
+        return
+    try:
+        with transaction.atomic():
+            SizeFitStats.objects.create(product_id=product_id, size=size, **{field: 1})
+    except IntegrityError:
+        # A concurrent review created the row first
+        stats.update(**{field: F(field) + 1, 'updated_at': timezone.now()})
+
+
+def rebuild_stats(batch_size=5000):
+    """Recount all fit feedback; returns the number of product sizes."""
+    rows = (
+        ProductReview.objects.filter(is_approved=True, fit_feedback__in=FIT_FIELDS)
+        .exclude(size_purchased='').order_by()
+        .values_list('product_id', 'size_purchased')
+        .annotate(**{field: Count('pk', filter=Q(fit_feedback=fit)) for fit, field in FIT_FIELDS.items()})
+    )
+    created = 0
+    with transaction.atomic():
+        SizeFitStats.objects.all().delete()
+        batch = []
+        for product_id, size, small, true, large in rows.iterator(chunk_size=batch_size):
+            batch.append(SizeFitStats(
+                product_id=product_id, size=size, runs_small=small, true_to_size=true, runs_large=large,
+            ))
+            if len(batch) >= batch_size:
+                created += len(SizeFitStats.objects.bulk_create(batch))
+                batch = []
+        created += len(SizeFitStats.objects.bulk_create(batch))
+    return created
+
+
+# Body to size model
+
+def build():
+    """Fit and publish the body measurements to size model; returns its metadata."""
+    started = time.perf_counter()
+    avatars = dict(UserAvatar.objects.filter(is_default=True).values_list('user_id', 'measurements'))
+    rows, targets = [], []
+    reviews = (
+        ProductReview.objects.filter(is_approved=True, fit_feedback__in=FIT_SHIFT)
+        .exclude(size_purchased='')
+        .values_list('size_purchased', 'fit_feedback', 'user_id', 'user__height', 'user__weight', 'user__body_type')
+    )
+    for size, fit, user_id, height, weight, body_type in reviews.iterator(chunk_size=10000):
+        position = size_position(size)
+        if position is None:
+            continue
+        rows.append(features(height, weight, body_type, avatars.get(user_id)))
+        targets.append(position + FIT_SHIFT[fit])
+
+    matrix = np.array(rows, dtype=np.float64).reshape(-1, len(FEATURES))
+    targets = np.array(targets, dtype=np.float64)
+    # Impute missing values with the column mean (0 for columns nobody filled in)
+    known = (~np.isnan(matrix)).sum(axis=0)
+    mean = np.nansum(matrix, axis=0) / np.maximum(known, 1)
+    matrix = np.where(np.isnan(matrix), mean, matrix)
+    scale = matrix.std(axis=0) if len(matrix) else np.ones(len(FEATURES))
+    scale[scale == 0] = 1
+    standardized = (matrix - mean) / scale
+    intercept = float(targets.mean()) if len(targets) else SIZE_SCALE.index('M')
+    coef = np.linalg.solve(
+        standardized.T @ standardized + get_setting('SIZE_RIDGE') * np.eye(len(FEATURES)),
+        standardized.T @ (targets - intercept),
+    )
+    residuals = targets - (intercept + standardized @ coef)
+
+    meta = {
+        'built_at': timezone.now().isoformat(),
+        'features': FEATURES,
+        'intercept': intercept,
+        'reviews': len(targets),
+        'rmse': float(np.sqrt(np.mean(residuals ** 2))) if len(targets) else None,
+        'seconds': round(time.perf_counter() - started, 2),
+    }
+    meta['generation'] = publish(ARTIFACT, {
+        'mean': mean.astype(np.float32), 'scale': scale.astype(np.float32), 'coef': coef.astype(np.float32),
+    }, meta)
+    return meta
+
+
+index = Artifact(ARTIFACT)
+
+
+def _avatar(user):
+    return (
+        UserAvatar.objects.filter(user=user).order_by('-is_default', '-updated_at')
+        .only('pk', 'measurements', 'updated_at').first()
+    )
+
+
+def body_position(model, user, avatar):
+    """``user``'s position on ``SIZE_SCALE``, or ``None`` without measurements."""
+    row = np.array(features(
+        user.height, user.weight, user.body_type, avatar.measurements if avatar else None,
+    ), dtype=np.float64)
+    measured = [FEATURES.index(name) for name in ['height', 'weight'] + MEASUREMENTS]
+    if np.isnan(row[measured]).all():
+        return None
+    arrays = model.arrays
+    row = np.where(np.isnan(row), arrays['mean'], row)
+    return float(model.meta['intercept'] + ((row - arrays['mean']) / arrays['scale']) @ arrays['coef'])
+
+
+def _fit(small, true, large):
+    reviews = small + true + large
+    if not reviews:
+        return {'runs_small': 0.0, 'true_to_size': 0.0, 'runs_large': 0.0, 'reviews': 0}
+    return {
+        'runs_small': round(small / reviews, 2), 'true_to_size': round(true / reviews, 2),
+        'runs_large': round(large / reviews, 2), 'reviews': reviews,
+    }
+
+
+def _advise(position, product_ids):
+    """Advice for ``product_ids`` for a shopper at ``position`` (``None`` if unknown)."""
+    sizes = list(
+        ProductVariant.objects.filter(product_id__in=product_ids, is_active=True)
+        .values_list('product_id', 'size').distinct()
+    )
+    stats = {
+        (product_id, size): counts for product_id, size, *counts in
+        SizeFitStats.objects.filter(product_id__in=product_ids)
+        .values_list('product_id', 'size', 'runs_small', 'true_to_size', 'runs_large')
+    }
+    sizes = [(pk, size, size_position(size)) for pk, size in sizes]
+    sizes = [row for row in sizes if row[2] is not None]
+    advice = {pk: {'size': None, 'confidence': 0.0, 'fit': None, 'reason': 'no_sizes'} for pk in product_ids}
+    if not sizes:
+        return advice
+
+    products = {pk: i for i, pk in enumerate(product_ids)}
+    product = np.array([products[pk] for pk, _, _ in sizes])
+    positions = np.array([position for _, _, position in sizes], dtype=np.float64)
+    counts = np.array([stats.get((pk, size), (0, 0, 0)) for pk, size, _ in sizes], dtype=np.float64)
+    small, true, large = counts.T
+    reviews = counts.sum(axis=1)
+    prior = get_setting('SIZE_PRIOR')
+
+    # A size that runs small fits like a smaller one
+    effective = positions - (small - large) / (reviews + prior)
+    if position is None:
+        # Without measurements: the size most reviewers found true to size
+        distance = -(true + 1) / (reviews + prior)
+        confidence = np.zeros(len(sizes))
+    else:
+        distance = np.abs(effective - position)
+        confidence = (1 - np.minimum(distance, 1)) * (0.5 + 0.5 * reviews / (reviews + prior))
+    # Per product: the closest size, the larger one on ties
+    order = np.lexsort((-positions, distance, product))
+    _, first = np.unique(product[order], return_index=True)
+    for row in order[first]:
+        pk, size, _ = sizes[row]
+        advice[pk] = {
+            'size': size,
+            'confidence': round(float(confidence[row]), 2),
+            'fit': _fit(*(int(value) for value in counts[row])),
+            'reason': 'measurements' if position is not None else 'reviews',
+        }
+    return advice
+
+
+def _version(user, avatar):
+    stamps = [user.updated_at, avatar.updated_at if avatar else None]
+    return '-'.join(f'{stamp.timestamp():.0f}' if stamp else '0' for stamp in stamps)
+
+
+def recommend_sizes(user, product_ids):
+    """``{product_id: advice}`` for a batch of ``product_ids`` in one call."""
+    avatar = _avatar(user)
+    model = index.get()
+    version = f"{model.meta['generation'] if model else 0}:{_version(user, avatar)}"
+    keys = {pk: f'sizing:{user.pk}:{version}:{pk}' for pk in product_ids}
+    cached = cache.get_many(list(keys.values()))
+    result = {pk: cached[key] for pk, key in keys.items() if key in cached}
+    missing = [pk for pk in product_ids if pk not in result]
+    if missing:
+        position = body_position(model, user, avatar) if model else None
+        computed = _advise(position, missing)
+        cache.set_many({keys[pk]: advice for pk, advice in computed.items()}, get_setting('SIZE_CACHE_TIMEOUT'))
+        result.update(computed)
+    return result
+
+
+# Review signals
+
+FIT_TRACKED = ('size_purchased', 'fit_feedback', 'is_approved')
+
+
+def _review_saving(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or instance._state.adding:
+        return
+    if update_fields is not None and not set(update_fields) & set(FIT_TRACKED):
+        return
+    # Read the stored row once per save rather than snapshotting every loaded review
+    instance._fit_stored = (
+        ProductReview.objects.filter(pk=instance.pk).values_list(*FIT_TRACKED).first()
+    )
+
+
+def _review_saved(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        size, fit, approved = (getattr(instance, name) for name in FIT_TRACKED)
+        if approved and size and fit in FIT_FIELDS:
+            record(instance.product_id, size, fit)
+        return
+    before = instance.__dict__.pop('_fit_stored', None)
+    if before is None:
+        return
+    # Deferred fields were not written and keep their stored value
+    after = tuple(instance.__dict__.get(name, stored) for name, stored in zip(FIT_TRACKED, before))
+    if before != after:
+        for touched in {before[0], after[0]} - {None, ''}:
+            recount(instance.product_id, touched)
+
+
+def _review_deleted(sender, instance, **kwargs):
+    if instance.size_purchased and instance.fit_feedback in FIT_FIELDS:
+        recount(instance.product_id, instance.size_purchased)
+
+
+pre_save.connect(_review_saving, sender=ProductReview, dispatch_uid='recommendations.sizing.saving')
+post_save.connect(_review_saved, sender=ProductReview, dispatch_uid='recommendations.sizing.saved')
+post_delete.connect(_review_deleted, sender=ProductReview, dispatch_uid='recommendations.sizing.deleted')
@@ -0,0 +1,119 @@
+"""
+Memory-mapped model artifacts for EshoTry recommendations.
+
+An artifact is a directory of ``.npy`` arrays plus ``meta.json``. Builds write
+a new generation directory and then atomically repoint the ``current``
+symlink, so readers never see a half-written model. Every worker process maps
+the arrays read-only (``mmap_mode='r'``), which shares one copy of the pages
+through the OS page cache, and remaps when ``current`` moves.
+"""
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from datetime import datetime
+
+import numpy as np
+from django.conf import settings
+
+CURRENT = 'current'
+META = 'meta.json'
+
+
+def get_setting(name):
+    return settings.RECOMMENDATIONS[name]
+
+
+def artifact_root(name):
+    return os.path.join(str(get_setting('ROOT')), name)
+
+
+def publish(name, arrays, meta):
+    """Write ``arrays`` as a new generation of artifact ``name`` and make it current."""
+    root = artifact_root(name)
+    generation = datetime.now().strftime('%Y%m%d%H%M%S%f') + f'-{os.getpid()}'
+    path = os.path.join(root, generation)
+    os.makedirs(path)
+    for key, array in arrays.items():
+        np.save(os.path.join(path, f'{key}.npy'), array, allow_pickle=False)
+    with open(os.path.join(path, META), 'w') as handle:
+        json.dump({**meta, 'generation': generation}, handle, indent=1)
+
+    link = os.path.join(root, f'{CURRENT}.{generation}')
+    os.symlink(generation, link)
+    os.replace(link, os.path.join(root, CURRENT))
+    _prune(root, keep=get_setting('KEEP_GENERATIONS'))
+    return generation
+
+
+def _prune(root, keep):
+    current = os.readlink(os.path.join(root, CURRENT))
+    generations = sorted(
+        entry.name for entry in os.scandir(root)
+        if entry.is_dir(follow_symlinks=False) and entry.name != current
+    )
+    # Workers may still map an older generation until their next reload check
+    for generation in generations[:max(len(generations) - (keep - 1), 0)]:
+        shutil.rmtree(os.path.join(root, generation), ignore_errors=True)
+
+
+class Artifact:
+    """The current generation of artifact ``name``, remapped when a build publishes."""
+
+    def __init__(self, name, check_interval=5.0):
+        self.name = name
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._generation = None
+        self._checked = 0.0
+        self.arrays = {}
+        self.meta = {}
+
+    def _current(self):
+        try:
+            return os.readlink(os.path.join(artifact_root(self.name), CURRENT))
+        except OSError:
+            return None
+
+    def _load(self, generation):
+        path = os.path.join(artifact_root(self.name), generation)
+        with open(os.path.join(path, META)) as handle:
+            meta = json.load(handle)
+        arrays = {
+            entry.name[:-len('.npy')]: np.load(entry.path, mmap_mode='r', allow_pickle=False)
+            for entry in os.scandir(path) if entry.name.endswith('.npy')
+        }
+        return arrays, meta
+
+    def get(self):
+        """``self`` once loaded, or ``None`` if the artifact was never built."""
+        now = time.monotonic()
+        if now - self._checked >= self.check_interval:
+            with self._lock:
+                self._checked = now
+                generation = self._current()
+                if generation and generation != self._generation:
+                    self.arrays, self.meta = self._load(generation)
+                    self._generation = generation
+        return self if self._generation else None
+
+
+def encode_ids(ids):
+    """Sorted fixed-width byte keys for UUIDs, searchable with ``np.searchsorted``."""
+    return np.array([pk.bytes for pk in ids], dtype='S16')
+
+
+def lookup(keys, pk):
+    """Row of UUID ``pk`` in sorted ``keys``, or ``None``."""
+    key = np.array(pk.bytes, dtype='S16')
+    row = int(np.searchsorted(keys, key))
+    if row < len(keys) and keys[row] == key:
+        return row
+    return None
+
+
+def decode_id(key):
+    # numpy strips trailing NUL bytes from fixed-width byte strings
+    return uuid.UUID(bytes=bytes(key).ljust(16, b'\0'))
@@ -0,0 +1,62 @@
+"""
+Celery tasks for recommendations.
+"""
+from celery import shared_task
+from django.core.cache import cache
+
+from . import content, cooccurrence, personalization, sizing
+
+# Builds and flushes replace the content delta; let only one run at a time
+CONTENT_LOCK = 'recommendations:content:lock'
+CONTENT_LOCK_TIMEOUT = 60 * 60
+PREFERENCES_LOCK = 'recommendations:preferences:lock'
+
+
+@shared_task(ignore_result=True)
+def build_recommendations():
+    """Rebuild the co-occurrence, content, preference and sizing artifacts."""
+    cooccurrence.build()
+    build_content_index()
+    build_preference_index()
+    sizing.build()
+
+
+@shared_task(ignore_result=True)
+def build_content_index():
+    """Rebuild the content index, folding in the delta."""
+    if not cache.add(CONTENT_LOCK, 1, CONTENT_LOCK_TIMEOUT):
+        return
+    try:
+        content.build()
+    finally:
+        cache.delete(CONTENT_LOCK)
+
+
+@shared_task(ignore_result=True)
+def flush_content_index():
+    """Fold the products queued since the last run into the content index delta."""
+    # A build or flush holds the lock; what is pending waits for the next beat
+    if not cache.add(CONTENT_LOCK, 1, CONTENT_LOCK_TIMEOUT):
+        return
+    try:
+        content.flush()
+    finally:
+        cache.delete(CONTENT_LOCK)
+
+
+@shared_task(ignore_result=True)
+def update_content_index(product_ids):
+    """Queue new or changed products for the next ``flush_content_index``."""
+    content.queue(product_ids)
+
+
+@shared_task(ignore_result=True)
+def build_preference_index():
+    """Rebuild the product preference vectors used to personalize listings."""
+    # Price rule runs come in bursts; one rebuild covers them all
+    if not cache.add(PREFERENCES_LOCK, 1, CONTENT_LOCK_TIMEOUT):
+        return
+    try:
+        personalization.build()
+    finally:
+        cache.delete(PREFERENCES_LOCK)
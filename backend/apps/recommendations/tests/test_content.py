@@ -0,0 +1,108 @@
+"""
+Tests for the content-similarity candidate search.
+"""
+import uuid
+from types import SimpleNamespace
+from unittest import TestCase, mock
+
+import numpy as np
+
+from apps.recommendations import content
+from apps.recommendations.store import encode_ids
+
+# Ascending UUIDs, so their byte keys are already sorted
+A, B, C, D, E = (uuid.UUID(int=i) for i in range(1, 6))
+VECTORS = {
+    A: [1.0, 0.0],
+    B: [0.8, 0.6],
+    C: [0.6, 0.8],
+    D: [0.0, 1.0],
+    E: [-1.0, 0.0],
+}
+
+
+def artifact(arrays, meta):
+    return SimpleNamespace(get=lambda: SimpleNamespace(arrays=arrays, meta=meta))
+
+
+def main_index():
+    # Cluster 0 holds A and B, cluster 1 holds C, D and E
+    keys = list(VECTORS)
+    return artifact({
+        'product_ids': encode_ids(keys),
+        'product_rows': np.arange(len(keys)),
+        'row_ids': encode_ids(keys),
+        'vectors': np.array(list(VECTORS.values()), dtype=np.float32),
+        'centroids': np.array([[1.0, 0.0], [0.0, 1.0]], dtype=np.float32),
+        'offsets': np.array([0, 2, 5]),
+    }, {'generation': 'main'})
+
+
+def delta_index(updated=None, removed=()):
+    updated = updated or {}
+    return artifact({
+        'product_ids': encode_ids(updated),
+        'vectors': np.array(list(updated.values()), dtype=np.float32).reshape(-1, 2),
+        'removed': encode_ids(removed),
+    }, {'base': 'main'})
+
+
+class BestTests(TestCase):
+
+    def entries(self, best, row=0):
+        return {
+            uuid.UUID(bytes=key): round(float(score), 6)
+            for key, score in zip(best.keys[row], best.scores[row]) if np.isfinite(score)
+        }
+
+    def test_keeps_top_scores_across_merges(self):
+        best = content._Best(1, 2)
+        exclude = encode_ids([B])
+        best.merge(np.array([0]), np.array([[0.5, 0.9, 0.1]], dtype=np.float32), encode_ids([A, B, C]), exclude)
+        self.assertEqual(self.entries(best), {A: 0.5, C: 0.1})
+        best.merge(np.array([0]), np.array([[0.7]], dtype=np.float32), encode_ids([D]), exclude)
+        self.assertEqual(self.entries(best), {A: 0.5, D: 0.7})
+
+    def test_merges_only_members(self):
+        best = content._Best(2, 1)
+        best.merge(np.array([1]), np.array([[0.3]], dtype=np.float32), encode_ids([A]), encode_ids([C, D]))
+        self.assertEqual(self.entries(best, 0), {})
+        self.assertEqual(self.entries(best, 1), {A: 0.3})
+
+    def test_fewer_candidates_than_limit(self):
+        best = content._Best(1, 3)
+        best.merge(np.array([0]), np.array([[0.2, 0.4]], dtype=np.float32), encode_ids([A, B]), encode_ids([C]))
+        self.assertEqual(self.entries(best), {A: 0.2, B: 0.4})
+
+
+class SimilarProductsTests(TestCase):
+
+    def similar(self, product_ids, limit=2, nprobe=2, delta=None):
+        with mock.patch.object(content, 'index', main_index()), \
+                mock.patch.object(content, 'delta_index', delta or delta_index()), \
+                mock.patch.object(content, 'get_setting', return_value=nprobe):
+            return content.similar_products(product_ids, limit=limit)
+
+    def assertSimilar(self, result, expected):
+        self.assertEqual(set(result), set(expected))
+        for pk, neighbours in expected.items():
+            self.assertEqual([key for key, _ in result[pk]], [key for key, _ in neighbours])
+            np.testing.assert_allclose([score for _, score in result[pk]], [score for _, score in neighbours], atol=1e-6)
+
+    def test_ranks_by_cosine_and_excludes_self(self):
+        self.assertSimilar(self.similar([A, E], limit=3), {
+            A: [(B, 0.8), (C, 0.6), (D, 0.0)],
+            E: [(D, 0.0), (C, -0.6), (B, -0.8)],
+        })
+
+    def test_probes_only_closest_clusters(self):
+        # B scores 0.6 against D but sits in the unprobed cluster
+        self.assertSimilar(self.similar([D], nprobe=1), {D: [(C, 0.8), (E, 0.0)]})
+
+    def test_delta_supersedes_and_removes(self):
+        delta = delta_index(updated={C: [1.0, 0.0]}, removed=[B])
+        self.assertSimilar(self.similar([A], delta=delta), {A: [(C, 1.0), (D, 0.0)]})
+
+    def test_unknown_products(self):
+        with mock.patch.object(content, '_documents', return_value=[]):
+            self.assertEqual(self.similar([uuid.UUID(int=99)]), {})
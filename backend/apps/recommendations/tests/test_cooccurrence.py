@@ -0,0 +1,65 @@
+"""
+Tests for the co-occurrence neighbour selection.
+"""
+from unittest import TestCase
+
+import numpy as np
+from scipy import sparse
+
+from apps.recommendations.cooccurrence import top_k
+
+# Users x products; product 4 has no interactions
+INTERACTIONS = [
+    [1, 1, 1, 0, 0],
+    [1, 1, 0, 0, 0],
+    [0, 1, 1, 0, 0],
+    [0, 0, 1, 1, 0],
+]
+
+
+def interactions():
+    return sparse.csr_matrix(np.array(INTERACTIONS, dtype=np.float32))
+
+
+class JaccardTopKTests(TestCase):
+    # Users per product: 2, 3, 3, 1, 0
+    expected_neighbours = [[1, 2], [0, 2], [1, 3], [2, -1], [-1, -1]]
+    expected_scores = [
+        [2 / 3, 1 / 4],  # |{0,1}| / |{0,1,2}|, |{0}| / |{0,1,2,3}|
+        [2 / 3, 1 / 2],  # |{0,2}| / |{0,1,2,3}|
+        [1 / 2, 1 / 3],  # 1/4 for product 0 falls outside k
+        [1 / 3, 0],
+        [0, 0],
+    ]
+
+    def test_neighbours_and_scores(self):
+        neighbours, scores = top_k(interactions(), 2, 'jaccard')
+        self.assertEqual(neighbours.tolist(), self.expected_neighbours)
+        np.testing.assert_allclose(scores, self.expected_scores, rtol=1e-6)
+
+    def test_excludes_self(self):
+        # Every product is its own best match with score 1
+        neighbours, _ = top_k(interactions(), 4, 'jaccard')
+        for product, row in enumerate(neighbours):
+            self.assertNotIn(product, row.tolist())
+
+    def test_block_size_does_not_change_result(self):
+        whole = top_k(interactions(), 2, 'jaccard', block_size=8)
+        for block_size in (1, 2, 3):
+            neighbours, scores = top_k(interactions(), 2, 'jaccard', block_size=block_size)
+            np.testing.assert_array_equal(neighbours, whole[0])
+            np.testing.assert_allclose(scores, whole[1])
+
+
+class CosineTopKTests(TestCase):
+
+    def test_neighbours_and_scores(self):
+        neighbours, scores = top_k(interactions(), 2, 'cosine')
+        self.assertEqual(neighbours.tolist(), [[1, 2], [0, 2], [1, 3], [2, -1], [-1, -1]])
+        np.testing.assert_allclose(scores, [
+            [2 / np.sqrt(6), 1 / np.sqrt(6)],
+            [2 / np.sqrt(6), 2 / 3],
+            [2 / 3, 1 / np.sqrt(3)],
+            [1 / np.sqrt(3), 0],
+            [0, 0],
+        ], rtol=1e-6)
@@ -0,0 +1,13 @@
+"""
+URL patterns for recommendations.
+"""
+from django.urls import path
+
+from . import views
+
+urlpatterns = [
+    path('products/<uuid:product_id>/also-bought/', views.AlsoBoughtView.as_view(), name='also-bought'),
+    path('products/<uuid:product_id>/similar/', views.SimilarProductsView.as_view(), name='similar-products'),
+    path('products/<uuid:product_id>/size/', views.ProductSizeView.as_view(), name='product-size'),
+    path('sizes/', views.SizeBatchView.as_view(), name='size-batch'),
+]
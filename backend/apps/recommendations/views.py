@@ -0,0 +1,96 @@
+"""
+Views for product recommendations.
+"""
+import uuid
+
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from apps.products.models import Product
+from apps.products.serializers import ProductListSerializer, with_list_stats
+from . import content, cooccurrence, sizing
+from .store import get_setting
+
+
+def _limit(request):
+    try:
+        return min(max(int(request.query_params.get('limit', 10)), 1), get_setting('TOP_K'))
+    except ValueError:
+        return 10
+
+
+def _products(request, product_id, scores, source):
+    products = sorted(
+        with_list_stats(
+            Product.objects.filter(pk__in=scores, status='active')
+            .select_related('category', 'brand').prefetch_related('images'),
+            request,
+        ),
+        key=lambda product: -scores[product.pk],
+    )
+    return Response({
+        'product_id': product_id,
+        'source': source,
+        'results': ProductListSerializer(products, many=True, context={'request': request}).data,
+    })
+
+
+class AlsoBoughtView(APIView):
+    """Products most often bought together with a product."""
+
+    permission_classes = [permissions.AllowAny]
+    query_budget = 8
+
+    def get(self, request, product_id):
+        limit = _limit(request)
+        scores = dict(cooccurrence.also_bought(product_id, limit))
+        if scores:
+            return _products(request, product_id, scores, 'cooccurrence')
+        # No purchase history yet (new products): fall back to similar items
+        scores = dict(content.similar_products([product_id], limit).get(product_id, []))
+        return _products(request, product_id, scores, 'content')
+
+
+class SimilarProductsView(APIView):
+    """Products with the most similar description and attributes."""
+
+    permission_classes = [permissions.AllowAny]
+    query_budget = 8
+
+    def get(self, request, product_id):
+        scores = dict(content.similar_products([product_id], _limit(request)).get(product_id, []))
+        return _products(request, product_id, scores, 'content')
+
+
+class ProductSizeView(APIView):
+    """Recommended size of a product for the current user."""
+
+    permission_classes = [permissions.IsAuthenticated]
+    query_budget = 4
+
+    def get(self, request, product_id):
+        advice = sizing.recommend_sizes(request.user, [product_id])[product_id]
+        return Response({'product_id': product_id, **advice})
+
+
+class SizeBatchView(APIView):
+    """Recommended sizes of several products for the current user, in one call."""
+
+    permission_classes = [permissions.IsAuthenticated]
+    query_budget = 4
+
+    def post(self, request):
+        try:
+            product_ids = list(dict.fromkeys(
+                uuid.UUID(str(value)) for value in request.data.get('product_ids', [])
+            ))
+        except (AttributeError, TypeError, ValueError):
+            return Response({'error': 'product_ids must be a list of product IDs'}, status=status.HTTP_400_BAD_REQUEST)
+        limit = get_setting('SIZE_BATCH_LIMIT')
+        if not product_ids or len(product_ids) > limit:
+            return Response(
+                {'error': f'Send between 1 and {limit} product_ids'}, status=status.HTTP_400_BAD_REQUEST
+            )
+        advice = sizing.recommend_sizes(request.user, product_ids)
+        return Response({'results': [{'product_id': pk, **advice[pk]} for pk in product_ids]})
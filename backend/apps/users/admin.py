@@ -3,11 +3,13 @@ Admin configuration for user models.
 """
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+
+from eshotry.admin_utils import EstimatedCountPaginator, IndexedSearchMixin, LargeTableAdmin
 from .models import User, UserAddress, UserAvatar, UserStyleQuiz
 
 
 @admin.register(User)
-class UserAdmin(BaseUserAdmin):
+class UserAdmin(IndexedSearchMixin, BaseUserAdmin):
     """Admin configuration for User model."""
     
     list_display = [
@@ -20,6 +22,8 @@ class UserAdmin(BaseUserAdmin):
     ]
     search_fields = ['email', 'username', 'first_name', 'last_name']
     ordering = ['-created_at']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     
     fieldsets = BaseUserAdmin.fieldsets + (
         ('Personal Information', {
@@ -49,7 +53,7 @@ class UserAdmin(BaseUserAdmin):
 
 
 @admin.register(UserAddress)
-class UserAddressAdmin(admin.ModelAdmin):
+class UserAddressAdmin(LargeTableAdmin):
     """Admin configuration for UserAddress model."""
     
     list_display = [
@@ -61,6 +65,8 @@ class UserAddressAdmin(admin.ModelAdmin):
         'user__email', 'full_name', 'city', 'state', 'postal_code'
     ]
     ordering = ['-created_at']
+    list_select_related = ['user']
+    raw_id_fields = ['user']
     
     fieldsets = (
         ('User Information', {
@@ -85,7 +91,7 @@ class UserAddressAdmin(admin.ModelAdmin):
 
 
 @admin.register(UserAvatar)
-class UserAvatarAdmin(admin.ModelAdmin):
+class UserAvatarAdmin(LargeTableAdmin):
     """Admin configuration for UserAvatar model."""
     
     list_display = [
@@ -94,6 +100,8 @@ class UserAvatarAdmin(admin.ModelAdmin):
     list_filter = ['is_default', 'created_at']
     search_fields = ['user__email', 'name']
     ordering = ['-created_at']
+    list_select_related = ['user']
+    raw_id_fields = ['user']
     
     fieldsets = (
         ('Basic Information', {
@@ -112,7 +120,7 @@ class UserAvatarAdmin(admin.ModelAdmin):
 
 
 @admin.register(UserStyleQuiz)
-class UserStyleQuizAdmin(admin.ModelAdmin):
+class UserStyleQuizAdmin(LargeTableAdmin):
     """Admin configuration for UserStyleQuiz model."""
     
     list_display = [
@@ -121,6 +129,8 @@ class UserStyleQuizAdmin(admin.ModelAdmin):
     list_filter = ['lifestyle', 'shopping_frequency', 'completed_at']
     search_fields = ['user__email']
     ordering = ['-completed_at']
+    list_select_related = ['user']
+    raw_id_fields = ['user']
     
     fieldsets = (
         ('User Information', {
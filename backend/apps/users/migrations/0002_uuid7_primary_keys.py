@@ -0,0 +1,34 @@
+# Generated by Django 4.2.7 on 2026-10-19 01:40
+
+from django.db import migrations, models
+import eshotry.ids
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='id',
+            field=models.UUIDField(default=eshotry.ids.primary_key, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='useraddress',
+            name='id',
+            field=models.UUIDField(default=eshotry.ids.primary_key, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='useravatar',
+            name='id',
+            field=models.UUIDField(default=eshotry.ids.primary_key, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='userstylequiz',
+            name='id',
+            field=models.UUIDField(default=eshotry.ids.primary_key, editable=False, primary_key=True, serialize=False),
+        ),
+    ]
@@ -0,0 +1,31 @@
+from django.db import migrations
+
+SEARCH_INDEXES = [
+    ('users_email_upper_trgm', 'users', 'email'),
+    ('users_username_upper_trgm', 'users', 'username'),
+    ('users_first_name_upper_trgm', 'users', 'first_name'),
+    ('users_last_name_upper_trgm', 'users', 'last_name'),
+]
+
+
+def create_indexes(apps, schema_editor):
+    from eshotry.admin_utils import create_search_indexes
+
+    create_search_indexes(schema_editor, SEARCH_INDEXES)
+
+
+def drop_indexes(apps, schema_editor):
+    from eshotry.admin_utils import drop_search_indexes
+
+    drop_search_indexes(schema_editor, SEARCH_INDEXES)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_uuid7_primary_keys'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
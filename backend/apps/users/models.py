@@ -4,7 +4,7 @@ User models for EshoTry platform.
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
-import uuid
+from eshotry.ids import primary_key
 
 
 class User(AbstractUser):
@@ -24,7 +24,7 @@ class User(AbstractUser):
         ('plus', 'Plus Size'),
     ]
     
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=primary_key, editable=False)
     email = models.EmailField(unique=True)
     phone_number = models.CharField(max_length=20, blank=True, null=True)
     date_of_birth = models.DateField(blank=True, null=True)
@@ -93,7 +93,7 @@ class UserAddress(models.Model):
         ('other', 'Other'),
     ]
     
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=primary_key, editable=False)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='addresses')
     type = models.CharField(max_length=10, choices=ADDRESS_TYPE_CHOICES, default='home')
     is_default = models.BooleanField(default=False)
@@ -128,7 +128,7 @@ class UserAddress(models.Model):
 class UserAvatar(models.Model):
     """Stored user avatars for virtual try-on."""
     
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=primary_key, editable=False)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='avatars')
     name = models.CharField(max_length=100)
     avatar_data = models.JSONField()  # 3D avatar parameters
@@ -153,7 +153,7 @@ class UserAvatar(models.Model):
 class UserStyleQuiz(models.Model):
     """User style preferences from style quiz."""
     
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=primary_key, editable=False)
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='style_quiz')
     
     # Style preferences
@@ -9,6 +9,8 @@ from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import login
 from django.db import transaction
 
+from eshotry.query_budget import query_budget
+
 from .models import User, UserAddress, UserAvatar, UserStyleQuiz
 from .serializers import (
     UserRegistrationSerializer, UserLoginSerializer, UserProfileSerializer,
@@ -21,6 +23,7 @@ class UserRegistrationView(APIView):
     """User registration endpoint."""
     
     permission_classes = [permissions.AllowAny]
+    query_budget = 6
     
     def post(self, request):
         serializer = UserRegistrationSerializer(data=request.data)
@@ -46,6 +49,7 @@ class UserLoginView(APIView):
     """User login endpoint."""
     
     permission_classes = [permissions.AllowAny]
+    query_budget = 8
     
     def post(self, request):
         serializer = UserLoginSerializer(
@@ -79,6 +83,7 @@ class UserProfileView(generics.RetrieveUpdateAPIView):
     
     serializer_class = UserProfileSerializer
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = 3
     
     def get_object(self):
         return self.request.user
@@ -89,6 +94,7 @@ class UserAddressListCreateView(generics.ListCreateAPIView):
     
     serializer_class = UserAddressSerializer
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = 4
     
     def get_queryset(self):
         return UserAddress.objects.filter(user=self.request.user)
@@ -99,6 +105,7 @@ class UserAddressDetailView(generics.RetrieveUpdateDestroyAPIView):
     
     serializer_class = UserAddressSerializer
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = 4
     
     def get_queryset(self):
         return UserAddress.objects.filter(user=self.request.user)
@@ -109,6 +116,7 @@ class UserAvatarListCreateView(generics.ListCreateAPIView):
     
     serializer_class = UserAvatarSerializer
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = 4
     
     def get_queryset(self):
         return UserAvatar.objects.filter(user=self.request.user)
@@ -119,6 +127,7 @@ class UserAvatarDetailView(generics.RetrieveUpdateDestroyAPIView):
     
     serializer_class = UserAvatarSerializer
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = 4
     
     def get_queryset(self):
         return UserAvatar.objects.filter(user=self.request.user)
@@ -129,6 +138,7 @@ class UserStyleQuizView(generics.RetrieveUpdateAPIView):
     
     serializer_class = UserStyleQuizSerializer
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = 4
     
     def get_object(self):
         try:
@@ -156,6 +166,7 @@ class PasswordChangeView(APIView):
     """Password change endpoint."""
     
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = 5
     
     def post(self, request):
         serializer = PasswordChangeSerializer(
@@ -171,6 +182,7 @@ class PasswordChangeView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+@query_budget(4)
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
 def logout_view(request):
@@ -189,6 +201,7 @@ def logout_view(request):
                        status=status.HTTP_400_BAD_REQUEST)
 
 
+@query_budget(8)
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def user_dashboard_view(request):
@@ -0,0 +1,31 @@
+"""
+Admin configuration for virtual try-on models.
+"""
+from django.contrib import admin
+
+from eshotry.admin_utils import LargeTableAdmin
+from .models import TryOnJob, TryOnSession
+
+
+@admin.register(TryOnJob)
+class TryOnJobAdmin(LargeTableAdmin):
+    """Admin configuration for TryOnJob model."""
+    
+    list_display = ['content_hash', 'status', 'attempts', 'created_at', 'finished_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['=content_hash']
+    readonly_fields = [
+        'content_hash', 'inputs', 'result', 'error', 'timings', 'attempts',
+        'created_at', 'queued_at', 'started_at', 'finished_at',
+    ]
+
+
+@admin.register(TryOnSession)
+class TryOnSessionAdmin(LargeTableAdmin):
+    """Admin configuration for TryOnSession model."""
+    
+    list_display = ['user', 'product', 'variant', 'job', 'created_at']
+    list_select_related = ['user', 'product', 'variant', 'job']
+    search_fields = ['user__email', 'variant__sku']
+    raw_id_fields = ['user', 'avatar', 'product', 'variant', 'job']
+    readonly_fields = ['created_at']
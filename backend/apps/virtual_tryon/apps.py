@@ -0,0 +1,7 @@
+from django.apps import AppConfig
+
+
+class VirtualTryonConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.virtual_tryon'
+    verbose_name = 'Virtual Try-On'
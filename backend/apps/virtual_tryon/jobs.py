@@ -0,0 +1,285 @@
+"""
+Try-on job queue for EshoTry platform.
+
+A try-on request is reduced to the inputs that change the picture: the
+avatar's rounded measurements and skin tone, the garment image (by the
+content hash its renditions are stored under), color and size, and the
+renderer version. The SHA-256 of those inputs names a ``TryOnJob`` and its
+result (``tryon/ab/<hash>.webp``), so:
+
+* a request whose job completed is answered from storage (``cached``);
+* a request whose job is queued or rendering joins it (``coalesced``);
+* anything else queues the job (``queued``) unless ``MAX_QUEUE_DEPTH``
+  jobs are already waiting (503) or the user already has
+  ``MAX_PENDING_PER_USER`` of them (429).
+
+Every request still gets its own ``TryOnSession`` pointing at the shared job.
+
+Rendering is CPU bound and runs on the ``tryon`` Celery queue, outside the
+API workers. The task hands the job to a process pool of ``RENDER_WORKERS``
+and records the time spent queued, in each renderer stage and storing the
+result. Jobs left queued or processing for ``STALE_AFTER`` seconds (a lost
+message or a killed worker) are queued again by the next identical request.
+"""
+import hashlib
+import json
+import multiprocessing
+import posixpath
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from datetime import timedelta
+
+from celery.exceptions import SoftTimeLimitExceeded
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, connections, transaction
+from django.db.models import F
+from django.utils import timezone
+from PIL import Image
+
+from apps.products.models import ProductImage
+from eshotry.metrics import TRYON_REQUESTS, TRYON_STAGE_SECONDS
+from . import renderer
+from .models import TryOnJob, TryOnSession
+
+IN_FLIGHT = ['queued', 'processing']
+
+# Used when the avatar does not record a measurement (cm)
+DEFAULT_BODY = {'height': 170, 'chest': 92, 'waist': 78, 'hips': 98}
+
+
+def get_setting(name):
+    return settings.VIRTUAL_TRYON[name]
+
+
+class TryOnRejected(Exception):
+    """The try-on queue cannot take the request right now."""
+
+    def __init__(self, message, status_code, retry_after):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+def _measurement(values, name, fallback=None):
+    try:
+        value = float(values.get(name))
+    except (TypeError, ValueError):
+        return fallback or DEFAULT_BODY[name]
+    return value if value > 0 else fallback or DEFAULT_BODY[name]
+
+
+def _garment_image(variant):
+    """``(storage name, renditions)`` of the picture to dress the avatar in."""
+    if variant.image:
+        return variant.image.name, variant.image_renditions or {}
+    image = (
+        ProductImage.objects.filter(product_id=variant.product_id)
+        .order_by('-is_primary', 'sort_order').only('image', 'image_renditions').first()
+    )
+    if image is None or not image.image:
+        return '', {}
+    return image.image.name, image.image_renditions or {}
+
+
+def inputs_for(user, avatar, variant):
+    """The render inputs of ``variant`` on ``avatar`` (or ``user``'s profile)."""
+    measurements = avatar.measurements if avatar and isinstance(avatar.measurements, dict) else {}
+    avatar_data = avatar.avatar_data if avatar and isinstance(avatar.avatar_data, dict) else {}
+    # Whole centimetres: finer differences do not show at canvas resolution
+    body = {
+        name: round(_measurement(measurements, name, user.height if name == 'height' else None))
+        for name in DEFAULT_BODY
+    }
+    image, renditions = _garment_image(variant)
+    return {
+        'version': get_setting('RENDERER_VERSION'),
+        'body': body,
+        'avatar': {'skin_tone': str(avatar_data.get('skin_tone') or '').lower()},
+        'garment': {
+            'image': image,
+            'image_hash': renditions.get('hash', ''),
+            'color': (variant.color_hex or '').lower(),
+            'size': variant.size.strip().upper(),
+        },
+    }
+
+
+def content_hash(inputs):
+    garment = dict(inputs['garment'])
+    # The same picture uploaded under another name renders the same
+    image_hash = garment.pop('image_hash')
+    if image_hash:
+        garment['image'] = image_hash
+    canonical = json.dumps({**inputs, 'garment': garment}, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def result_name(digest):
+    return f"{get_setting('RESULTS_ROOT')}/{digest[:2]}/{digest}.webp"
+
+
+def owns_result(user, path):
+    """Whether ``user`` has a session on the job rendered into storage name ``path``."""
+    # tryon/ab/<hash>.webp; the hash finds the job through its unique index
+    digest = posixpath.basename(path)[:64]
+    return TryOnSession.objects.filter(
+        user=user, job__content_hash=digest, job__result=path,
+    ).exists()
+
+
+def _is_stale(job, now):
+    since = job.started_at if job.status == 'processing' else job.queued_at
+    return since is None or since < now - timedelta(seconds=get_setting('STALE_AFTER'))
+
+
+def _check_limits(user):
+    pending = TryOnJob.objects.filter(status='queued').count()
+    if pending >= get_setting('MAX_QUEUE_DEPTH'):
+        TRYON_REQUESTS.labels('rejected').inc()
+        raise TryOnRejected('Try-on is busy, please retry shortly.', 503, get_setting('RETRY_AFTER'))
+    mine = TryOnSession.objects.filter(user=user, job__status__in=IN_FLIGHT).values('job').distinct().count()
+    if mine >= get_setting('MAX_PENDING_PER_USER'):
+        TRYON_REQUESTS.labels('throttled').inc()
+        raise TryOnRejected('Too many try-ons in progress.', 429, get_setting('RETRY_AFTER'))
+
+
+def _enqueue(job):
+    from .tasks import render_tryon
+    transaction.on_commit(lambda: render_tryon.delay(str(job.pk)))
+
+
+def _job_for(user, inputs, digest):
+    """``(job, outcome)`` for ``digest``, queueing the job when it has to render."""
+    now = timezone.now()
+    job = TryOnJob.objects.filter(content_hash=digest).first()
+    if job is not None:
+        if job.status == 'completed' and default_storage.exists(job.result):
+            return job, 'cached'
+        if job.status in IN_FLIGHT and not _is_stale(job, now):
+            return job, 'coalesced'
+
+    _check_limits(user)
+    if job is None:
+        try:
+            with transaction.atomic():
+                job = TryOnJob.objects.create(content_hash=digest, inputs=inputs, queued_at=now)
+        except IntegrityError:
+            # An identical request created it first
+            return TryOnJob.objects.get(content_hash=digest), 'coalesced'
+    else:
+        # Failed, stale or lost its result: queue it again unless a racing request just did
+        requeued = TryOnJob.objects.filter(pk=job.pk, status=job.status, queued_at=job.queued_at).update(
+            status='queued', inputs=inputs, queued_at=now, started_at=None, finished_at=None,
+            result='', error='',
+        )
+        job.refresh_from_db()
+        if not requeued:
+            return job, 'coalesced'
+    _enqueue(job)
+    return job, 'queued'
+
+
+def submit(user, avatar, variant):
+    """``(session, outcome)`` for trying ``variant`` on ``avatar``; may raise ``TryOnRejected``."""
+    inputs = inputs_for(user, avatar, variant)
+    job, outcome = _job_for(user, inputs, content_hash(inputs))
+    session = TryOnSession.objects.create(
+        user=user, avatar=avatar, product_id=variant.product_id, variant=variant, job=job,
+    )
+    TRYON_REQUESTS.labels(outcome).inc()
+    return session, outcome
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _init_worker():
+    import django
+    django.setup()
+    connections.close_all()
+
+
+def _executor():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Spawned, not forked: the task worker runs threads
+            _pool = ProcessPoolExecutor(
+                max_workers=get_setting('RENDER_WORKERS'), initializer=_init_worker,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return _pool
+
+
+def _discard_pool(terminate=False):
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            if terminate:
+                # shutdown() leaves a hung render running and holding its worker
+                for process in list((_pool._processes or {}).values()):
+                    process.terminate()
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def _render(inputs):
+    # Prefork Celery children are daemonic and cannot start a pool; render inline there
+    if get_setting('RENDER_WORKERS') < 1 or multiprocessing.current_process().daemon:
+        return renderer.render(inputs)
+    try:
+        return _executor().submit(renderer.render, inputs).result(timeout=get_setting('RENDER_TIMEOUT'))
+    except BrokenProcessPool:
+        _discard_pool()
+        raise
+    except TimeoutError:
+        # The next job gets a fresh pool instead of one stuck behind the timed-out render
+        _discard_pool(terminate=True)
+        raise
+
+
+def _milliseconds(seconds):
+    return round(seconds * 1000, 2)
+
+
+def run(job_id):
+    """Render queued job ``job_id`` and store its result."""
+    started = timezone.now()
+    claimed = TryOnJob.objects.filter(pk=job_id, status='queued').update(
+        status='processing', started_at=started, attempts=F('attempts') + 1,
+    )
+    if not claimed:
+        # Rendered already, or picked up by another worker
+        return
+    job = TryOnJob.objects.get(pk=job_id)
+    timings = {'queue': _milliseconds((started - (job.queued_at or job.created_at)).total_seconds())}
+    try:
+        data, stages = _render(job.inputs)
+        timings.update(stages)
+        stored = time.perf_counter()
+        name = result_name(job.content_hash)
+        # Same hash, same picture: an existing file is kept
+        if not default_storage.exists(name):
+            name = default_storage.save(name, ContentFile(data))
+        timings['store'] = _milliseconds(time.perf_counter() - stored)
+    except (
+        OSError, ValueError, Image.DecompressionBombError, TimeoutError, BrokenProcessPool,
+        SoftTimeLimitExceeded,
+    ) as e:
+        TryOnJob.objects.filter(pk=job_id).update(
+            status='failed', error=str(e) or e.__class__.__name__, timings=timings,
+            finished_at=timezone.now(),
+        )
+        TRYON_REQUESTS.labels('failed').inc()
+        return
+
+    TryOnJob.objects.filter(pk=job_id).update(
+        status='completed', result=name, timings=timings, finished_at=timezone.now(),
+    )
+    for stage, milliseconds in timings.items():
+        TRYON_STAGE_SECONDS.labels(stage).observe(milliseconds / 1000)
@@ -0,0 +1,68 @@
+# Generated by Django 4.2.7 on 2026-10-19 02:50
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import eshotry.ids
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('products', '0007_image_placeholders'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('users', '0003_admin_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TryOnJob',
+            fields=[
+                ('id', models.UUIDField(default=eshotry.ids.primary_key, editable=False, primary_key=True, serialize=False)),
+                ('content_hash', models.CharField(max_length=64, unique=True)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('processing', 'Processing'), ('completed', 'Completed'), ('failed', 'Failed')], default='queued', max_length=20)),
+                ('inputs', models.JSONField(default=dict)),
+                ('result', models.CharField(blank=True, max_length=255)),
+                ('error', models.TextField(blank=True)),
+                ('timings', models.JSONField(blank=True, default=dict)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('queued_at', models.DateTimeField(blank=True, null=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Try-On Job',
+                'verbose_name_plural': 'Try-On Jobs',
+                'db_table': 'tryon_jobs',
+            },
+        ),
+        migrations.CreateModel(
+            name='TryOnSession',
+            fields=[
+                ('id', models.UUIDField(default=eshotry.ids.primary_key, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('avatar', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='tryon_sessions', to='users.useravatar')),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='sessions', to='virtual_tryon.tryonjob')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tryon_sessions', to='products.product')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tryon_sessions', to=settings.AUTH_USER_MODEL)),
+                ('variant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tryon_sessions', to='products.productvariant')),
+            ],
+            options={
+                'verbose_name': 'Try-On Session',
+                'verbose_name_plural': 'Try-On Sessions',
+                'db_table': 'tryon_sessions',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='tryonjob',
+            index=models.Index(fields=['status', 'created_at'], name='tryon_jobs_status_9d3785_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tryonsession',
+            index=models.Index(fields=['user', 'created_at'], name='tryon_sessi_user_id_5b28be_idx'),
+        ),
+    ]
@@ -0,0 +1,76 @@
+"""
+Virtual try-on models for EshoTry platform.
+"""
+from django.db import models
+from django.contrib.auth import get_user_model
+
+from apps.products.models import Product, ProductVariant
+from apps.users.models import UserAvatar
+from eshotry.ids import primary_key
+
+User = get_user_model()
+
+
+class TryOnJob(models.Model):
+    """One rendering of a garment on a body, shared by every identical request."""
+    
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('processing', 'Processing'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=primary_key, editable=False)
+    content_hash = models.CharField(max_length=64, unique=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    
+    # Snapshot of the hashed inputs, so the render matches the hash
+    inputs = models.JSONField(default=dict)
+    result = models.CharField(max_length=255, blank=True)  # Storage name of the rendered image
+    error = models.TextField(blank=True)
+    timings = models.JSONField(default=dict, blank=True)  # Stage name -> milliseconds
+    attempts = models.PositiveIntegerField(default=0)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    queued_at = models.DateTimeField(null=True, blank=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        db_table = 'tryon_jobs'
+        verbose_name = 'Try-On Job'
+        verbose_name_plural = 'Try-On Jobs'
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.content_hash[:12]} ({self.status})"
+
+
+class TryOnSession(models.Model):
+    """A user's request to try a product variant on one of their avatars."""
+    
+    id = models.UUIDField(primary_key=True, default=primary_key, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='tryon_sessions')
+    avatar = models.ForeignKey(
+        UserAvatar, on_delete=models.SET_NULL, null=True, blank=True, related_name='tryon_sessions'
+    )
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='tryon_sessions')
+    variant = models.ForeignKey(ProductVariant, on_delete=models.CASCADE, related_name='tryon_sessions')
+    job = models.ForeignKey(TryOnJob, on_delete=models.PROTECT, related_name='sessions')
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'tryon_sessions'
+        verbose_name = 'Try-On Session'
+        verbose_name_plural = 'Try-On Sessions'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'created_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.user.email} - {self.variant.sku}"
@@ -0,0 +1,55 @@
+"""
+Serializers for virtual try-on.
+"""
+from django.core.files.storage import default_storage
+from rest_framework import serializers
+
+from apps.products.models import ProductVariant
+from apps.users.models import UserAvatar
+from .models import TryOnSession
+
+
+class TryOnSessionSerializer(serializers.ModelSerializer):
+    """Serializer for try-on sessions and the state of their job."""
+
+    status = serializers.CharField(source='job.status', read_only=True)
+    result_url = serializers.SerializerMethodField()
+    timings = serializers.JSONField(source='job.timings', read_only=True)
+
+    class Meta:
+        model = TryOnSession
+        fields = ['id', 'avatar', 'product', 'variant', 'status', 'result_url', 'timings', 'created_at']
+        read_only_fields = fields
+
+    def get_result_url(self, obj):
+        if obj.job.status != 'completed' or not obj.job.result:
+            return None
+        url = default_storage.url(obj.job.result)
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+
+
+class TryOnRequestSerializer(serializers.Serializer):
+    """Serializer for try-on requests; the default avatar is used when none is given."""
+
+    avatar = serializers.PrimaryKeyRelatedField(queryset=UserAvatar.objects.all(), required=False, allow_null=True)
+    variant = serializers.PrimaryKeyRelatedField(
+        queryset=ProductVariant.objects.select_related('product').filter(is_active=True)
+    )
+
+    def validate_avatar(self, value):
+        if value is not None and value.user_id != self.context['request'].user.pk:
+            raise serializers.ValidationError('Avatar not found.')
+        return value
+
+    def validate_variant(self, value):
+        if value.product.status != 'active' or not value.product.is_virtual_tryon_enabled:
+            raise serializers.ValidationError('Virtual try-on is not available for this product.')
+        return value
+
+    def validate(self, attrs):
+        if attrs.get('avatar') is None:
+            attrs['avatar'] = UserAvatar.objects.filter(
+                user=self.context['request'].user, is_default=True
+            ).first()
+        return attrs
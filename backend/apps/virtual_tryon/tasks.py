@@ -0,0 +1,17 @@
+"""
+Celery tasks for virtual try-on.
+"""
+from celery import shared_task
+from django.conf import settings
+
+from . import jobs
+
+# Bounds renders that run inline in a prefork child, where RENDER_TIMEOUT does not
+# apply; pooled renders time out first. Thread pools ignore these limits.
+RENDER_TIMEOUT = settings.VIRTUAL_TRYON['RENDER_TIMEOUT']
+
+
+@shared_task(ignore_result=True, soft_time_limit=RENDER_TIMEOUT + 10, time_limit=RENDER_TIMEOUT + 30)
+def render_tryon(job_id):
+    """Render a queued try-on job (routed to the ``tryon`` queue)."""
+    jobs.run(job_id)
@@ -0,0 +1,11 @@
+"""
+URL patterns for virtual try-on.
+"""
+from django.urls import path
+
+from . import views
+
+urlpatterns = [
+    path('sessions/', views.TryOnSessionListCreateView.as_view(), name='tryon-sessions'),
+    path('sessions/<uuid:pk>/', views.TryOnSessionDetailView.as_view(), name='tryon-session-detail'),
+]
@@ -0,0 +1,48 @@
+"""
+Views for virtual try-on.
+"""
+from rest_framework import generics, permissions, status
+from rest_framework.response import Response
+
+from .jobs import TryOnRejected, submit
+from .models import TryOnSession
+from .serializers import TryOnRequestSerializer, TryOnSessionSerializer
+
+
+class TryOnSessionListCreateView(generics.ListCreateAPIView):
+    """List the current user's try-ons or request a new one."""
+
+    serializer_class = TryOnSessionSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    query_budget = 10
+
+    def get_queryset(self):
+        return TryOnSession.objects.filter(user=self.request.user).select_related('job')
+
+    def create(self, request, *args, **kwargs):
+        serializer = TryOnRequestSerializer(data=request.data, context={'request': request})
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            session, outcome = submit(request.user, **serializer.validated_data)
+        except TryOnRejected as e:
+            return Response(
+                {'detail': str(e)}, status=e.status_code, headers={'Retry-After': str(e.retry_after)}
+            )
+
+        # Rendered results are returned at once; otherwise poll the session
+        data = TryOnSessionSerializer(session, context={'request': request}).data
+        return Response(
+            data, status=status.HTTP_201_CREATED if outcome == 'cached' else status.HTTP_202_ACCEPTED
+        )
+
+
+class TryOnSessionDetailView(generics.RetrieveAPIView):
+    """Get a try-on session and its result."""
+
+    serializer_class = TryOnSessionSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    query_budget = 2
+
+    def get_queryset(self):
+        return TryOnSession.objects.filter(user=self.request.user).select_related('job')
@@ -0,0 +1,191 @@
+"""
+Admin helpers for large tables in EshoTry platform.
+
+``EstimatedCountPaginator`` avoids exact ``COUNT(*)`` scans on big tables.
+Unfiltered changelists use the planner's row estimate (``pg_class.reltuples``,
+summed over partitions). Filtered ones try an exact count under a short
+statement timeout and fall back to the ``EXPLAIN`` estimate. Tables below
+``ESTIMATE_COUNT_ABOVE`` rows are always counted exactly.
+
+``IndexedSearchMixin`` rewrites admin search so that related-field terms
+(``brand__name``, ``product__name``, ``user__email``) are resolved against the
+small or trigram-indexed related table first. The changelist query then
+filters on the foreign key column instead of joining, and every branch of the
+OR can use an index.
+
+``RecentMonthsFilter`` replaces ``date_hierarchy``, whose month links come
+from a ``DISTINCT date_trunc(...)`` over the whole table (every partition of
+a partitioned one), with a fixed list of recent calendar months.
+"""
+import json
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.functional import cached_property
+from django.utils.text import smart_split, unescape_string_literal
+
+
+# Django's search_fields prefixes
+LOOKUP_PREFIXES = {'^': 'istartswith', '=': 'iexact', '@': 'search'}
+
+
+def get_setting(name):
+    return settings.ADMIN_PERFORMANCE[name]
+
+
+def estimated_rows(model, using='default'):
+    """Planner estimate of the rows in ``model``'s table, or ``None`` if unknown."""
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT CASE WHEN c.relkind = 'p' THEN (
+                       SELECT SUM(GREATEST(p.reltuples, 0)) FROM pg_inherits i
+                       JOIN pg_class p ON p.oid = i.inhrelid WHERE i.inhparent = c.oid
+                   ) ELSE c.reltuples END
+            FROM pg_class c WHERE c.oid = to_regclass(%s)
+            """,
+            [model._meta.db_table],
+        )
+        row = cursor.fetchone()
+    # reltuples is -1 until the table has been vacuumed or analyzed
+    if row is None or row[0] is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+def _explain_rows(queryset):
+    plan = json.loads(queryset.explain(format='json'))
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def create_search_indexes(schema_editor, indexes):
+    """
+    Create trigram GIN indexes serving admin ``icontains`` search on PostgreSQL.
+
+    ``indexes`` holds ``(name, table, column)`` tuples. Django compiles
+    ``icontains`` to ``UPPER(column::text) LIKE UPPER(...)``, so the indexes
+    are built on that expression. Servers without the ``pg_trgm`` contrib
+    module are skipped; search then still works, unindexed.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, table, column in indexes:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {schema_editor.quote_name(name)} ON '
+            f'{schema_editor.quote_name(table)} USING gin '
+            f'((UPPER({schema_editor.quote_name(column)}::text)) gin_trgm_ops)'
+        )
+
+
+def drop_search_indexes(schema_editor, indexes):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _, _ in indexes:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {schema_editor.quote_name(name)}')
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that estimates the count of large tables instead of scanning them."""
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        using = queryset.db
+        estimate = estimated_rows(queryset.model, using)
+        if estimate is None or estimate < get_setting('ESTIMATE_COUNT_ABOVE'):
+            return super().count
+        if not queryset.query.where:
+            return estimate
+        try:
+            with transaction.atomic(using=using):
+                with connections[using].cursor() as cursor:
+                    cursor.execute(
+                        'SET LOCAL statement_timeout = %s', [get_setting('COUNT_TIMEOUT_MS')]
+                    )
+                return queryset.count()
+        except DatabaseError:
+            return _explain_rows(queryset)
+
+
+class IndexedSearchMixin:
+    """Admin search that resolves related-field terms to key lists before filtering."""
+
+    def get_search_results(self, request, queryset, search_term):
+        search_fields = self.get_search_fields(request)
+        if not search_fields or not search_term:
+            return super().get_search_results(request, queryset, search_term)
+
+        model = queryset.model
+        limit = get_setting('RELATED_SEARCH_LIMIT')
+        for bit in smart_split(search_term):
+            if bit.startswith(('"', "'")) and bit[0] == bit[-1]:
+                bit = unescape_string_literal(bit)
+            condition = Q()
+            for field in search_fields:
+                lookup = LOOKUP_PREFIXES.get(field[0])
+                if lookup:
+                    field = field[1:]
+                else:
+                    lookup = 'icontains'
+                if '__' not in field:
+                    condition |= Q(**{f'{field}__{lookup}': bit})
+                    continue
+                relation, remote = field.split('__', 1)
+                related = model._meta.get_field(relation).related_model
+                matches = related._default_manager.filter(**{f'{remote}__{lookup}': bit})
+                keys = list(matches.values_list('pk', flat=True)[:limit + 1])
+                if len(keys) > limit:
+                    keys = matches.values('pk')
+                condition |= Q(**{f'{relation}__in': keys})
+            queryset = queryset.filter(condition)
+        return queryset, False
+
+
+class RecentMonthsFilter(admin.SimpleListFilter):
+    """One of the last ``months`` calendar months of ``field``, as a half-open range."""
+
+    title = 'month'
+    parameter_name = 'month'
+    field = 'created_at'
+    months = 12
+
+    def lookups(self, request, model_admin):
+        month = timezone.localdate().replace(day=1)
+        choices = []
+        for _ in range(self.months):
+            choices.append((month.strftime('%Y-%m'), month.strftime('%B %Y')))
+            month = (month - timedelta(days=1)).replace(day=1)
+        return choices
+
+    def queryset(self, request, queryset):
+        if not self.value():
+            return queryset
+        try:
+            start = datetime.strptime(self.value(), '%Y-%m')
+        except ValueError:
+            return queryset.none()
+        end = (start + timedelta(days=32)).replace(day=1)
+        return queryset.filter(**{
+            f'{self.field}__gte': timezone.make_aware(start),
+            f'{self.field}__lt': timezone.make_aware(end),
+        })
+
+
+class LargeTableAdmin(IndexedSearchMixin, admin.ModelAdmin):
+    """ModelAdmin defaults for tables with millions of rows."""
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
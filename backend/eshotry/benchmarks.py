@@ -0,0 +1,373 @@
+"""
+Endpoint benchmark harness for EshoTry platform.
+
+Every named route in the benchmarked URL modules becomes an endpoint. Route
+parameters are filled from the current dataset, and routes that only
+mutate state are skipped. Each endpoint is measured in two ways:
+
+* ``client``: sequential requests through the Django test client, recording
+  latency percentiles, SQL queries per request and memory allocated per
+  request (tracemalloc peak, measured in a separate pass).
+* ``http``: a concurrent load generator against a running server (started
+  with ``runserver`` when no base URL is given), recording latency
+  percentiles, throughput and error counts.
+
+Results are plain JSON so runs can be compared against a stored baseline.
+"""
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timezone as dt_timezone
+from importlib import import_module
+
+from django.conf import settings
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import URLPattern, reverse
+
+URL_MODULES = {
+    'products': 'apps.products.urls',
+    'users': 'apps.users.urls',
+}
+
+# Routes that only change state; benchmarking them would corrupt the dataset
+# or the benchmark user (e.g. token rotation blacklists the refresh token).
+# Bulk exports are admin-only batch jobs rather than request-path endpoints.
+SKIPPED_ROUTES = {
+    'product-export', 'user-register', 'user-logout', 'token-refresh', 'password-change',
+    'toggle-wishlist', 'mark-review-helpful', 'wishlist-detail',
+}
+
+BENCH_EMAIL = 'bench-endpoints@example.com'
+BENCH_PASSWORD = 'bench-endpoints-password'
+
+# Metrics where a higher value is a regression; the rest regress when lower
+HIGHER_IS_WORSE = {'p50_ms', 'p95_ms', 'p99_ms', 'queries', 'alloc_kb', 'errors'}
+COMPARED_METRICS = ('p95_ms', 'queries', 'alloc_kb', 'rps', 'errors')
+# Ignore latency changes smaller than this, whatever the ratio
+LATENCY_FLOOR_MS = 1.0
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(latencies_ms, elapsed=None):
+    summary = {
+        'requests': len(latencies_ms),
+        'p50_ms': percentile(latencies_ms, 0.50),
+        'p95_ms': percentile(latencies_ms, 0.95),
+        'p99_ms': percentile(latencies_ms, 0.99),
+        'mean_ms': statistics.fmean(latencies_ms) if latencies_ms else None,
+    }
+    if elapsed:
+        summary['rps'] = len(latencies_ms) / elapsed
+    return {key: round(value, 3) if isinstance(value, float) else value
+            for key, value in summary.items()}
+
+
+class Fixture:
+    """Benchmark user, auth tokens and route parameters from the dataset."""
+
+    def __init__(self):
+        from rest_framework_simplejwt.tokens import RefreshToken
+
+        from apps.products.models import Brand, Category, Product
+        from apps.users.models import User, UserAddress, UserAvatar
+
+        user = User.objects.filter(email=BENCH_EMAIL).first()
+        if user is None:
+            user = User.objects.create_user(
+                username='bench-endpoints', email=BENCH_EMAIL, password=BENCH_PASSWORD
+            )
+        address = user.addresses.first() or UserAddress.objects.create(
+            user=user, full_name='Bench User', address_line_1='1 Bench Road',
+            city='Dhaka', state='Dhaka', postal_code='1000', country='BD',
+        )
+        avatar = user.avatars.first() or UserAvatar.objects.create(
+            user=user, name='Bench', avatar_data={}, measurements={'chest': 96, 'waist': 80},
+        )
+
+        product = Product.objects.filter(status='active').order_by('-purchase_count').first()
+        if product is None:
+            raise ValueError('No active products; generate a dataset first.')
+        category = (
+            Category.objects.filter(products__status='active').order_by('-products__purchase_count')
+            .first()
+        )
+        brand = Brand.objects.filter(products=product).first()
+
+        self.user = user
+        self.token = str(RefreshToken.for_user(user).access_token)
+        self.params = {
+            'category-detail': {'slug': category.slug},
+            'brand-detail': {'slug': brand.slug},
+            'product-detail': {'slug': product.slug},
+            'product-variants': {'product_slug': product.slug},
+            'product-reviews': {'product_slug': product.slug},
+            'user-address-detail': {'pk': address.pk},
+            'user-avatar-detail': {'pk': avatar.pk},
+        }
+        self.payloads = {
+            'user-login': {'email': BENCH_EMAIL, 'password': BENCH_PASSWORD},
+        }
+        self.methods = {'user-login': 'post'}
+        self.query = {
+            'product-list': {'page_size': 20},
+            'search-suggestions': {'q': product.name.split()[0]},
+        }
+
+    @property
+    def auth_header(self):
+        return f'Bearer {self.token}'
+
+
+class Endpoint:
+    def __init__(self, group, name, path, method='get', payload=None, query=None):
+        self.group = group
+        self.name = name
+        self.path = path
+        self.method = method
+        self.payload = payload
+        self.query = query or {}
+
+    @property
+    def key(self):
+        return f'{self.group}:{self.name}'
+
+
+def discover_endpoints(fixture, groups=None):
+    """Endpoints for every named route in the benchmarked URL modules."""
+    endpoints = []
+    for group, module in URL_MODULES.items():
+        if groups and group not in groups:
+            continue
+        for pattern in import_module(module).urlpatterns:
+            if not isinstance(pattern, URLPattern) or not pattern.name:
+                continue
+            if pattern.name in SKIPPED_ROUTES:
+                continue
+            kwargs = fixture.params.get(pattern.name, {})
+            path = reverse(pattern.name, kwargs=kwargs)
+            endpoints.append(Endpoint(
+                group, pattern.name, path,
+                method=fixture.methods.get(pattern.name, 'get'),
+                payload=fixture.payloads.get(pattern.name),
+                query=fixture.query.get(pattern.name),
+            ))
+    return endpoints
+
+
+def _client_request(client, endpoint):
+    if endpoint.method == 'post':
+        return client.post(endpoint.path, data=endpoint.payload, content_type='application/json')
+    return client.get(endpoint.path, data=endpoint.query)
+
+
+def run_client(endpoint, fixture, iterations=50, warmup=5):
+    """Sequential test-client run: latency, queries and allocations per request."""
+    client = Client(raise_request_exception=False, HTTP_AUTHORIZATION=fixture.auth_header)
+    with override_settings(ALLOWED_HOSTS=['testserver', *settings.ALLOWED_HOSTS]):
+        statuses = set()
+        for _ in range(warmup):
+            statuses.add(_client_request(client, endpoint).status_code)
+
+        latencies = []
+        queries = []
+        errors = 0
+        for _ in range(iterations):
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = _client_request(client, endpoint)
+                latencies.append((time.perf_counter() - started) * 1000)
+            queries.append(len(captured))
+            statuses.add(response.status_code)
+            errors += response.status_code >= 400
+
+        allocations = []
+        tracemalloc.start()
+        try:
+            for _ in range(max(iterations // 5, 3)):
+                tracemalloc.reset_peak()
+                baseline = tracemalloc.get_traced_memory()[0]
+                _client_request(client, endpoint)
+                allocations.append(tracemalloc.get_traced_memory()[1] - baseline)
+        finally:
+            tracemalloc.stop()
+
+    result = summarize(latencies)
+    result.update({
+        'queries': statistics.median(queries),
+        'alloc_kb': round(statistics.median(allocations) / 1024, 1),
+        'errors': errors,
+        'statuses': sorted(statuses),
+    })
+    return result
+
+
+def _http_worker(base_url, endpoint, header, deadline, latencies, errors, lock):
+    import requests
+
+    session = requests.Session()
+    session.headers['Authorization'] = header
+    url = base_url.rstrip('/') + endpoint.path
+    local_latencies = []
+    local_errors = 0
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            if endpoint.method == 'post':
+                response = session.post(url, json=endpoint.payload, timeout=30)
+            else:
+                response = session.get(url, params=endpoint.query, timeout=30)
+            failed = response.status_code >= 400
+        except requests.RequestException:
+            failed = True
+        local_latencies.append((time.perf_counter() - started) * 1000)
+        local_errors += failed
+    with lock:
+        latencies.extend(local_latencies)
+        errors[0] += local_errors
+
+
+def run_http(base_url, endpoint, fixture, concurrency=10, duration=5.0):
+    """Concurrent load against a running server for ``duration`` seconds."""
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    started = time.perf_counter()
+    deadline = started + duration
+    threads = [
+        threading.Thread(
+            target=_http_worker,
+            args=(base_url, endpoint, fixture.auth_header, deadline, latencies, errors, lock),
+        )
+        for _ in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    result = summarize(latencies, time.perf_counter() - started)
+    result['errors'] = errors[0]
+    result['concurrency'] = concurrency
+    return result
+
+
+class Server:
+    """``runserver`` subprocess on a free local port; entering yields its base URL."""
+
+    def __init__(self):
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            self.port = sock.getsockname()[1]
+        self.process = None
+
+    @property
+    def base_url(self):
+        return f'http://127.0.0.1:{self.port}'
+
+    def __enter__(self):
+        manage = os.path.join(settings.BASE_DIR, 'manage.py')
+        self.process = subprocess.Popen(
+            [sys.executable, manage, 'runserver', '--noreload', f'127.0.0.1:{self.port}'],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=os.environ.copy(),
+        )
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            try:
+                socket.create_connection(('127.0.0.1', self.port), timeout=0.5).close()
+                return self.base_url
+            except OSError:
+                if self.process.poll() is not None:
+                    break
+                time.sleep(0.2)
+        self.__exit__()
+        raise RuntimeError('Benchmark server did not start.')
+
+    def __exit__(self, *exc):
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            self.process.wait(timeout=10)
+
+
+def dataset_summary():
+    from apps.orders.models import Order
+    from apps.products.models import Product, ProductReview
+    from apps.users.models import User
+
+    return {
+        'products': Product.objects.count(),
+        'users': User.objects.count(),
+        'reviews': ProductReview.objects.count(),
+        'orders': Order.objects.count(),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, timeout=5,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def metadata():
+    return {
+        'timestamp': datetime.now(dt_timezone.utc).isoformat(),
+        'revision': git_revision(),
+        'database': connection.vendor,
+        'debug': settings.DEBUG,
+        'python': platform.python_version(),
+        'dataset': dataset_summary(),
+    }
+
+
+def compare(results, baseline, threshold=0.25):
+    """List regressions of ``results`` against ``baseline`` beyond ``threshold``."""
+    regressions = []
+    for key, modes in results['endpoints'].items():
+        for mode, metrics in modes.items():
+            previous = baseline.get('endpoints', {}).get(key, {}).get(mode)
+            if not previous:
+                continue
+            for metric in COMPARED_METRICS:
+                old, new = previous.get(metric), metrics.get(metric)
+                if old is None or new is None:
+                    continue
+                if metric in HIGHER_IS_WORSE:
+                    limit = old * (1 + threshold)
+                    if metric.endswith('_ms'):
+                        limit = max(limit, old + LATENCY_FLOOR_MS)
+                    elif metric in ('queries', 'errors'):
+                        limit = max(limit, old)
+                    regressed = new > limit
+                else:
+                    regressed = new < old * (1 - threshold)
+                if regressed:
+                    regressions.append(f'{key} [{mode}] {metric}: {old} -> {new}')
+    return regressions
+
+
+def load_results(path):
+    with open(path) as handle:
+        return json.load(handle)
+
+
+def save_results(path, results):
+    with open(path, 'w') as handle:
+        json.dump(results, handle, indent=2, sort_keys=True, default=str)
@@ -0,0 +1,31 @@
+"""
+Shared cache version counters.
+
+In-process tables (compiled coupons, shipping rates, ...) are tagged with a
+version number kept in the default cache. Writers bump the version of a
+namespace once per change set; readers compare their tag to the shared value
+and rebuild when it moved.
+"""
+from django.core.cache import cache
+
+
+def _key(namespace):
+    return f'{namespace}:version'
+
+
+def get_version(namespace):
+    """Return the current version of ``namespace``, initialising it if needed."""
+    version = cache.get(_key(namespace))
+    if version is None:
+        cache.add(_key(namespace), 1, timeout=None)
+        version = cache.get(_key(namespace), 1)
+    return version
+
+
+def bump_version(namespace):
+    """Invalidate everything tagged with the current version of ``namespace``."""
+    try:
+        return cache.incr(_key(namespace))
+    except ValueError:
+        cache.add(_key(namespace), 1, timeout=None)
+        return cache.incr(_key(namespace))
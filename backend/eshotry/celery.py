@@ -4,6 +4,8 @@ Celery configuration for EshoTry project.
 import os
 from celery import Celery
 
+from eshotry.metrics import connect_celery_signals
+
 # Set the default Django settings module for the 'celery' program.
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'eshotry.settings')
 
@@ -16,6 +18,9 @@ app.config_from_object('django.conf:settings', namespace='CELERY')
 # Load task modules from all registered Django apps.
 app.autodiscover_tasks()
 
+# Task durations for the Prometheus metrics endpoint.
+connect_celery_signals()
+
 
 @app.task(bind=True)
 def debug_task(self):
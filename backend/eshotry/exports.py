@@ -0,0 +1,191 @@
+"""
+Streaming CSV / JSON Lines export helpers for EshoTry platform.
+
+Exports are described by a header and an iterable of row tuples (normally a
+``values_list(...).iterator(chunk_size=...)`` server-side cursor). Rows are
+encoded lazily and grouped into ~64KB chunks, so memory use does not depend
+on the number of rows whether the output goes to a ``StreamingHttpResponse``
+or to a (gzip) file.
+"""
+import csv
+import datetime
+import gzip
+import json
+import zlib
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import CharField
+from django.db.models.functions import Cast
+from django.http import StreamingHttpResponse
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils import timezone
+
+CHUNK_BYTES = 64 * 1024
+ITERATOR_CHUNK_SIZE = 2000
+
+CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+}
+
+
+def as_text(lookup):
+    """Select a UUID column as text, skipping the UUID round trip in Python."""
+    return Cast(lookup, output_field=CharField())
+
+
+class ExportError(ValueError):
+    """Raised for invalid export parameters."""
+
+
+class _ExportEncoder(DjangoJSONEncoder):
+    """Keep full datetime precision so watermarks round-trip exactly."""
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+class _Echo:
+    """File-like object whose ``write`` returns the value written."""
+
+    def write(self, value):
+        return value
+
+
+def _json_value(value):
+    return json.dumps(value, cls=_ExportEncoder)
+
+
+# csv.writer already renders None as '' and str()s numbers, Decimals and UUIDs
+_CSV_CONVERTERS = {
+    datetime.datetime: datetime.datetime.isoformat,
+    datetime.date: datetime.date.isoformat,
+    dict: _json_value,
+    list: _json_value,
+}
+
+
+def csv_lines(header, rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(header)
+
+    # Column types are stable, so pick each column's converter from its first
+    # non-null value instead of type-checking every cell.
+    converters = {}
+    unknown = set(range(len(header)))
+    for row in rows:
+        if unknown:
+            for index in list(unknown):
+                value = row[index]
+                if value is not None:
+                    unknown.discard(index)
+                    converter = _CSV_CONVERTERS.get(type(value))
+                    if converter:
+                        converters[index] = converter
+        if converters:
+            row = list(row)
+            for index, converter in converters.items():
+                value = row[index]
+                if value is not None:
+                    row[index] = converter(value)
+        yield writer.writerow(row)
+
+
+def jsonl_lines(header, rows):
+    encoder = _ExportEncoder(separators=(',', ':'))
+    for row in rows:
+        yield encoder.encode(dict(zip(header, row))) + '\n'
+
+
+def encode_rows(header, rows, file_format):
+    """Yield the export as UTF-8 byte chunks of roughly ``CHUNK_BYTES``."""
+    if file_format == 'csv':
+        lines = csv_lines(header, rows)
+    elif file_format == 'jsonl':
+        lines = jsonl_lines(header, rows)
+    else:
+        raise ExportError(f'Unsupported export format: {file_format}')
+
+    buffer = []
+    size = 0
+    for line in lines:
+        buffer.append(line)
+        size += len(line)
+        if size >= CHUNK_BYTES:
+            yield ''.join(buffer).encode('utf-8')
+            buffer = []
+            size = 0
+    if buffer:
+        yield ''.join(buffer).encode('utf-8')
+
+
+def gzip_chunks(chunks, level=6):
+    """Compress a byte chunk stream into a gzip stream."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_response(filename, header, rows, file_format='csv', compress=False):
+    """Stream an export as a file download."""
+    if file_format not in CONTENT_TYPES:
+        raise ExportError(f'Unsupported export format: {file_format}')
+    chunks = encode_rows(header, rows, file_format)
+    filename = f'{filename}.{file_format}'
+    content_type = CONTENT_TYPES[file_format]
+    if compress:
+        chunks = gzip_chunks(chunks)
+        filename += '.gz'
+        content_type = 'application/gzip'
+
+    response = StreamingHttpResponse(chunks, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def export_to_file(path, header, rows, file_format='csv'):
+    """Write an export to ``path``, gzip-compressed when it ends in ``.gz``."""
+    path = str(path)
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'wb') as handle:
+        for chunk in encode_rows(header, rows, file_format):
+            handle.write(chunk)
+
+
+def parse_watermark(value):
+    """Parse an ISO 8601 date or datetime into an aware datetime."""
+    if not value:
+        return None
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise ExportError(f'Invalid date or datetime: {value}')
+        parsed = datetime.datetime.combine(day, datetime.time.min)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed, datetime.timezone.utc)
+    return parsed
+
+
+class Watermark:
+    """Track the highest ``updated_at`` seen while rows stream past."""
+
+    def __init__(self, rows, columns):
+        self.rows = rows
+        self.columns = columns
+        self.value = None
+        self.count = 0
+
+    def __iter__(self):
+        for row in self.rows:
+            self.count += 1
+            for index in self.columns:
+                value = row[index]
+                if value is not None and (self.value is None or value > self.value):
+                    self.value = value
+            yield row
@@ -0,0 +1,158 @@
+"""
+Identifier generation for EshoTry platform.
+
+Primary keys default to time-ordered UUIDv7 values so new rows land at the
+right-hand edge of B-tree indexes instead of scattering across them. Order
+numbers are Snowflake-style: a millisecond timestamp, a worker id and a
+per-worker sequence packed into 63 bits and rendered in Crockford base32.
+
+Both generators are pluggable through ``ID_GENERATORS`` in settings.
+"""
+import os
+import secrets
+import socket
+import threading
+import time
+import uuid
+import zlib
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+# 2024-01-01T00:00:00Z, keeps Snowflake ids short for the next ~69 years
+SNOWFLAKE_EPOCH_MS = 1704067200000
+
+WORKER_ID_BITS = 10
+SEQUENCE_BITS = 12
+MAX_WORKER_ID = (1 << WORKER_ID_BITS) - 1
+MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+
+CROCKFORD_ALPHABET = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+
+
+class UUID7Generator:
+    """Monotonic UUIDv7 generator (RFC 9562) safe to share between threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._last_ms = 0
+        self._counter = 0
+
+    def __call__(self):
+        with self._lock:
+            now_ms = time.time_ns() // 1_000_000
+            if now_ms > self._last_ms:
+                self._last_ms = now_ms
+                # Leave headroom in the 12-bit counter for ids within the same ms
+                self._counter = secrets.randbits(11)
+            else:
+                self._counter += 1
+                if self._counter > 0xFFF:
+                    self._last_ms += 1
+                    self._counter = 0
+            timestamp, counter = self._last_ms, self._counter
+
+        value = (timestamp & 0xFFFFFFFFFFFF) << 80
+        value |= 0x7 << 76
+        value |= counter << 64
+        value |= 0b10 << 62
+        value |= secrets.randbits(62)
+        return uuid.UUID(int=value)
+
+
+class SnowflakeGenerator:
+    """Monotonic 63-bit ids: 41 bits of ms timestamp, worker id, sequence."""
+
+    def __init__(self, worker_id):
+        if not 0 <= worker_id <= MAX_WORKER_ID:
+            raise ValueError(f"worker_id must be between 0 and {MAX_WORKER_ID}")
+        self.worker_id = worker_id
+        self._lock = threading.Lock()
+        self._last_ms = -1
+        self._sequence = 0
+
+    def next_id(self):
+        with self._lock:
+            now_ms = time.time_ns() // 1_000_000 - SNOWFLAKE_EPOCH_MS
+            if now_ms < self._last_ms:
+                # Clock moved backwards; keep counting from the last timestamp
+                now_ms = self._last_ms
+            if now_ms == self._last_ms:
+                self._sequence = (self._sequence + 1) & MAX_SEQUENCE
+                if self._sequence == 0:
+                    while now_ms <= self._last_ms:
+                        now_ms = time.time_ns() // 1_000_000 - SNOWFLAKE_EPOCH_MS
+            else:
+                self._sequence = 0
+            self._last_ms = now_ms
+
+            return (
+                (now_ms << (WORKER_ID_BITS + SEQUENCE_BITS))
+                | (self.worker_id << SEQUENCE_BITS)
+                | self._sequence
+            )
+
+    __call__ = next_id
+
+
+def encode_base32(value, length=13):
+    """Encode a non-negative integer as fixed-width Crockford base32."""
+    chars = []
+    for _ in range(length):
+        value, remainder = divmod(value, 32)
+        chars.append(CROCKFORD_ALPHABET[remainder])
+    return ''.join(reversed(chars))
+
+
+def default_worker_id():
+    """
+    Worker id from ``ID_GENERATORS['WORKER_ID']``, falling back to a hash of
+    the hostname and pid so preforked workers on one host rarely collide.
+    """
+    configured = _id_settings().get('WORKER_ID')
+    if configured not in (None, ''):
+        return int(configured)
+    seed = f"{socket.gethostname()}:{os.getpid()}".encode()
+    return zlib.crc32(seed) & MAX_WORKER_ID
+
+
+def _id_settings():
+    return getattr(settings, 'ID_GENERATORS', {})
+
+
+uuid7 = UUID7Generator()
+
+_snowflake = None
+_snowflake_pid = None
+
+
+def snowflake_id():
+    """Next Snowflake id for this process, re-seeded after fork."""
+    global _snowflake, _snowflake_pid
+    pid = os.getpid()
+    if _snowflake is None or _snowflake_pid != pid:
+        _snowflake = SnowflakeGenerator(default_worker_id())
+        _snowflake_pid = pid
+    return _snowflake.next_id()
+
+
+def snowflake_order_number():
+    """Human-friendly, time-sortable order number such as ``ET0B8Z4Q7M1K2X9``."""
+    prefix = _id_settings().get('ORDER_NUMBER_PREFIX', 'ET')
+    return f"{prefix}{encode_base32(snowflake_id())}"
+
+
+@lru_cache(maxsize=None)
+def _generator(name, default):
+    return import_string(_id_settings().get(name, default))
+
+
+def primary_key():
+    """Default for model primary keys."""
+    return _generator('PRIMARY_KEY', 'eshotry.ids.uuid7')()
+
+
+def order_number():
+    """Default generator for ``Order.order_number``."""
+    return _generator('ORDER_NUMBER', 'eshotry.ids.snowflake_order_number')()
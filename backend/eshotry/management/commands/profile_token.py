@@ -0,0 +1,22 @@
+"""
+Issue a signed token that enables ?__profile on any request.
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from eshotry.profiling import TOKEN_PARAM, make_token
+
+
+class Command(BaseCommand):
+    help = 'Print a signed profiling token for non-staff clients (e.g. load tests).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--label', default='profile', help='Recorded in the token for auditing')
+
+    def handle(self, *args, **options):
+        token = make_token(options['label'])
+        self.stdout.write(f'?__profile=1&{TOKEN_PARAM}={token}')
+        self.stdout.write(
+            f"Valid for {settings.PROFILING['TOKEN_MAX_AGE']}s; profiles are stored in "
+            f"{settings.PROFILING['ROOT']}"
+        )
@@ -0,0 +1,134 @@
+"""
+Media delivery for EshoTry platform.
+
+``serve_media`` resolves and authorizes a ``MEDIA_URL`` path, sets the cache
+headers and leaves the byte transfer to whatever is cheapest for
+``MEDIA_SERVING['MODE']``:
+
+* ``accel``: an empty response with ``X-Accel-Redirect`` pointing at an
+  ``internal`` nginx location (``ACCEL_PREFIX``) that aliases ``MEDIA_ROOT``;
+* ``sendfile``: an ``X-Sendfile`` header with the absolute path (Apache
+  mod_xsendfile, lighttpd);
+* ``django``: a ``FileResponse``. WSGI servers that implement
+  ``wsgi.file_wrapper`` (gunicorn, uWSGI) send it with ``sendfile(2)``.
+
+Renditions are stored under their content hash and never change, so they
+are cached for a year as ``immutable``. Other uploads get ``MAX_AGE`` and an
+ETag. Paths under ``PRIVATE_PREFIXES`` are only served to an authenticated
+user (session or JWT) that the prefix's check function lets read the file,
+and are only cached privately.
+"""
+import mimetypes
+import os
+import posixpath
+from functools import lru_cache
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.http import http_date, quote_etag
+from django.utils.module_loading import import_string
+from django.views.decorators.http import require_safe
+
+IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+
+
+def get_setting(name):
+    return settings.MEDIA_SERVING[name]
+
+
+def _user(request):
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return user
+    from rest_framework.exceptions import AuthenticationFailed
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+
+    try:
+        authenticated = JWTAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return None
+    return authenticated[0] if authenticated else None
+
+
+def _is_private(path):
+    return path.startswith(tuple(get_setting('PRIVATE_PREFIXES')))
+
+
+@lru_cache(maxsize=None)
+def _check(dotted_path):
+    return import_string(dotted_path)
+
+
+def _may_read(request, path):
+    user = _user(request)
+    if user is None:
+        return False
+    return all(
+        _check(dotted_path)(user, path)
+        for prefix, dotted_path in get_setting('PRIVATE_PREFIXES').items()
+        if path.startswith(prefix)
+    )
+
+
+def _is_immutable(path):
+    return path.startswith(settings.IMAGE_RENDITIONS['ROOT'] + '/')
+
+
+def _etag(path, stat):
+    if _is_immutable(path):
+        # renditions/ab/<sha256>/320.webp
+        return quote_etag(path.split('/')[2] + '-' + posixpath.basename(path))
+    return quote_etag(f'{stat.st_mtime_ns:x}-{stat.st_size:x}')
+
+
+def _cache_control(path):
+    if _is_private(path):
+        return f"private, max-age={get_setting('MAX_AGE')}"
+    if _is_immutable(path):
+        return f'public, max-age={IMMUTABLE_MAX_AGE}, immutable'
+    return f"public, max-age={get_setting('MAX_AGE')}"
+
+
+@require_safe
+def serve_media(request, path):
+    """Serve ``MEDIA_ROOT/path`` through the proxy or ``sendfile``."""
+    path = posixpath.normpath(path).lstrip('/')
+    if path.startswith('..') or not path or path == '.':
+        raise Http404
+    if _is_private(path) and not _may_read(request, path):
+        # Do not reveal whether a private file exists
+        raise Http404
+    try:
+        fullpath = safe_join(settings.MEDIA_ROOT, path)
+        stat = os.stat(fullpath)
+    except (OSError, ValueError):
+        raise Http404
+    if not os.path.isfile(fullpath):
+        raise Http404
+
+    etag = _etag(path, stat)
+    if etag in request.headers.get('If-None-Match', ''):
+        response = HttpResponseNotModified()
+    else:
+        mode = get_setting('MODE')
+        content_type, encoding = mimetypes.guess_type(fullpath)
+        content_type = content_type or 'application/octet-stream'
+        if mode == 'accel':
+            response = HttpResponse(content_type=content_type)
+            response['X-Accel-Redirect'] = quote(get_setting('ACCEL_PREFIX').rstrip('/') + '/' + path)
+        elif mode == 'sendfile':
+            response = HttpResponse(content_type=content_type)
+            response['X-Sendfile'] = fullpath
+        else:
+            response = FileResponse(open(fullpath, 'rb'), content_type=content_type)
+        if encoding:
+            response['Content-Encoding'] = encoding
+        response['Last-Modified'] = http_date(stat.st_mtime)
+
+    response['ETag'] = etag
+    response['Cache-Control'] = _cache_control(path)
+    if _is_private(path):
+        response['Vary'] = 'Cookie, Authorization'
+    return response
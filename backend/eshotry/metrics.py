@@ -0,0 +1,213 @@
+"""
+Prometheus metrics for EshoTry platform.
+
+Metrics live in the ``prometheus_client`` default registry. Under a preforking
+server set ``PROMETHEUS_MULTIPROC_DIR`` to an empty, writable directory before
+the workers start: every process then writes its samples to memory-mapped
+files there and ``/metrics`` aggregates them. The server should also call
+``mark_process_dead(pid)`` when a worker exits (gunicorn's ``child_exit``
+hook) so the gauges of dead workers are dropped.
+
+Celery queue depth is read from the broker at scrape time.
+
+``/metrics`` requires ``METRICS_TOKEN`` as a bearer token when it is set.
+Without one it only answers clients in ``METRICS_INTERNAL_NETWORKS``, or
+anyone when ``DEBUG`` is on.
+"""
+import ipaddress
+import os
+import time
+from contextlib import ExitStack
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import GaugeMetricFamily
+
+REQUEST_LATENCY = Histogram(
+    'eshotry_http_request_duration_seconds', 'Request latency by URL name.',
+    ['view', 'method', 'status'],
+)
+REQUEST_QUERIES = Histogram(
+    'eshotry_http_request_db_queries', 'SQL queries per request by URL name.',
+    ['view'], buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500),
+)
+REQUEST_DB_SECONDS = Counter(
+    'eshotry_http_request_db_seconds', 'Time spent in SQL by URL name.', ['view'],
+)
+DB_CONNECT_SECONDS = Histogram(
+    'eshotry_db_connection_wait_seconds', 'Time to open a database connection.',
+    ['alias'], buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+CACHE_REQUESTS = Counter(
+    'eshotry_cache_requests', 'Cache lookups by namespace and result.', ['namespace', 'result'],
+)
+PERSONALIZATION_REQUESTS = Counter(
+    'eshotry_personalization_requests', 'Listing pages by personalization outcome.', ['result'],
+)
+TRYON_REQUESTS = Counter(
+    'eshotry_tryon_requests', 'Try-on requests and jobs by outcome.', ['result'],
+)
+TRYON_STAGE_SECONDS = Histogram(
+    'eshotry_tryon_stage_seconds', 'Try-on job time by stage (queue, renderer stages, store).',
+    ['stage'], buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+TASK_DURATION = Histogram(
+    'eshotry_celery_task_duration_seconds', 'Celery task run time.', ['task', 'state'],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300, 900),
+)
+
+
+def record_cache(namespace, hit):
+    """Count a lookup in an in-process or shared cache namespace."""
+    CACHE_REQUESTS.labels(namespace, 'hit' if hit else 'miss').inc()
+
+
+def mark_process_dead(pid):
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        multiprocess.mark_process_dead(pid)
+
+
+class QueryCounter:
+    """Execute wrapper counting queries and their time."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+
+
+def install_hooks():
+    """Time new database connections; safe to call more than once."""
+    from django.db.backends.base.base import BaseDatabaseWrapper
+
+    connect = BaseDatabaseWrapper.connect
+    if getattr(connect, 'metrics_hook', False):
+        return
+
+    def timed_connect(self):
+        started = time.perf_counter()
+        try:
+            return connect(self)
+        finally:
+            DB_CONNECT_SECONDS.labels(self.alias).observe(time.perf_counter() - started)
+
+    timed_connect.metrics_hook = True
+    BaseDatabaseWrapper.connect = timed_connect
+
+
+class MetricsMiddleware:
+    """Record latency and SQL usage of every request, labelled by URL name."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        install_hooks()
+
+    def __call__(self, request):
+        counter = QueryCounter()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+
+        match = request.resolver_match
+        # Unresolved paths share one label to keep cardinality bounded
+        view = match.view_name if match and match.view_name else 'unresolved'
+        REQUEST_LATENCY.labels(view, request.method, f'{response.status_code // 100}xx').observe(elapsed)
+        REQUEST_QUERIES.labels(view).observe(counter.count)
+        REQUEST_DB_SECONDS.labels(view).inc(counter.duration)
+        return response
+
+
+def connect_celery_signals():
+    """Observe task run times from the worker's prerun/postrun signals."""
+    from celery.signals import task_postrun, task_prerun
+
+    started = {}
+
+    @task_prerun.connect(weak=False)
+    def _task_started(task_id=None, **kwargs):
+        started[task_id] = time.perf_counter()
+
+    @task_postrun.connect(weak=False)
+    def _task_finished(task_id=None, task=None, state=None, **kwargs):
+        begun = started.pop(task_id, None)
+        if begun is not None:
+            TASK_DURATION.labels(task.name, state or 'UNKNOWN').observe(time.perf_counter() - begun)
+
+
+class QueueDepthCollector:
+    """Length of each Celery queue in the Redis broker, read at scrape time."""
+
+    def __init__(self, broker_url, queues):
+        self.broker_url = broker_url
+        self.queues = queues
+
+    def collect(self):
+        import redis
+
+        depth = GaugeMetricFamily(
+            'eshotry_celery_queue_depth', 'Messages waiting in each Celery queue.', labels=['queue'],
+        )
+        up = GaugeMetricFamily('eshotry_celery_broker_up', 'Whether the broker answered the scrape.')
+        if urlparse(self.broker_url).scheme not in ('redis', 'rediss'):
+            return
+        try:
+            client = redis.Redis.from_url(
+                self.broker_url, socket_timeout=0.5, socket_connect_timeout=0.5
+            )
+            for queue in self.queues:
+                depth.add_metric([queue], client.llen(queue))
+            up.add_metric([], 1)
+        except redis.RedisError:
+            up.add_metric([], 0)
+        yield depth
+        yield up
+
+
+def _internal_client(request):
+    try:
+        address = ipaddress.ip_address(request.META.get('REMOTE_ADDR', ''))
+    except ValueError:
+        return False
+    return any(
+        address in ipaddress.ip_network(network, strict=False)
+        for network in settings.METRICS['INTERNAL_NETWORKS']
+    )
+
+
+def metrics_view(request):
+    """Prometheus text exposition for a bearer token holder or an internal client."""
+    token = settings.METRICS['TOKEN']
+    if token:
+        if not constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+            return HttpResponseForbidden()
+    elif not settings.DEBUG and not _internal_client(request):
+        return HttpResponseForbidden()
+
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    scrape = CollectorRegistry(auto_describe=False)
+    scrape.register(QueueDepthCollector(settings.CELERY_BROKER_URL, settings.METRICS['CELERY_QUEUES']))
+
+    return HttpResponse(
+        generate_latest(registry) + generate_latest(scrape), content_type=CONTENT_TYPE_LATEST
+    )
@@ -0,0 +1,71 @@
+"""
+Integer-cents money arithmetic.
+
+Amounts are stored as ``DecimalField(decimal_places=2)`` but pricing loops
+work on plain ``int`` minor units: convert once when a value leaves the
+database, do the arithmetic on ints, convert back once at the model or
+serializer boundary. All rounding happens in this module:
+
+* ``to_cents``, ``multiply`` and ``percent_of`` round half up (commercial
+  rounding) to whole cents.
+* ``percent_off`` rounds half to even to a whole percent, matching
+  ``round()`` on the ``Decimal`` values it replaces.
+"""
+from decimal import ROUND_HALF_UP, Decimal
+
+HUNDRED = Decimal(100)
+
+
+def to_cents(amount):
+    """Convert a ``Decimal``/``int``/``str``/``float`` amount to integer cents."""
+    if amount is None:
+        return None
+    if isinstance(amount, int):
+        return amount * 100
+    if not isinstance(amount, Decimal):
+        amount = Decimal(str(amount))
+    cents = amount * HUNDRED
+    if cents == cents.to_integral_value():
+        return int(cents)
+    return int(cents.to_integral_value(rounding=ROUND_HALF_UP))
+
+
+def from_cents(cents):
+    """Convert integer cents to a two-place ``Decimal`` for the DB or API."""
+    if cents is None:
+        return None
+    return Decimal(cents).scaleb(-2)
+
+
+def format_cents(cents):
+    """Render integer cents as a plain ``'12.34'`` string."""
+    if cents < 0:
+        return '-' + format_cents(-cents)
+    return '%d.%02d' % divmod(cents, 100)
+
+
+def multiply(cents, factor):
+    """``cents`` times a quantity or weight, rounded half up to whole cents."""
+    if isinstance(factor, int):
+        return cents * factor
+    return to_cents(from_cents(cents) * Decimal(str(factor)))
+
+
+def percent_of(cents, percent):
+    """``percent`` (int, Decimal or str) of ``cents``, rounded half up."""
+    numerator = to_cents(percent) * cents
+    units, remainder = divmod(numerator, 10000)
+    if remainder * 2 >= 10000:
+        units += 1
+    return units
+
+
+def percent_off(base_cents, sale_cents):
+    """Whole-percent discount from ``base_cents`` to ``sale_cents``."""
+    if not base_cents:
+        return 0
+    percent, remainder = divmod((base_cents - sale_cents) * 100, base_cents)
+    twice = remainder * 2
+    if twice > base_cents or (twice == base_cents and percent % 2):
+        percent += 1
+    return percent
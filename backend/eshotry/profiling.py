@@ -0,0 +1,224 @@
+"""
+On-demand request profiling for EshoTry platform.
+
+A profiled request runs with a background thread that samples the request
+thread's stack every ``INTERVAL_MS`` and an execute wrapper that records
+every SQL statement. The samples are written in the collapsed-stack format
+read by flamegraph.pl and speedscope (``frame;frame;frame count``), next to
+a JSON file with the request metadata and the SQL list, both keyed by a
+profile id generated on the server:
+
+* ``?__profile=1`` stores the profile and returns its id in ``X-Profile-Id``;
+* ``?__profile=collapsed`` returns the collapsed stacks instead of the response.
+
+Any other ``__profile`` value is ignored. Only staff users (session or JWT)
+or holders of a signed profiling token (``?__profile_token=``, see
+``make_token`` and the ``profile_token`` command) can ask for a profile. With
+``SAMPLE_EVERY`` set to N, one in N requests is also profiled into the store,
+which keeps the newest ``MAX_PROFILES`` profiles.
+"""
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.core import signing
+from django.db import connections
+from django.http import HttpResponse
+
+from eshotry.ids import uuid7
+
+TOKEN_SALT = 'eshotry.profiling'
+PROFILE_PARAM = '__profile'
+TOKEN_PARAM = '__profile_token'
+PROFILE_MODES = ('1', 'collapsed')
+
+
+def get_setting(name):
+    return settings.PROFILING[name]
+
+
+def make_token(label='profile'):
+    """Signed token authorising ``?__profile`` for ``TOKEN_MAX_AGE`` seconds."""
+    return signing.dumps({'label': label}, salt=TOKEN_SALT)
+
+
+def _token_valid(token):
+    try:
+        signing.loads(token, salt=TOKEN_SALT, max_age=get_setting('TOKEN_MAX_AGE'))
+    except signing.BadSignature:
+        return False
+    return True
+
+
+def _is_staff(request):
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return user.is_staff
+    from rest_framework.exceptions import AuthenticationFailed
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+
+    try:
+        authenticated = JWTAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return False
+    return bool(authenticated and authenticated[0].is_staff)
+
+
+def authorized(request):
+    token = request.GET.get(TOKEN_PARAM)
+    if token:
+        return _token_valid(token)
+    return _is_staff(request)
+
+
+class StackSampler(threading.Thread):
+    """Sample one thread's Python stack at a fixed interval into collapsed stacks."""
+
+    def __init__(self, thread_id, interval):
+        super().__init__(name='eshotry-profiler', daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._done = threading.Event()
+        self._labels = {}
+        self._root = str(settings.BASE_DIR) + os.sep
+
+    def _label(self, code):
+        label = self._labels.get(code)
+        if label is None:
+            filename = code.co_filename
+            if filename.startswith(self._root):
+                filename = filename[len(self._root):]
+            elif 'site-packages' in filename:
+                filename = filename.split('site-packages' + os.sep, 1)[1]
+            name = getattr(code, 'co_qualname', code.co_name)
+            label = f'{name} ({filename}:{code.co_firstlineno})'.replace(';', ':')
+            self._labels[code] = label
+        return label
+
+    def run(self):
+        while not self._done.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(self._label(frame.f_code))
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(stack))] += 1
+            self.samples += 1
+
+    def stop(self):
+        self._done.set()
+        self.join()
+
+    def collapsed(self):
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+
+class SQLRecorder:
+    """Execute wrapper keeping every statement with its duration."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'sql': sql,
+                'time_ms': round((time.perf_counter() - started) * 1000, 3),
+                'many': many,
+            })
+
+
+def _prune(root, keep):
+    profiles = sorted(
+        (entry for entry in os.scandir(root) if entry.name.endswith('.json')),
+        key=lambda entry: entry.stat().st_mtime,
+    )
+    for entry in profiles[:max(len(profiles) - keep, 0)]:
+        request_id = entry.name[:-len('.json')]
+        for suffix in ('.json', '.collapsed'):
+            try:
+                os.remove(os.path.join(root, request_id + suffix))
+            except FileNotFoundError:
+                pass
+
+
+def store(request_id, collapsed, meta):
+    """Write a profile to the rolling store and drop the oldest beyond ``MAX_PROFILES``."""
+    root = get_setting('ROOT')
+    os.makedirs(root, exist_ok=True)
+    for suffix, content in (('.collapsed', collapsed), ('.json', json.dumps(meta, indent=1))):
+        path = os.path.join(root, request_id + suffix)
+        with open(path + '.tmp', 'w') as handle:
+            handle.write(content)
+        os.replace(path + '.tmp', path)
+    _prune(root, get_setting('MAX_PROFILES'))
+
+
+class ProfilingMiddleware:
+    """Profile requests that ask for it (if authorised) and a 1-in-N sample."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        mode = request.GET.get(PROFILE_PARAM)
+        if mode in PROFILE_MODES and authorized(request):
+            return self._profile(request, mode)
+        every = get_setting('SAMPLE_EVERY')
+        if every and random.randrange(every) == 0:
+            return self._profile(request, None)
+        return self.get_response(request)
+
+    def _profile(self, request, mode):
+        # Never a client-supplied id: it names the files in the store
+        request_id = str(uuid7())
+
+        sampler = StackSampler(threading.get_ident(), get_setting('INTERVAL_MS') / 1000)
+        recorder = SQLRecorder()
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(recorder))
+                response = self.get_response(request)
+        finally:
+            sampler.stop()
+        elapsed = time.perf_counter() - started
+
+        collapsed = sampler.collapsed()
+        match = request.resolver_match
+        meta = {
+            'request_id': request_id,
+            'method': request.method,
+            'path': request.path,
+            'query': {key: value for key, value in request.GET.items() if key != TOKEN_PARAM},
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+            'duration_ms': round(elapsed * 1000, 2),
+            'samples': sampler.samples,
+            'interval_ms': get_setting('INTERVAL_MS'),
+            'profiled_at': datetime.now(dt_timezone.utc).isoformat(),
+            'sql': recorder.queries,
+        }
+        store(request_id, collapsed, meta)
+
+        if mode == 'collapsed':
+            response = HttpResponse(collapsed, content_type='text/plain; charset=utf-8')
+        if mode:
+            response['X-Profile-Id'] = request_id
+        return response
@@ -0,0 +1,227 @@
+"""
+Per-request SQL inspection for EshoTry platform.
+
+Executed SQL is grouped by normalized shape (literals, placeholders and IN
+lists collapsed), so ``SELECT ... WHERE product_id = 1`` and ``... = 2`` count
+as one shape. A shape repeated ``REPEAT_THRESHOLD`` times within a request is
+reported as a likely N+1 together with the serializer field that was being
+rendered and the project stack that issued it. Views declare how many queries
+they may run with a ``query_budget`` class attribute (or the ``query_budget``
+decorator for function views).
+
+``QUERY_BUDGETS['MODE']`` is ``off``, ``log`` (sampled warnings on the
+``eshotry.queries`` logger) or ``raise`` (``QueryBudgetExceeded``; for tests).
+"""
+import json
+import logging
+import os
+import random
+import re
+import sys
+import time
+from contextlib import ExitStack
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('eshotry.queries')
+
+DEFAULTS = {
+    'MODE': 'log',
+    'SAMPLE_RATE': 1.0,
+    'REPEAT_THRESHOLD': 5,
+    'STACK_DEPTH': 8,
+}
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER = re.compile(r'%s|%\(\w+\)s')
+_IN_LIST = re.compile(r'\bIN \((?:\?, )*\?\)', re.IGNORECASE)
+_WHITESPACE = re.compile(r'\s+')
+
+_DRF_SERIALIZERS = os.path.join('rest_framework', 'serializers.py')
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A request ran more queries than its budget or repeated a query shape."""
+
+    def __init__(self, report):
+        self.report = report
+        super().__init__(format_report(report))
+
+
+def get_setting(name):
+    return getattr(settings, 'QUERY_BUDGETS', {}).get(name, DEFAULTS[name])
+
+
+@lru_cache(maxsize=2048)
+def normalize(sql):
+    """Collapse literals and parameter lists so equivalent queries share a shape."""
+    shape = _STRING.sub('?', sql)
+    shape = _PLACEHOLDER.sub('?', shape)
+    shape = _NUMBER.sub('?', shape)
+    shape = _IN_LIST.sub('IN (...)', shape)
+    return _WHITESPACE.sub(' ', shape).strip()
+
+
+def query_budget(budget):
+    """Declare the query budget of a function view (apply above ``@api_view``)."""
+    def decorator(view):
+        view.query_budget = budget
+        return view
+    return decorator
+
+
+def view_budget(view):
+    budget = getattr(view, 'query_budget', None)
+    if budget is None:
+        budget = getattr(getattr(view, 'view_class', None), 'query_budget', None)
+    return budget
+
+
+def _origin(depth):
+    """Serializer field being rendered and the project frames of the caller."""
+    root = str(settings.BASE_DIR)
+    field = None
+    stack = []
+    frame = sys._getframe(2)
+    while frame is not None:
+        code = frame.f_code
+        filename = code.co_filename
+        if (field is None and code.co_name == 'to_representation'
+                and filename.endswith(_DRF_SERIALIZERS)):
+            serializer = frame.f_locals.get('self')
+            current = frame.f_locals.get('field')
+            if serializer is not None and current is not None:
+                field = f'{type(serializer).__name__}.{current.field_name}'
+        if (len(stack) < depth and filename.startswith(root) and filename != __file__
+                and 'site-packages' not in filename):
+            stack.append(f'{os.path.relpath(filename, root)}:{frame.f_lineno} in {code.co_name}')
+        frame = frame.f_back
+    return field, stack
+
+
+class QueryInspector:
+    """
+    Execute wrapper recording query shapes on every connection while active.
+
+    Usable on its own in tests::
+
+        with QueryInspector() as inspector:
+            client.get(url)
+        inspector.check(budget=5)
+    """
+
+    def __init__(self, repeat_threshold=None, stack_depth=None):
+        self.repeat_threshold = repeat_threshold or get_setting('REPEAT_THRESHOLD')
+        self.stack_depth = stack_depth or get_setting('STACK_DEPTH')
+        self.shapes = {}
+        self.count = 0
+        self.duration = 0.0
+        self._stack = None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.count += 1
+            self.duration += elapsed
+            shape = normalize(sql)
+            entry = self.shapes.get(shape)
+            if entry is None:
+                self.shapes[shape] = {'count': 1, 'duration': elapsed, 'field': None, 'stack': None}
+            else:
+                entry['count'] += 1
+                entry['duration'] += elapsed
+                if entry['count'] == 2:
+                    # The first repeat is where an N+1 loop shows its origin
+                    entry['field'], entry['stack'] = _origin(self.stack_depth)
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        for connection in connections.all():
+            self._stack.enter_context(connection.execute_wrapper(self))
+        return self
+
+    def __exit__(self, *exc):
+        self._stack.close()
+        self._stack = None
+
+    def repeated(self):
+        """Shapes run at least ``repeat_threshold`` times, most frequent first."""
+        found = [
+            {
+                'shape': shape,
+                'count': entry['count'],
+                'time_ms': round(entry['duration'] * 1000, 2),
+                'field': entry['field'],
+                'stack': entry['stack'],
+            }
+            for shape, entry in self.shapes.items()
+            if entry['count'] >= self.repeat_threshold
+        ]
+        return sorted(found, key=lambda item: item['count'], reverse=True)
+
+    def report(self, budget=None, **extra):
+        """Violation report, or ``None`` when within budget and free of repeats."""
+        repeated = self.repeated()
+        over_budget = budget is not None and self.count > budget
+        if not (repeated or over_budget):
+            return None
+        return {
+            **extra,
+            'queries': self.count,
+            'budget': budget,
+            'time_ms': round(self.duration * 1000, 2),
+            'repeated': repeated,
+        }
+
+    def check(self, budget=None, **extra):
+        report = self.report(budget, **extra)
+        if report:
+            raise QueryBudgetExceeded(report)
+
+
+def format_report(report):
+    target = report.get('view') or report.get('path') or 'block'
+    lines = [f"{target}: {report['queries']} queries in {report['time_ms']}ms"]
+    if report['budget'] is not None and report['queries'] > report['budget']:
+        lines[0] += f" (budget {report['budget']})"
+    for item in report['repeated']:
+        lines.append(f"  {item['count']}x {item['shape'][:160]}")
+        if item['field']:
+            lines.append(f"    from serializer field {item['field']}")
+        for frame in item['stack'] or ():
+            lines.append(f'    at {frame}')
+    return '\n'.join(lines)
+
+
+class QueryBudgetMiddleware:
+    """Inspect a sample of requests and report budget overruns and N+1 shapes."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        mode = get_setting('MODE')
+        if mode == 'off' or (mode != 'raise' and random.random() >= get_setting('SAMPLE_RATE')):
+            return self.get_response(request)
+
+        with QueryInspector() as inspector:
+            response = self.get_response(request)
+
+        match = request.resolver_match
+        report = inspector.report(
+            budget=view_budget(match.func) if match else None,
+            view=match.view_name if match else None,
+            path=request.path,
+            method=request.method,
+        )
+        if report:
+            if mode == 'raise':
+                raise QueryBudgetExceeded(report)
+            logger.warning(format_report(report), extra={'query_report': json.dumps(report)})
+        return response
@@ -0,0 +1,167 @@
+"""
+Per-request phase timings for EshoTry platform.
+
+For a sample of requests the middleware times the whole request, all SQL, and
+these DRF phases:
+
+* ``auth``: request authentication (JWT decoding and the user lookup)
+* ``view``: the DRF view's ``dispatch``
+* ``queryset``: ``get_object`` and ``paginate_queryset`` (where list and detail
+  querysets are evaluated; unpaginated lists evaluate inside ``serialize``)
+* ``serialize``: the outermost serializer ``.data`` access
+* ``render``: renderer output via ``Response.rendered_content``
+
+The timings are sent as a ``Server-Timing`` header and logged as one JSON line
+on the ``eshotry.timing`` logger. Requests that are not sampled only pay a
+context variable lookup per hooked call.
+"""
+import functools
+import json
+import logging
+import random
+import time
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('eshotry.timing')
+
+DEFAULTS = {
+    'ENABLED': True,
+    'SAMPLE_RATE': 1.0,
+    'HEADER': True,
+    'LOG': True,
+}
+
+PHASES = ('auth', 'view', 'queryset', 'serialize', 'render')
+
+_current = ContextVar('server_timing', default=None)
+
+
+def get_setting(name):
+    return getattr(settings, 'SERVER_TIMING', {}).get(name, DEFAULTS[name])
+
+
+class Timings:
+    """Accumulated phase durations and SQL totals for one request."""
+
+    def __init__(self):
+        self.durations = dict.fromkeys(PHASES, 0.0)
+        self.active = set()
+        self.db_time = 0.0
+        self.db_queries = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.db_queries += 1
+
+    def as_header(self, total):
+        entries = [
+            f'{name};dur={duration * 1000:.1f}'
+            for name, duration in self.durations.items() if duration
+        ]
+        entries.append(f'db;dur={self.db_time * 1000:.1f};desc="{self.db_queries} queries"')
+        entries.append(f'total;dur={total * 1000:.1f}')
+        return ', '.join(entries)
+
+    def as_record(self, total, **extra):
+        record = {f'{name}_ms': round(duration * 1000, 2) for name, duration in self.durations.items()}
+        record.update({
+            'db_ms': round(self.db_time * 1000, 2),
+            'db_queries': self.db_queries,
+            # Rendering happens after dispatch returns, outside the view phase
+            'middleware_ms': round(
+                (total - self.durations['view'] - self.durations['render']) * 1000, 2
+            ),
+            'total_ms': round(total * 1000, 2),
+        })
+        return {**extra, **record}
+
+
+def timed(phase, func):
+    """Wrap ``func`` so its outermost call is added to ``phase`` of the current request."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        timings = _current.get()
+        if timings is None or phase in timings.active:
+            return func(*args, **kwargs)
+        timings.active.add(phase)
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            timings.durations[phase] += time.perf_counter() - started
+            timings.active.discard(phase)
+
+    wrapper.server_timing_phase = phase
+    return wrapper
+
+
+def install_hooks():
+    """Wrap the DRF entry points of each phase; safe to call more than once."""
+    from rest_framework.generics import GenericAPIView
+    from rest_framework.request import Request
+    from rest_framework.response import Response
+    from rest_framework.serializers import BaseSerializer
+    from rest_framework.views import APIView
+
+    hooks = [
+        (Request, '_authenticate', 'auth'),
+        (APIView, 'dispatch', 'view'),
+        (GenericAPIView, 'get_object', 'queryset'),
+        (GenericAPIView, 'paginate_queryset', 'queryset'),
+    ]
+    for owner, name, phase in hooks:
+        func = getattr(owner, name)
+        if not hasattr(func, 'server_timing_phase'):
+            setattr(owner, name, timed(phase, func))
+
+    for owner, name, phase in [(BaseSerializer, 'data', 'serialize'),
+                               (Response, 'rendered_content', 'render')]:
+        prop = owner.__dict__[name]
+        if not hasattr(prop.fget, 'server_timing_phase'):
+            setattr(owner, name, property(timed(phase, prop.fget)))
+
+
+class ServerTimingMiddleware:
+    """Time a sample of requests and report them via header and log line."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if get_setting('ENABLED'):
+            install_hooks()
+
+    def __call__(self, request):
+        if not get_setting('ENABLED') or random.random() >= get_setting('SAMPLE_RATE'):
+            return self.get_response(request)
+
+        timings = Timings()
+        token = _current.set(timings)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(timings))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        total = time.perf_counter() - started
+
+        if get_setting('HEADER'):
+            response['Server-Timing'] = timings.as_header(total)
+        if get_setting('LOG'):
+            match = request.resolver_match
+            logger.info(json.dumps(timings.as_record(
+                total,
+                view=match.view_name if match else None,
+                method=request.method,
+                path=request.path,
+                status=response.status_code,
+            )))
+        return response
@@ -36,9 +36,10 @@ THIRD_PARTY_APPS = [
 LOCAL_APPS = [
     'apps.users',
     'apps.products',
-    # 'apps.orders',           # TODO: Implement order views
-    # 'apps.recommendations',  # TODO: Create this app
-    # 'apps.virtual_tryon',    # TODO: Create this app
+    'apps.orders',
+    'apps.recommendations',
+    'apps.virtual_tryon',
+    'eshotry',  # project-wide management commands
     # 'apps.analytics',        # TODO: Create this app
 ]
 
@@ -46,11 +47,15 @@ INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'eshotry.metrics.MetricsMiddleware',
+    'eshotry.server_timing.ServerTimingMiddleware',
+    'eshotry.query_budget.QueryBudgetMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'eshotry.profiling.ProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -150,6 +155,25 @@ STATICFILES_DIRS = [
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Media delivery (see eshotry.media); 'accel' needs an internal nginx location
+MEDIA_SERVING = {
+    'ENABLED': config('MEDIA_SERVING_ENABLED', default=True, cast=bool),
+    'MODE': config('MEDIA_SERVING_MODE', default='django'),  # accel, sendfile or django
+    'ACCEL_PREFIX': config('MEDIA_ACCEL_PREFIX', default='/protected-media/'),
+    'MAX_AGE': 60 * 60 * 24,
+    # Private prefix -> function(user, path) deciding who may read the file
+    'PRIVATE_PREFIXES': {'tryon/': 'apps.virtual_tryon.jobs.owns_result'},
+}
+
+# Responsive image renditions (see apps.products.renditions)
+IMAGE_RENDITIONS = {
+    'WIDTHS': [160, 320, 640, 1024, 1600],
+    'FORMATS': ['webp', 'jpeg'],
+    'QUALITY': config('IMAGE_RENDITION_QUALITY', default=80, cast=int),
+    'ROOT': 'renditions',
+    'PLACEHOLDER_WIDTH': 16,
+}
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -227,6 +251,29 @@ CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
+CELERY_BEAT_SCHEDULE = {
+    'ensure-order-partitions': {
+        'task': 'apps.orders.tasks.ensure_order_partitions',
+        'schedule': 60 * 60 * 24,
+    },
+    'apply-price-rules': {
+        'task': 'apps.products.tasks.apply_price_rules',
+        'schedule': 60,
+    },
+    'build-recommendations': {
+        'task': 'apps.recommendations.tasks.build_recommendations',
+        'schedule': 60 * 60 * 24,
+    },
+    'flush-content-index': {
+        'task': 'apps.recommendations.tasks.flush_content_index',
+        'schedule': 60,
+    },
+}
+
+# Try-on rendering is CPU bound; keep it off the default queue (see apps.virtual_tryon.jobs)
+CELERY_TASK_ROUTES = {
+    'apps.virtual_tryon.tasks.render_tryon': {'queue': 'tryon'},
+}
 
 # Stripe Configuration
 STRIPE_PUBLISHABLE_KEY = config('STRIPE_PUBLISHABLE_KEY', default='')
@@ -239,12 +286,108 @@ DATA_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB
 
 # AI Model Settings
 AI_MODEL_SETTINGS = {
-    'RECOMMENDATION_MODEL_PATH': BASE_DIR / 'ai_models' / 'recommendation_model.pkl',
+    'RECOMMENDATION_MODEL_PATH': BASE_DIR / 'ai_models' / 'recommendations',
     'VIRTUAL_TRYON_MODEL_PATH': BASE_DIR / 'ai_models' / 'virtual_tryon_model.pkl',
     'BATCH_SIZE': 32,
     'LEARNING_RATE': 0.001,
 }
 
+# Item-to-item recommendations (SIMILARITY: cosine | jaccard)
+RECOMMENDATIONS = {
+    'ROOT': config('RECOMMENDATIONS_ROOT', default=str(AI_MODEL_SETTINGS['RECOMMENDATION_MODEL_PATH'])),
+    'SIMILARITY': config('RECOMMENDATIONS_SIMILARITY', default='cosine'),
+    'TOP_K': config('RECOMMENDATIONS_TOP_K', default=20, cast=int),
+    'BLOCK_SIZE': 2048,  # products per similarity block
+    'KEEP_GENERATIONS': 2,
+    # Interaction weights, summed per (user, product) and log-dampened
+    'WEIGHTS': {'order': 3.0, 'cart': 2.0, 'wishlist': 1.5, 'review': 1.0},
+    # Content index: hashed TF-IDF + one-hot facet vectors, searched by cluster
+    'TEXT_DIMENSIONS': 192,
+    'FACET_DIMENSIONS': 64,
+    'FACET_WEIGHT': 0.35,
+    'CLUSTERS': None,  # sqrt(products) when unset
+    'NPROBE': config('RECOMMENDATIONS_NPROBE', default=12, cast=int),
+    'DELTA_LIMIT': 50000,  # appended products before a full rebuild
+    # Listing personalization from style quiz and profile preferences
+    'PREFERENCE_DIMENSIONS': 128,
+    'PREFERENCE_WEIGHTS': {'style': 1.0, 'brand': 1.0, 'color': 0.6, 'fit': 0.6, 'price': 0.8},
+    'PRICE_BANDS': [25, 50, 100, 200, 500],
+    'PERSONALIZATION_BUDGET_MS': config('PERSONALIZATION_BUDGET_MS', default=5, cast=float),
+    'USER_VECTOR_TIMEOUT': 60 * 60,
+    # Size advice: pseudo-reviews shrinking runs small/large, ridge penalty
+    'SIZE_PRIOR': 5,
+    'SIZE_RIDGE': 1.0,
+    'SIZE_CACHE_TIMEOUT': 60 * 60,
+    'SIZE_BATCH_LIMIT': 50,
+}
+
+# Virtual try-on jobs, deduplicated by input hash (see apps.virtual_tryon.jobs)
+VIRTUAL_TRYON = {
+    'RESULTS_ROOT': 'tryon',
+    'RENDERER_VERSION': 1,  # bump when the renderer output changes
+    'RENDER_WORKERS': config('TRYON_RENDER_WORKERS', default=2, cast=int),  # 0 renders in the task
+    'RENDER_TIMEOUT': config('TRYON_RENDER_TIMEOUT', default=30, cast=int),
+    'MAX_QUEUE_DEPTH': config('TRYON_MAX_QUEUE_DEPTH', default=200, cast=int),
+    'MAX_PENDING_PER_USER': config('TRYON_MAX_PENDING_PER_USER', default=3, cast=int),
+    'RETRY_AFTER': 10,
+    'STALE_AFTER': 10 * 60,
+}
+
+# Identifier generation
+ID_GENERATORS = {
+    'PRIMARY_KEY': 'eshotry.ids.uuid7',
+    'ORDER_NUMBER': 'eshotry.ids.snowflake_order_number',
+    'ORDER_NUMBER_PREFIX': 'ET',
+    'WORKER_ID': config('ID_WORKER_ID', default=None),  # 0-1023, unique per process
+}
+
+# Order table partitioning
+ORDER_PARTITIONS = {
+    'MONTHS_AHEAD': config('ORDER_PARTITION_MONTHS_AHEAD', default=3, cast=int),
+    'ARCHIVE_ROOT': config('ORDER_ARCHIVE_ROOT', default=str(BASE_DIR / 'archive' / 'orders')),
+}
+
+# SQL query budgets and N+1 detection (MODE: off | log | raise)
+QUERY_BUDGETS = {
+    'MODE': config('QUERY_BUDGET_MODE', default='log'),
+    'SAMPLE_RATE': config('QUERY_BUDGET_SAMPLE_RATE', default=1.0 if DEBUG else 0.01, cast=float),
+    'REPEAT_THRESHOLD': config('QUERY_BUDGET_REPEAT_THRESHOLD', default=5, cast=int),
+    'STACK_DEPTH': 8,
+}
+
+# Per-request phase timings (Server-Timing header and eshotry.timing log line)
+SERVER_TIMING = {
+    'ENABLED': config('SERVER_TIMING_ENABLED', default=True, cast=bool),
+    'SAMPLE_RATE': config('SERVER_TIMING_SAMPLE_RATE', default=1.0 if DEBUG else 0.05, cast=float),
+    'HEADER': config('SERVER_TIMING_HEADER', default=True, cast=bool),
+    'LOG': True,
+}
+
+# Prometheus metrics at /metrics (set PROMETHEUS_MULTIPROC_DIR for preforked workers)
+METRICS = {
+    'TOKEN': config('METRICS_TOKEN', default=''),  # Bearer token required when set
+    # Without a token, only these client networks may scrape (anyone when DEBUG)
+    'INTERNAL_NETWORKS': config('METRICS_INTERNAL_NETWORKS', default='127.0.0.0/8,::1/128', cast=lambda v: [s.strip() for s in v.split(',') if s.strip()]),
+    'CELERY_QUEUES': config('METRICS_CELERY_QUEUES', default='celery,tryon', cast=lambda v: [s.strip() for s in v.split(',')]),
+}
+
+# Request profiling (?__profile=1 for staff or a signed token; 1 in SAMPLE_EVERY automatically)
+PROFILING = {
+    'ROOT': config('PROFILE_ROOT', default=str(BASE_DIR / 'profiles')),
+    'SAMPLE_EVERY': config('PROFILE_SAMPLE_EVERY', default=0, cast=int),  # 0 disables sampling
+    'INTERVAL_MS': config('PROFILE_INTERVAL_MS', default=5, cast=int),
+    'MAX_PROFILES': config('PROFILE_MAX_PROFILES', default=500, cast=int),
+    'TOKEN_MAX_AGE': 60 * 60,
+}
+
+# Admin changelists on large tables (see eshotry.admin_utils)
+ADMIN_PERFORMANCE = {
+    # Tables estimated above this many rows are not counted exactly
+    'ESTIMATE_COUNT_ABOVE': config('ADMIN_ESTIMATE_COUNT_ABOVE', default=100000, cast=int),
+    'COUNT_TIMEOUT_MS': config('ADMIN_COUNT_TIMEOUT_MS', default=200, cast=int),
+    'RELATED_SEARCH_LIMIT': 500,
+}
+
 # Security settings
 SECURE_BROWSER_XSS_FILTER = True
 SECURE_CONTENT_TYPE_NOSNIFF = True
@@ -0,0 +1,84 @@
+"""
+Tests for the integer-cents rounding rules.
+"""
+from decimal import Decimal
+from unittest import TestCase
+
+from eshotry.money import format_cents, from_cents, multiply, percent_of, percent_off, to_cents
+
+
+class ToCentsTests(TestCase):
+
+    def test_exact_amounts(self):
+        self.assertEqual(to_cents(Decimal('12.34')), 1234)
+        self.assertEqual(to_cents(7), 700)
+        self.assertEqual(to_cents('0.10'), 10)
+        self.assertEqual(to_cents(19.99), 1999)
+        self.assertIsNone(to_cents(None))
+
+    def test_rounds_half_up(self):
+        self.assertEqual(to_cents(Decimal('0.005')), 1)
+        self.assertEqual(to_cents(Decimal('0.015')), 2)
+        self.assertEqual(to_cents(Decimal('0.025')), 3)
+        self.assertEqual(to_cents(Decimal('0.0049')), 0)
+        self.assertEqual(to_cents(Decimal('-0.005')), -1)
+
+    def test_round_trip(self):
+        self.assertEqual(from_cents(1234), Decimal('12.34'))
+        self.assertEqual(to_cents(from_cents(1999)), 1999)
+        self.assertIsNone(from_cents(None))
+
+
+class FormatCentsTests(TestCase):
+
+    def test_two_places(self):
+        self.assertEqual(format_cents(0), '0.00')
+        self.assertEqual(format_cents(5), '0.05')
+        self.assertEqual(format_cents(123456), '1234.56')
+        self.assertEqual(format_cents(-5), '-0.05')
+
+
+class MultiplyTests(TestCase):
+
+    def test_quantities_are_exact(self):
+        self.assertEqual(multiply(1999, 3), 5997)
+
+    def test_fractional_factors_round_half_up(self):
+        # 0.25 * 0.5 = 0.125 -> 0.13
+        self.assertEqual(multiply(25, 0.5), 13)
+        self.assertEqual(multiply(100, Decimal('1.005')), 101)
+
+
+class PercentOfTests(TestCase):
+
+    def test_rounds_half_up(self):
+        self.assertEqual(percent_of(1000, 12), 120)
+        # 12.5% of 0.04 = 0.005 -> 0.01
+        self.assertEqual(percent_of(4, Decimal('12.5')), 1)
+        # 10% of 0.15 = 0.015 -> 0.02
+        self.assertEqual(percent_of(15, 10), 2)
+        # 10% of 0.14 = 0.014 -> 0.01
+        self.assertEqual(percent_of(14, 10), 1)
+
+    def test_fractional_percent(self):
+        self.assertEqual(percent_of(10000, '7.5'), 750)
+
+
+class PercentOffTests(TestCase):
+
+    def test_whole_percent(self):
+        self.assertEqual(percent_off(10000, 7500), 25)
+        self.assertEqual(percent_off(0, 0), 0)
+
+    def test_rounds_half_to_even(self):
+        # 12.5% -> 12, 13.5% -> 14, like round() on Decimal
+        self.assertEqual(percent_off(200, 175), 12)
+        self.assertEqual(percent_off(200, 173), 14)
+        self.assertEqual(percent_off(400, 398), 0)  # 0.5%
+        self.assertEqual(percent_off(400, 394), 2)  # 1.5%
+
+    def test_matches_decimal_rounding(self):
+        for base in range(1, 400, 7):
+            for sale in range(0, base + 1, 3):
+                expected = round((Decimal(base - sale) / Decimal(base)) * 100)
+                self.assertEqual(percent_off(base, sale), expected, (base, sale))
@@ -1,16 +1,24 @@
 """
 URL configuration for EshoTry project.
 """
+import re
+
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.conf import settings
 from django.conf.urls.static import static
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView, SpectacularRedocView
 
+from eshotry.media import serve_media
+from eshotry.metrics import metrics_view
+
 urlpatterns = [
     # Admin
     path('admin/', admin.site.urls),
     
+    # Monitoring
+    path('metrics', metrics_view, name='metrics'),
+    
     # API Documentation
     path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
     path('api/docs/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
@@ -19,13 +27,18 @@ urlpatterns = [
     # API endpoints
     path('api/auth/', include('apps.users.urls')),
     path('api/products/', include('apps.products.urls')),
-    # path('api/orders/', include('apps.orders.urls')),                    # TODO: Implement order views
-    # path('api/recommendations/', include('apps.recommendations.urls')),  # TODO: Create this app
-    # path('api/virtual-tryon/', include('apps.virtual_tryon.urls')),      # TODO: Create this app
+    path('api/orders/', include('apps.orders.urls')),
+    path('api/recommendations/', include('apps.recommendations.urls')),
+    path('api/virtual-tryon/', include('apps.virtual_tryon.urls')),
     # path('api/analytics/', include('apps.analytics.urls')),              # TODO: Create this app
 ]
 
-# Serve media files in development
+# Media is authorized here and handed to the proxy (or sendfile) for transfer
+if settings.MEDIA_SERVING['ENABLED'] and settings.MEDIA_URL.startswith('/'):
+    urlpatterns += [
+        re_path(rf"^{re.escape(settings.MEDIA_URL.lstrip('/'))}(?P<path>.+)$", serve_media, name='media'),
+    ]
+
+# Serve static files in development
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)